@@ -74,6 +74,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'learning.db_router.PrimaryPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -116,10 +117,92 @@ else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH") or BASE_DIR / "db.sqlite3",
         }
     }
 
+# SQLite production mode (learning/sqlite_tuning.py): WAL journaling and
+# tuned pragmas on every connection, persistent connections so they are
+# applied once per thread, and small frequent writes (learning progress,
+# events) group-committed by learning/write_coalescer.py.
+SQLITE_PRODUCTION = os.getenv("SQLITE_PRODUCTION", "False") == "True"
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+
+if SQLITE_PRODUCTION and DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    DATABASES["default"]["CONN_MAX_AGE"] = 600
+    # Take the write lock when a transaction starts, so concurrent
+    # writers (e.g. duplicate submits) queue instead of failing with
+    # "database is locked" on lock upgrade.
+    DATABASES["default"]["OPTIONS"] = {"transaction_mode": "IMMEDIATE"}
+
+WRITE_COALESCING = os.getenv("WRITE_COALESCING", str(SQLITE_PRODUCTION)) == "True"
+WRITE_COALESCE_MAX_BATCH = int(os.getenv("WRITE_COALESCE_MAX_BATCH", "200"))
+
+# Optional read replica for read-only views and commands (learning/db_router.py).
+# DATABASE_REPLICA_URL -> replica server; SQLITE_REPLICA_PATH -> a second
+# SQLite file for local testing, refreshed with `manage.py sync_sqlite_replica`.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+SQLITE_REPLICA_PATH = os.getenv("SQLITE_REPLICA_PATH")
+
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=600,
+        ssl_require=not DEBUG,
+    )
+elif SQLITE_REPLICA_PATH:
+    DATABASES["replica"] = {**DATABASES["default"], "NAME": SQLITE_REPLICA_PATH}
+
+if "replica" in DATABASES:
+    # Tests run against one database.
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["learning.db_router.PrimaryReplicaRouter"]
+
+# How long a user who just wrote keeps reading from the primary.
+REPLICA_PIN_SECONDS = float(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
+
+# Cache
+# REDIS_URL -> shared Redis cache (recommended with several workers),
+# CACHE_DIR -> file-based cache, otherwise per-process local memory.
+
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_DIR = os.getenv("CACHE_DIR")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+elif CACHE_DIR:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "learning",
+        }
+    }
+
+# Per-employee response cache for learner endpoints (learning/response_cache.py).
+# Writes invalidate it through the cache, so workers and management commands
+# must share one; it is on by default only when one is configured.
+RESPONSE_CACHE_ENABLED = os.getenv(
+    "RESPONSE_CACHE_ENABLED", "True" if (REDIS_URL or CACHE_DIR) else "False"
+) == "True"
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "300"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -153,20 +236,121 @@ USE_I18N = True
 from datetime import timedelta
 
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": (
+        "learning.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "learning.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "learning.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
 }
 
+# API JSON encoder (learning/fastjson.py): "auto" uses orjson when it is
+# installed, "stdlib" forces the json module.
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Build request.user from the JWT's role/employee_id claims instead of
+# loading the user and profile on every request (learning/authentication.py).
+# Role changes are picked up through the cache, so this needs a cache
+# shared by all workers; it is on by default only when one is configured.
+AUTH_TRUST_JWT_CLAIMS = os.getenv(
+    "AUTH_TRUST_JWT_CLAIMS", "True" if (REDIS_URL or CACHE_DIR) else "False"
+) == "True"
+
+# LLM client (see learning/llm)
+# LLM_BACKEND: "gemini" for the real API, "fake" for a deterministic offline stand-in.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "10"))
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "0"))
+# Stream question generation and persist each question as it arrives.
+LLM_STREAM_QUESTIONS = os.getenv("LLM_STREAM_QUESTIONS", "True") == "True"
+# Default weekly study budget for generated learning paths.
+LEARNING_WEEKLY_HOURS = float(os.getenv("LEARNING_WEEKLY_HOURS", "5"))
+# Versions of learning path diffs kept for GET .../learning-path/changes/.
+LEARNING_PATH_HISTORY_VERSIONS = int(os.getenv("LEARNING_PATH_HISTORY_VERSIONS", "50"))
+# Watch-progress heartbeats (learning/heartbeats.py): progress is written
+# when it moves HEARTBEAT_MIN_DELTA_PERCENT points or after
+# HEARTBEAT_FLUSH_SECONDS; reaching LEARNING_COMPLETE_PERCENT marks it DONE.
+HEARTBEAT_FLUSH_SECONDS = float(os.getenv("HEARTBEAT_FLUSH_SECONDS", "30"))
+HEARTBEAT_MIN_DELTA_PERCENT = int(os.getenv("HEARTBEAT_MIN_DELTA_PERCENT", "10"))
+LEARNING_COMPLETE_PERCENT = int(os.getenv("LEARNING_COMPLETE_PERCENT", "90"))
+
+# TF-IDF similarity index over LearningContent (manage.py build_content_index).
+CONTENT_INDEX_DIR = os.getenv("CONTENT_INDEX_DIR", str(BASE_DIR / "content_index"))
+CONTENT_INDEX_DIMS = int(os.getenv("CONTENT_INDEX_DIMS", str(2 ** 18)))
+# Skills with fewer catalog items than this get related content from the index.
+CONTENT_INDEX_MIN_PER_SKILL = int(os.getenv("CONTENT_INDEX_MIN_PER_SKILL", "3"))
+
+# Generated questions at or above this MinHash similarity to an existing one
+# (same skill) are treated as repeats; see learning/question_dedup.py.
+QUESTION_DEDUP_THRESHOLD = float(os.getenv("QUESTION_DEDUP_THRESHOLD", "0.8"))
+# Serve unseen questions from earlier sessions instead of calling the LLM.
+QUESTION_REUSE = os.getenv("QUESTION_REUSE", "True") == "True"
+
+# Adaptive assessments (learning/adaptive.py). A skill stops once the
+# posterior SD of its 0-100 score is at most CAT_TARGET_SCORE_SE; the fixed
+# 5-question form is good to about +-20 points.
+CAT_TARGET_SCORE_SE = float(os.getenv("CAT_TARGET_SCORE_SE", "18"))
+CAT_MIN_ITEMS = int(os.getenv("CAT_MIN_ITEMS", "2"))
+CAT_MAX_ITEMS = int(os.getenv("CAT_MAX_ITEMS", "10"))
+# Generate new questions when the closest unseen one is further off (logits).
+CAT_MAX_DIFFICULTY_GAP = float(os.getenv("CAT_MAX_DIFFICULTY_GAP", "0.75"))
+
+# Duplicate assessment submits within this window replay the stored result.
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+
+# Lifetime of the one-time activation links of bulk-provisioned accounts.
+ACCOUNT_ACTIVATION_TTL_HOURS = float(os.getenv("ACCOUNT_ACTIVATION_TTL_HOURS", "168"))
+
+# Route the LLM-bound learner endpoints to the async views in views_async.py.
+# Only worth it under an ASGI server: uvicorn backend.asgi:application
+ASYNC_LLM_VIEWS = os.getenv("ASYNC_LLM_VIEWS", "False") == "True"
+
+# Cross-worker outbound rate limit and circuit breaker (state lives in the DB).
+LLM_GUARD_ENABLED = os.getenv("LLM_GUARD_ENABLED", "True") == "True"
+LLM_RATE_LIMIT_PER_MINUTE = float(os.getenv("LLM_RATE_LIMIT_PER_MINUTE", "60"))
+LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", "10"))
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", "2"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "60"))
+
+# Telemetry ledger (learning.LLMCall), written in batches off the request path.
+LLM_TELEMETRY_ENABLED = os.getenv("LLM_TELEMETRY_ENABLED", "True") == "True"
+LLM_TELEMETRY_FLUSH_SECONDS = float(os.getenv("LLM_TELEMETRY_FLUSH_SECONDS", "5"))
+LLM_TELEMETRY_BATCH_SIZE = int(os.getenv("LLM_TELEMETRY_BATCH_SIZE", "100"))
+LLM_TELEMETRY_MAX_QUEUE = int(os.getenv("LLM_TELEMETRY_MAX_QUEUE", "10000"))
+# USD per million tokens: (input, output). Used for cost estimates only.
+LLM_PRICING = {
+    "gemini-2.5-flash": (0.30, 2.50),
+}
+
+# Nightly profile summaries (manage.py summarize_profiles): employees per
+# LLM request, and the most requests / tokens one run may spend (0 = no
+# token limit). Employees left over are picked up by the next run.
+PROFILE_SUMMARY_BATCH_SIZE = int(os.getenv("PROFILE_SUMMARY_BATCH_SIZE", "20"))
+PROFILE_SUMMARY_MAX_CALLS = int(os.getenv("PROFILE_SUMMARY_MAX_CALLS", "100"))
+PROFILE_SUMMARY_MAX_TOKENS = int(os.getenv("PROFILE_SUMMARY_MAX_TOKENS", "0"))
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
@@ -236,5 +420,8 @@ CORS_ALLOWED_ORIGINS = os.getenv(
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Let the frontend read cache validators on learner endpoints.
+CORS_EXPOSE_HEADERS = ["ETag", "Last-Modified", "X-Cache"]
+
 # If you prefer to allow all origins during development, you can instead use:
 # CORS_ALLOW_ALL_ORIGINS = True
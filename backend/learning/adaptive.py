@@ -0,0 +1,252 @@
+import math
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Abs
+from django.utils import timezone
+
+from . import response_cache
+from .llm import get_client
+from .models import AssessmentQuestion, AssessmentResponse, AssessmentResult, AssessmentSession, Skill
+from .question_dedup import SessionQuestions, seen_question_ids
+
+# Computerized adaptive testing (AssessmentSession.mode == ADAPTIVE).
+#
+# Rasch model: a learner with ability t (logits) answers a question of
+# difficulty b correctly with probability 1 / (1 + e^-(t - b)). Questions
+# start at the logit for their generated label (Easy -1, Medium 0, Hard
+# +1) and every answer nudges b towards what learners actually do.
+#
+# Per skill the ability is the posterior mean (EAP) over a grid with a
+# N(0, 1) prior, which stays finite when every answer so far is right or
+# wrong. The next question is the unseen one closest in difficulty to the
+# current estimate (the most informative one under Rasch); if the bank has
+# nothing within CAT_MAX_DIFFICULTY_GAP, a batch at the right level is
+# generated. A skill stops once the posterior SD of its score is at most
+# CAT_TARGET_SCORE_SE points (or after CAT_MAX_ITEMS questions).
+#
+# The score reported is 100 * P(correct on a Medium question), the number
+# the fixed 5-question form estimates by its percent correct, so results
+# from both modes are on the same 0-100 scale.
+#
+# Each response keeps the difficulty its answer was graded against, and
+# estimates are always made from those, so a session's scores and the
+# point where it stopped can be reproduced later however much the
+# questions have been recalibrated since.
+
+_GRID = [-4 + i * 0.1 for i in range(81)]
+_PRIOR = [math.exp(-t * t / 2) for t in _GRID]
+
+# Weight of the label's starting difficulty, in answers: the first answer
+# moves b by at most 1 / (0.25 * CALIBRATION_PRIOR) logits.
+CALIBRATION_PRIOR = 10
+
+EASY_BELOW = -0.5
+HARD_ABOVE = 0.5
+
+
+def p_correct(ability, difficulty):
+    return 1 / (1 + math.exp(difficulty - ability))
+
+
+def difficulty_label(b):
+    if b < EASY_BELOW:
+        return AssessmentQuestion.EASY
+    if b > HARD_ABOVE:
+        return AssessmentQuestion.HARD
+    return AssessmentQuestion.MEDIUM
+
+
+def estimate(answers):
+    """
+    `answers` is a list of (difficulty, is_correct). Returns (ability,
+    ability_sd, score, score_sd), score on the 0-100 scale.
+    """
+    weights = list(_PRIOR)
+    for b, correct in answers:
+        for i, t in enumerate(_GRID):
+            p = p_correct(t, b)
+            weights[i] *= p if correct else 1 - p
+    total = sum(weights)
+    weights = [w / total for w in weights]
+
+    ability = sum(w * t for w, t in zip(weights, _GRID))
+    ability_sd = math.sqrt(sum(w * (t - ability) ** 2 for w, t in zip(weights, _GRID)))
+
+    scores = [100 * p_correct(t, 0.0) for t in _GRID]
+    score = sum(w * s for w, s in zip(weights, scores))
+    score_sd = math.sqrt(sum(w * (s - score) ** 2 for w, s in zip(weights, scores)))
+    return ability, ability_sd, score, score_sd
+
+
+def is_done(answered, score_sd):
+    if answered >= settings.CAT_MAX_ITEMS:
+        return True
+    return answered >= settings.CAT_MIN_ITEMS and score_sd <= settings.CAT_TARGET_SCORE_SE
+
+
+def create_session_skills(employee):
+    """
+    Makes sure every skill the employee lists has a Skill row. Called
+    once, when an adaptive session starts.
+    """
+    names = list(dict.fromkeys(employee.get_current_skills()))
+    existing = set(Skill.objects.filter(name__in=names).values_list("name", flat=True))
+    Skill.objects.bulk_create(
+        [Skill(name=name) for name in names if name not in existing], ignore_conflicts=True
+    )
+
+
+def session_skills(session):
+    """
+    The session's skills, in the employee's order, in one query.
+    """
+    names = list(dict.fromkeys(session.employee.get_current_skills()))
+    by_name = {skill.name: skill for skill in Skill.objects.filter(name__in=names)}
+    return [by_name[name] for name in names if name in by_name]
+
+
+def progress(session, skills):
+    """
+    Current estimate per skill: {skill name: {...}}, in skill order.
+    """
+    answers = {}
+    for skill_id, b, correct in (
+        AssessmentResponse.objects
+        .filter(session=session, answered_at__isnull=False)
+        .order_by("answered_at", "id")
+        .values_list("question__skill_id", "difficulty", "is_correct")
+    ):
+        answers.setdefault(skill_id, []).append((b, correct))
+
+    state = {}
+    for skill in skills:
+        skill_answers = answers.get(skill.id, [])
+        ability, ability_sd, score, score_sd = estimate(skill_answers)
+        state[skill.name] = {
+            "skill_id": skill.id,
+            "answered": len(skill_answers),
+            "ability": round(ability, 3),
+            "ability_sd": round(ability_sd, 3),
+            "score": round(score),
+            "score_sd": round(score_sd, 1),
+            "done": is_done(len(skill_answers), score_sd),
+        }
+    return state
+
+
+def public_progress(state):
+    return {
+        name: {k: v for k, v in s.items() if k != "skill_id"}
+        for name, s in state.items()
+    }
+
+
+def pending_response(session):
+    return (
+        AssessmentResponse.objects
+        .filter(session=session, answered_at__isnull=True)
+        .select_related("question__skill")
+        .first()
+    )
+
+
+def nearest_question(skill, ability, exclude):
+    return (
+        AssessmentQuestion.objects
+        .filter(skill=skill)
+        .exclude(id__in=exclude)
+        .annotate(gap=Abs(F("rasch_difficulty") - ability))
+        .order_by("gap", "times_answered", "id")
+        .first()
+    )
+
+
+def next_question(session, skill, ability, generate):
+    """
+    Picks (and records as served) the most informative unseen question
+    for `skill` at `ability`, generating a batch at that level with
+    `generate(skill, label, picker)` when the bank has nothing close.
+    Returns the AssessmentResponse, or None if no question is available.
+    """
+    seen = seen_question_ids(session.employee_id)
+    question = nearest_question(skill, ability, seen)
+
+    if question is None or abs(question.rasch_difficulty - ability) > settings.CAT_MAX_DIFFICULTY_GAP:
+        if get_client().is_available():
+            picker = SessionQuestions(session, attach=False)
+            generate(skill, difficulty_label(ability), picker)
+            question = nearest_question(skill, ability, seen) or question
+
+    if question is None:
+        # Nothing new for this learner: a question from an earlier session
+        # beats no question (never one already in this session).
+        served = session.responses.values_list("question_id", flat=True)
+        question = nearest_question(skill, ability, served)
+    if question is None:
+        return None
+    try:
+        with transaction.atomic():
+            return AssessmentResponse.objects.create(session=session, question=question)
+    except IntegrityError:
+        # A concurrent request served a question first; that one stands.
+        return pending_response(session)
+
+
+def record_answer(response, selected_option):
+    """
+    Grades a pending response, stores the skill's new ability estimate
+    and recalibrates the question's difficulty. Returns False if the
+    response had already been answered (e.g. by a concurrent request).
+    """
+    question = response.question
+    skill_answers = list(
+        AssessmentResponse.objects
+        .filter(session=response.session_id, answered_at__isnull=False, question__skill_id=question.skill_id)
+        .order_by("answered_at", "id")
+        .values_list("difficulty", "is_correct")
+    )
+    ability_before = estimate(skill_answers)[0]
+    correct = selected_option == question.correct_option
+
+    claimed = AssessmentResponse.objects.filter(id=response.id, answered_at__isnull=True).update(
+        selected_option=selected_option,
+        is_correct=correct,
+        difficulty=question.rasch_difficulty,
+        ability=estimate(skill_answers + [(question.rasch_difficulty, correct)])[0],
+        answered_at=timezone.now(),
+    )
+    if not claimed:
+        return False
+
+    # One online Newton step on b against the learner's estimate before
+    # this answer; the step shrinks as the question collects answers.
+    p = p_correct(ability_before, question.rasch_difficulty)
+    step = (p - correct) / (0.25 * (question.times_answered + CALIBRATION_PRIOR))
+    AssessmentQuestion.objects.filter(id=question.id).update(
+        rasch_difficulty=F("rasch_difficulty") + step,
+        times_answered=F("times_answered") + 1,
+        difficulty=difficulty_label(question.rasch_difficulty + step),
+    )
+    return True
+
+
+def finish(session, state):
+    """
+    Completes the session and stores one AssessmentResult per assessed
+    skill. Returns {skill name: score}.
+    """
+    completed = AssessmentSession.objects.filter(
+        id=session.id, status=AssessmentSession.STARTED
+    ).update(status=AssessmentSession.COMPLETED, completed_at=timezone.now())
+
+    results = {name: s["score"] for name, s in state.items() if s["answered"]}
+    if completed:
+        AssessmentResult.objects.bulk_create([
+            AssessmentResult(session=session, skill_id=s["skill_id"], score=s["score"])
+            for s in state.values()
+            if s["answered"]
+        ])
+        response_cache.invalidate_employee(session.employee_id)
+    return results
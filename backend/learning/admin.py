@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Employee, TSRSkillProfile, LearningEvent, LearningPath, Skill, LearningContent, LearningProgress, AssessmentQuestion, AssessmentSession, AssessmentResult, UserProfile
+from .models import Employee, TSRSkillProfile, LearningEvent, LearningPath, Skill, LearningContent, LearningProgress, AssessmentQuestion, AssessmentSession, AssessmentResult, UserProfile, LLMCall
 
 # Register your models here.
 admin.site.register(Employee)
@@ -13,5 +13,6 @@ admin.site.register(AssessmentSession)
 admin.site.register(AssessmentQuestion)
 admin.site.register(AssessmentResult)
 admin.site.register(UserProfile)
+admin.site.register(LLMCall)
 
 
@@ -0,0 +1,69 @@
+"""
+Lazy agent registry.
+
+Agents are registered by dotted path and only imported the first time
+one of their attributes is used, so importing `learning.views` (and
+every `manage.py` command that loads the URLconf) does not pay for the
+agents or the LLM SDK behind them:
+
+    from .agents import ProfileAgent
+
+    ProfileAgent.build(employee)   # imports profile_agent here
+"""
+import importlib
+import threading
+
+
+class AgentRegistry:
+    def __init__(self):
+        self._paths = {}
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, path):
+        self._paths[name] = path
+
+    def get(self, name):
+        agent = self._loaded.get(name)
+        if agent is None:
+            with self._lock:
+                agent = self._loaded.get(name)
+                if agent is None:
+                    module_path, attr = self._paths[name].rsplit(".", 1)
+                    agent = getattr(importlib.import_module(module_path), attr)
+                    self._loaded[name] = agent
+        return agent
+
+    def loaded(self):
+        return sorted(self._loaded)
+
+    def lazy(self, name):
+        return LazyAgent(self, name)
+
+
+class LazyAgent:
+    """
+    Stand-in that resolves the real agent class on first attribute access.
+    """
+
+    def __init__(self, registry, name):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self):
+        return f"<LazyAgent {self._name}>"
+
+
+registry = AgentRegistry()
+registry.register("PlannerAgent", "learning.agents.planner_agent.PlannerAgent")
+registry.register("ProfileAgent", "learning.agents.profile_agent.ProfileAgent")
+registry.register("RecommenderAgent", "learning.agents.recommender_agent.RecommenderAgent")
+registry.register("TrackerAgent", "learning.agents.tracker_agent.TrackerAgent")
+
+PlannerAgent = registry.lazy("PlannerAgent")
+ProfileAgent = registry.lazy("ProfileAgent")
+RecommenderAgent = registry.lazy("RecommenderAgent")
+TrackerAgent = registry.lazy("TrackerAgent")
@@ -0,0 +1,131 @@
+# Rank learning content and pack it into weeks, fully local (no LLM call)
+
+PASS_SCORE = 70
+
+# Gap (70 - score) above which a learner starts from beginner material,
+# and above which intermediate material is the right level.
+BEGINNER_GAP = 40
+INTERMEDIATE_GAP = 15
+
+DIFFICULTY_LEVELS = {
+    "beginner": 0, "easy": 0,
+    "intermediate": 1, "medium": 1,
+    "advanced": 2, "hard": 2,
+}
+
+CONTENT_TYPE_WEIGHTS = {"VIDEO": 1.0, "ARTICLE": 0.9}
+
+# Finish what you started before opening something new.
+IN_PROGRESS_BOOST = 1.25
+
+
+class WeekRoom:
+    """
+    Minutes left in each week, kept in a max segment tree so the first
+    week with enough room is found in O(log weeks) instead of scanning
+    every open week. Weeks not opened yet have the whole budget, so they
+    are found after every open week that is too full.
+    """
+
+    def __init__(self, max_weeks, budget):
+        self.size = 1
+        while self.size < max_weeks:
+            self.size *= 2
+        self.tree = [budget] * (2 * self.size)
+        self.weeks = 0  # weeks opened so far
+
+    def first_fit(self, minutes):
+        """
+        Index of the first week with at least `minutes` left, or None.
+        """
+        if self.tree[1] < minutes:
+            return None
+        node = 1
+        while node < self.size:
+            node = 2 * node if self.tree[2 * node] >= minutes else 2 * node + 1
+        return node - self.size
+
+    def take(self, week, minutes):
+        node = week + self.size
+        self.tree[node] -= minutes
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+        self.weeks = max(self.weeks, week + 1)
+
+
+class PlannerAgent:
+    @staticmethod
+    def gap(score):
+        return max(0, PASS_SCORE - score)
+
+    @staticmethod
+    def priority(item, gap):
+        """
+        Value of one content item: how far the learner is below the bar on
+        its skill, scaled by how well its difficulty suits that gap and by
+        content type. Between 0 and ~1.25.
+        """
+        level = DIFFICULTY_LEVELS.get((item.get("difficulty") or "").lower(), 1)
+        if gap > BEGINNER_GAP:
+            target = 0
+        elif gap > INTERMEDIATE_GAP:
+            target = 1
+        else:
+            target = 2
+        fit = 1 - abs(level - target) / 2
+
+        value = gap / PASS_SCORE * (0.5 + 0.5 * fit)
+        value *= CONTENT_TYPE_WEIGHTS.get(item.get("content_type"), 1.0)
+        if item.get("status") == "IN_PROGRESS":
+            value *= IN_PROGRESS_BOOST
+        return value
+
+    @staticmethod
+    def plan(items, gaps, weekly_hours):
+        """
+        Orders `items` (learning path dicts with "skill", "duration" in
+        minutes, "difficulty", "content_type" and "status") and assigns
+        each a "week" so no week exceeds `weekly_hours`.
+
+        Greedy knapsack: items are sorted by value per minute and each goes
+        into the first week with room left; an item longer than a whole
+        week gets a week to itself. Completed items are listed last with
+        no week. Runs in-process with no queries, in O(n log n): the sort,
+        plus a WeekRoom lookup per item.
+        """
+        budget = max(1, round(weekly_hours * 60))
+
+        todo = []
+        done = []
+        for item in items:
+            if item.get("status") == "DONE":
+                done.append({**item, "priority": 0.0, "week": None})
+                continue
+            value = PlannerAgent.priority(item, gaps.get(item["skill"], 0))
+            todo.append({**item, "priority": round(value, 4)})
+
+        todo.sort(key=lambda i: (
+            -i["priority"] / max(i.get("duration") or 0, 1),
+            -i["priority"],
+            i.get("content_id", 0),
+        ))
+
+        room = WeekRoom(len(todo), budget)
+        for item in todo:
+            minutes = item.get("duration") or 0
+            week = room.first_fit(minutes)
+            if week is None:
+                week = room.weeks
+            room.take(week, minutes)
+            item["week"] = week + 1
+
+        # Within a week, biggest gaps first and easier material before harder.
+        todo.sort(key=lambda i: (
+            i["week"],
+            -gaps.get(i["skill"], 0),
+            DIFFICULTY_LEVELS.get((i.get("difficulty") or "").lower(), 1),
+            -i["priority"],
+        ))
+        return todo + done
@@ -1,17 +1,57 @@
-import os,json
-from google import genai
-from ..models import TSRSkillProfile
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+from ..llm import LLMError, get_client
+from ..models import TSRSkillProfile
 
 # Convert raw HR data → meaningful skill profile
 
+# Last good profile per employee, served while the LLM is unavailable.
+PROFILE_CACHE_KEY = "profile_agent:last:{}"
+
+
 class ProfileAgent:
     @staticmethod
     def build(employee):
         tsr = TSRSkillProfile.objects.filter(tsr_role=employee.tsr_role).first()
-        
-        prompt = f"""
+
+        client = get_client()
+        if not client.is_available():
+            return ProfileAgent.fallback(employee, tsr)
+
+        try:
+            profile = client.generate_json(ProfileAgent.prompt(employee, tsr), caller="ProfileAgent")
+        except LLMError as e:
+            print(f"Error generating profile: {e}")
+            return ProfileAgent.fallback(employee, tsr)
+
+        cache.set(PROFILE_CACHE_KEY.format(employee.id), profile, None)
+        return profile
+
+    @staticmethod
+    async def abuild(employee):
+        """
+        Async `build` for ASGI views; the event loop is free while the
+        model is answering.
+        """
+        tsr = await TSRSkillProfile.objects.filter(tsr_role=employee.tsr_role).afirst()
+
+        client = get_client()
+        if not client.is_available():
+            return await sync_to_async(ProfileAgent.fallback)(employee, tsr)
+
+        try:
+            profile = await client.agenerate_json(ProfileAgent.prompt(employee, tsr), caller="ProfileAgent")
+        except LLMError as e:
+            print(f"Error generating profile: {e}")
+            return await sync_to_async(ProfileAgent.fallback)(employee, tsr)
+
+        await cache.aset(PROFILE_CACHE_KEY.format(employee.id), profile, None)
+        return profile
+
+    @staticmethod
+    def prompt(employee, tsr):
+        return f"""
         Analyze employee skills against TSR expectations.
         Return ONLY JSON.
         {{
@@ -25,47 +65,21 @@ class ProfileAgent:
         Experience: {employee.experience_years}
         """
 
-        try:
-            resp = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt,
-            )
-        except Exception as e:
-            error_str = str(e).lower()
-            if "resource_exhausted" in error_str or "quota" in error_str or "rate" in error_str:
-                print(f"Gemini API quota exceeded: {e}")
-                return {"strengths": [], "weaknesses": [], "summary": "API quota exceeded. Please try again later."}
-            else:
-                print(f"Error generating profile: {e}")
-                return {"strengths": [], "weaknesses": [], "summary": f"Error: {str(e)}"}
-        
-        print(f"Response object: {resp}")
-        print(f"Response type: {type(resp)}")
-        
-        # Handle Gemini response properly
-        if hasattr(resp, 'candidates') and resp.candidates:
-            response_text = resp.candidates[0].content.parts[0].text
-        elif hasattr(resp, 'text'):
-            response_text = resp.text
-        else:
-            response_text = str(resp)
-            
-        print(f"Response text: {response_text}")
-        
-        if not response_text or response_text.strip() == "":
-            return {"strengths": [], "weaknesses": [], "summary": "No response received"}
-        
-        try:
-            # Clean up markdown code blocks if present
-            cleaned_text = response_text.strip()
-            if cleaned_text.startswith("```"):
-                cleaned_text = cleaned_text.split("```")[1]
-                if cleaned_text.startswith("json"):
-                    cleaned_text = cleaned_text[4:]
-            cleaned_text = cleaned_text.strip()
-            
-            return json.loads(cleaned_text)
-        except json.JSONDecodeError as e:
-            print(f"JSONDecodeError: {e}")
-            print(f"Response text repr: {repr(response_text)}")
-            return {"strengths": [], "weaknesses": [], "summary": f"Failed to parse response: {str(e)}"}
\ No newline at end of file
+    @staticmethod
+    def fallback(employee, tsr):
+        """
+        Degraded profile that never touches the network: the last good
+        profile if we have one, otherwise a plain skill comparison.
+        """
+        cached = cache.get(PROFILE_CACHE_KEY.format(employee.id))
+        if cached:
+            return {**cached, "degraded": True}
+
+        current = {s.lower() for s in employee.get_current_skills()}
+        expected = tsr.get_expected_skills() if tsr else []
+        return {
+            "strengths": [s for s in expected if s.lower() in current],
+            "weaknesses": [s for s in expected if s.lower() not in current],
+            "summary": "AI summary is temporarily unavailable. Showing your skills compared with your TSR role.",
+            "degraded": True,
+        }
@@ -1,8 +1,7 @@
-import os,json
-from google import genai
-from ..models import TSRSkillProfile
+from asgiref.sync import sync_to_async
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+from ..llm import LLMError, LLMResponseError, get_client
+from ..models import TSRSkillProfile
 
 # Identify gaps, Generate ordered learning path
 
@@ -11,7 +10,43 @@ class RecommenderAgent:
     def recommend(employee, assessment=None):
         tsr = TSRSkillProfile.objects.filter(tsr_role=employee.tsr_role).first()
 
-        prompt = f"""
+        client = get_client()
+        if not client.is_available():
+            return RecommenderAgent.fallback(employee, tsr)
+
+        try:
+            return client.generate_json(
+                RecommenderAgent.prompt(employee, tsr, assessment), caller="RecommenderAgent"
+            )
+        except LLMResponseError as e:
+            print(f"Error parsing recommendation: {e}")
+            return {"matched_skills": [], "missing_skills": [], "learning_path": str(e)}
+        except LLMError as e:
+            print(f"Error generating recommendation: {e}")
+            return RecommenderAgent.fallback(employee, tsr)
+
+    @staticmethod
+    async def arecommend(employee, assessment=None):
+        tsr = await TSRSkillProfile.objects.filter(tsr_role=employee.tsr_role).afirst()
+
+        client = get_client()
+        if not client.is_available():
+            return await sync_to_async(RecommenderAgent.fallback)(employee, tsr)
+
+        try:
+            return await client.agenerate_json(
+                RecommenderAgent.prompt(employee, tsr, assessment), caller="RecommenderAgent"
+            )
+        except LLMResponseError as e:
+            print(f"Error parsing recommendation: {e}")
+            return {"matched_skills": [], "missing_skills": [], "learning_path": str(e)}
+        except LLMError as e:
+            print(f"Error generating recommendation: {e}")
+            return await sync_to_async(RecommenderAgent.fallback)(employee, tsr)
+
+    @staticmethod
+    def prompt(employee, tsr, assessment=None):
+        return f"""
         Compare employee skills vs TSR skills.
         Treat both core and nice-to-have TSR skills as gaps if employee does not have them.
         Return ONLY JSON.
@@ -28,36 +63,21 @@ class RecommenderAgent:
         Assessment = {assessment}
         """
 
-        resp = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-        )
-
-        # Handle Gemini response properly
-        if hasattr(resp, 'candidates') and resp.candidates:
-            response_text = resp.candidates[0].content.parts[0].text
-        elif hasattr(resp, 'text'):
-            response_text = resp.text
-        else:
-            response_text = str(resp)
-            
-        print(f"Response text: {response_text}")
-
-        if not response_text or response_text.strip() == "":
-            return {"matched_skills": [], "missing_skills": [], "learning_path": "No response received"}
-        
-        try:
-            # Clean up markdown code blocks if present
-            cleaned_text = response_text.strip()
-            if cleaned_text.startswith("```"):
-                cleaned_text = cleaned_text.split("```")[1]
-                if cleaned_text.startswith("json"):
-                    cleaned_text = cleaned_text[4:]
-            cleaned_text = cleaned_text.strip()
-            
-            return json.loads(cleaned_text)
-        except json.JSONDecodeError as e:
-            print(f"JSONDecodeError: {e}")
-            print(f"Response text repr: {repr(response_text)}")
-            return {"matched_skills": [], "missing_skills": [], "learning_path": f"Failed to parse response: {str(e)}"}
-        
\ No newline at end of file
+    @staticmethod
+    def fallback(employee, tsr):
+        """
+        Deterministic gap analysis (set difference against the TSR role),
+        used while the LLM is unavailable.
+        """
+        current = {s.lower() for s in employee.get_current_skills()}
+        expected = tsr.get_expected_skills() if tsr else []
+        missing = [s for s in expected if s.lower() not in current]
+        return {
+            "matched_skills": [s for s in expected if s.lower() in current],
+            "missing_skills": missing,
+            "learning_path": [
+                {"title": f"Learn {skill}", "description": "", "estimated_hours": 4}
+                for skill in missing
+            ],
+            "degraded": True,
+        }
@@ -1,13 +1,17 @@
 import json
 from ..models import LearningEvent
+from .. import write_coalescer
 
 # Track learning behavior, Detect stagnation later
 
 class TrackerAgent:
     @staticmethod
     def record(employee, event_type, metadata=None):
-        return LearningEvent.objects.create(
-            employee=employee,
+        # Nobody reads an event back right away: queue it for the next
+        # coalesced batch instead of waiting for the commit.
+        write_coalescer.defer(
+            LearningEvent.objects.create,
+            Employee=employee,
             event_type=event_type,
             metadata=json.dumps(metadata or {})
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,159 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import AnalyticsSnapshot, AssessmentResult, AssessmentSession, Employee, LearningProgress
+
+# Daily analytics time series.
+#
+# admin_analytics recomputes current totals from the raw tables; trends
+# would mean recomputing them for every past day. Instead
+# `snapshot_analytics` (run daily, e.g. from cron) stores one
+# AnalyticsSnapshot row per department plus one org-wide row (department
+# "*") per day, and trend queries read those: a year of weekly points is
+# at most 366 snapshot rows per department, however large the raw tables.
+#
+# Downsampling to week/month buckets happens in the database, per kind
+# of metric:
+#   - cumulative counts: the bucket's last (= largest) value
+#   - levels (headcount, gaps, learning status, average score): the
+#     bucket's average
+#   - daily activity: the bucket's total
+
+GAP_THRESHOLD = 70  # same "skill gap" cut-off as admin_analytics
+
+CUMULATIVE = ["assessments_completed"]
+LEVELS = ["employees", "avg_score", "open_skill_gaps", "learning_in_progress", "learning_done"]
+FLOWS = ["assessments_completed_day", "learning_completed_day"]
+
+BUCKETS = {
+    "day": F("date"),
+    "week": TruncWeek("date"),
+    "month": TruncMonth("date"),
+}
+
+
+def _by_department(queryset, department_field, **aggregates):
+    """
+    {department: {name: aggregate}} for `queryset` grouped by the
+    employee department at `department_field` (blank -> "").
+    """
+    rows = {}
+    for row in queryset.values(dept=F(department_field)).annotate(**aggregates).order_by():
+        rows[row.pop("dept") or ""] = row
+    return rows
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def compute_metrics(day):
+    """
+    {department: {metric: value}} for `day`, including AnalyticsSnapshot.ORG.
+    Cumulative and daily figures are as of the end of `day`; learning
+    status counts are as of now.
+    """
+    start, end = _day_bounds(day)
+    completed = AssessmentSession.objects.filter(status=AssessmentSession.COMPLETED, completed_at__lt=end)
+
+    employees = _by_department(Employee.objects.all(), "department", n=Count("id"))
+    sessions = _by_department(completed, "employee__department", n=Count("id"))
+    sessions_day = _by_department(completed.filter(completed_at__gte=start), "employee__department", n=Count("id"))
+    scores = _by_department(
+        AssessmentResult.objects.filter(session__in=completed),
+        "session__employee__department",
+        avg=Avg("score"), n=Count("id"),
+    )
+    latest_session = (
+        completed.filter(employee=OuterRef("session__employee"))
+        .order_by("-completed_at", "-id")
+        .values("id")[:1]
+    )
+    gaps = _by_department(
+        AssessmentResult.objects.filter(score__lt=GAP_THRESHOLD, session=Subquery(latest_session)),
+        "session__employee__department",
+        n=Count("id"),
+    )
+    learning = {}
+    for row in (
+        LearningProgress.objects
+        .values(dept=F("employee__department"), state=F("status"))
+        .annotate(n=Count("id"))
+        .order_by()
+    ):
+        learning.setdefault(row["dept"] or "", {})[row["state"]] = row["n"]
+    learning_day = _by_department(
+        LearningProgress.objects.filter(status=LearningProgress.DONE, updated_at__gte=start, updated_at__lt=end),
+        "employee__department",
+        n=Count("id"),
+    )
+
+    departments = set(employees) | set(sessions) | set(learning)
+    metrics = {}
+    for dept in departments:
+        metrics[dept] = {
+            "employees": employees.get(dept, {}).get("n", 0),
+            "assessments_completed": sessions.get(dept, {}).get("n", 0),
+            "avg_score": scores.get(dept, {}).get("avg"),
+            "open_skill_gaps": gaps.get(dept, {}).get("n", 0),
+            "learning_in_progress": learning.get(dept, {}).get(LearningProgress.IN_PROGRESS, 0),
+            "learning_done": learning.get(dept, {}).get(LearningProgress.DONE, 0),
+            "assessments_completed_day": sessions_day.get(dept, {}).get("n", 0),
+            "learning_completed_day": learning_day.get(dept, {}).get("n", 0),
+        }
+
+    org = {name: sum(m[name] for m in metrics.values()) for name in CUMULATIVE + LEVELS + FLOWS if name != "avg_score"}
+    scored = sum(s["n"] for s in scores.values())
+    org["avg_score"] = sum(s["avg"] * s["n"] for s in scores.values()) / scored if scored else None
+    metrics[AnalyticsSnapshot.ORG] = org
+    return metrics
+
+
+def take_snapshot(day=None):
+    """
+    Stores (or replaces) the snapshot rows for `day` (default: today).
+    Returns how many rows were written.
+    """
+    day = day or timezone.localdate()
+    metrics = compute_metrics(day)
+    with transaction.atomic():
+        AnalyticsSnapshot.objects.filter(date=day).delete()
+        AnalyticsSnapshot.objects.bulk_create([
+            AnalyticsSnapshot(date=day, department=dept, **values)
+            for dept, values in metrics.items()
+        ])
+    return len(metrics)
+
+
+def trend(start, end, bucket="day", department=AnalyticsSnapshot.ORG):
+    """
+    Snapshot metrics between `start` and `end` (dates, inclusive) for one
+    department, one point per bucket ("day", "week" or "month").
+    """
+    aggregates = {
+        **{name: Max(name) for name in CUMULATIVE},
+        **{name: Avg(name) for name in LEVELS},
+        **{name: Sum(name) for name in FLOWS},
+        "days": Count("id"),
+    }
+    rows = (
+        AnalyticsSnapshot.objects
+        .filter(department=department, date__gte=start, date__lte=end)
+        .annotate(period=BUCKETS[bucket])
+        .values("period")
+        .annotate(**aggregates)
+        .order_by("period")
+    )
+    points = []
+    for row in rows:
+        period = row.pop("period")
+        point = {"period": period.isoformat()}
+        for name, value in row.items():
+            point[name] = round(value, 1) if isinstance(value, float) else value
+        points.append(point)
+    return points
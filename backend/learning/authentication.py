@@ -0,0 +1,141 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import UserProfile
+
+# JWT authentication that trusts the signed claims (AUTH_TRUST_JWT_CLAIMS).
+#
+# Access tokens already carry `role` and `employee_id`. In claims mode the
+# request user is built from them, so authentication, IsAdmin /
+# IsAdminOrEmployee and ensure_employee_access run without a query; the
+# User row is only loaded if a view touches another attribute.
+#
+# Every user has an auth version in the cache, also stamped into tokens
+# as `auth_v`. Saving the user or their profile (role change, employee
+# link, deactivation) bumps it, so older tokens stop being trusted: their
+# profile is read from the DB once and cached per token until it expires.
+# The version must be visible to every worker, so claims mode is only on
+# by default with a shared cache (REDIS_URL or CACHE_DIR).
+
+VERSION_KEY = "auth:{}:v"
+TOKEN_PROFILE_KEY = "auth:token:{}:v{}"
+VERSION_CLAIM = "auth_v"
+
+
+def auth_version(user_id):
+    key = VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Time-based start so a version lost on eviction is never reused.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_user(user_id):
+    """
+    Stops trusting the claims of every token issued to the user so far.
+    """
+    key = VERSION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def token_claims(user):
+    """
+    Claims to put into a new token for `user`.
+    """
+    profile = UserProfile.objects.filter(user=user).values_list("role", "employee_id").first()
+    role, employee_id = profile or (None, None)
+    return {"role": role, "employee_id": employee_id, VERSION_CLAIM: auth_version(user.id)}
+
+
+class ClaimsProfile:
+    """
+    Stands in for request.user.userprofile: role and employee scope only.
+    """
+    __slots__ = ("user_id", "role", "employee_id")
+
+    def __init__(self, user_id, role, employee_id):
+        self.user_id = user_id
+        self.role = role
+        self.employee_id = employee_id
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    request.user in claims mode. id, role and employee scope come from the
+    token; any other attribute loads the real User on first use.
+    """
+
+    def __init__(self, user_id, role, employee_id):
+        super().__init__(lambda: User.objects.get(id=user_id))
+        # Straight into __dict__: LazyObject.__setattr__ would load the user.
+        self.__dict__["_claims"] = (user_id, role, employee_id)
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __bool__(self):
+        return True
+
+    @property
+    def id(self):
+        return self._claims[0]
+
+    pk = id
+
+    def __getattr__(self, name):
+        # Not a property: an AttributeError raised by a property would fall
+        # through to LazyObject.__getattr__ and load the user.
+        if name == "userprofile":
+            user_id, role, employee_id = self._claims
+            if role is None:
+                raise User.userprofile.RelatedObjectDoesNotExist("User has no userprofile.")
+            return ClaimsProfile(user_id, role, employee_id)
+        return super().__getattr__(name)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if not settings.AUTH_TRUST_JWT_CLAIMS:
+            return super().get_user(validated_token)
+
+        try:
+            # simplejwt stores the id as a string; keep request.user.id an int.
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError):
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        role, employee_id = self.resolve_profile(validated_token, user_id)
+        return ClaimsUser(user_id, role, employee_id)
+
+    def resolve_profile(self, token, user_id):
+        """
+        (role, employee_id) for the token: its own claims while they are
+        current, otherwise the DB's, cached per token.
+        """
+        version = auth_version(user_id)
+        if token.get(VERSION_CLAIM) == version:
+            return token.get("role"), token.get("employee_id")
+
+        key = TOKEN_PROFILE_KEY.format(token.get(api_settings.JTI_CLAIM), version)
+        profile = cache.get(key)
+        if profile is None:
+            user = User.objects.filter(id=user_id).values_list("is_active", "userprofile__role", "userprofile__employee_id").first()
+            if user is None or not user[0]:
+                raise AuthenticationFailed("User not found or inactive", code="user_inactive")
+            profile = user[1:]
+            cache.set(key, profile, max(1, int(token.get("exp", 0) - time.time())))
+        return profile
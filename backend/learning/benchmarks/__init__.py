@@ -0,0 +1,6 @@
+"""
+In-process micro-benchmarks for the learning app's hot paths.
+
+Run them with ``python manage.py bench``. Scenarios live in
+``scenarios.py`` and register themselves with ``@scenario``.
+"""
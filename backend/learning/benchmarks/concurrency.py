@@ -0,0 +1,114 @@
+import asyncio
+import queue
+import threading
+import time
+
+from django.db import connection
+from django.test import AsyncRequestFactory
+from rest_framework.test import APIRequestFactory
+
+from ..views_auth import CustomTokenObtainPairSerializer
+from .runner import summarize
+
+# Concurrency capacity of the LLM-bound endpoints, WSGI vs ASGI.
+#
+# Both sides serve the same burst of authenticated requests against a
+# fake LLM with injected latency. The WSGI side runs the sync views on a
+# fixed pool of threads, like a threaded gunicorn worker; the ASGI side
+# runs the async views on one event loop, like a uvicorn worker, with at
+# most `concurrency` requests in flight.
+
+
+def auth_header(user):
+    # Same claims as a login token, so claims-mode auth takes its fast path.
+    token = CustomTokenObtainPairSerializer.get_token(user).access_token
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _check(view, response):
+    if response.status_code >= 400:
+        raise RuntimeError(
+            f"{view.__name__} returned {response.status_code}: {response.content[:200]}"
+        )
+
+
+def _report(timings, wall_seconds):
+    return {
+        **summarize(timings),
+        "wall_ms": round(wall_seconds * 1000.0, 1),
+        "throughput_rps": round(len(timings) / wall_seconds, 1) if wall_seconds else 0.0,
+    }
+
+
+def wsgi_burst(view, calls, threads):
+    """
+    Serves `calls` ((method, path, headers, kwargs) tuples) with the sync
+    `view` on `threads` worker threads.
+    """
+    factory = APIRequestFactory()
+    pending = queue.Queue()
+    for call in calls:
+        pending.put(call)
+    timings = []
+    errors = []
+
+    def worker():
+        try:
+            while True:
+                try:
+                    method, path, headers, kwargs = pending.get_nowait()
+                except queue.Empty:
+                    return
+                request = getattr(factory, method)(path, headers=headers)
+                start = time.perf_counter()
+                response = view(request, **kwargs)
+                timings.append((time.perf_counter() - start) * 1000.0)
+                _check(view, response)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    wall = time.perf_counter() - started
+
+    if errors:
+        raise errors[0]
+    return _report(timings, wall)
+
+
+def asgi_burst(view, calls, concurrency):
+    """
+    Serves `calls` with the async `view` on one event loop, at most
+    `concurrency` at a time.
+    """
+    factory = AsyncRequestFactory()
+
+    async def burst():
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one(method, path, headers, kwargs):
+            async with limit:
+                request = getattr(factory, method)(path, headers=headers)
+                start = time.perf_counter()
+                response = await view(request, **kwargs)
+                elapsed = (time.perf_counter() - start) * 1000.0
+                _check(view, response)
+                return elapsed
+
+        return await asyncio.gather(*(one(*call) for call in calls))
+
+    started = time.perf_counter()
+    timings = asyncio.run(burst())
+    return _report(timings, time.perf_counter() - started)
+
+
+def run_async(view, request, **kwargs):
+    response = asyncio.run(view(request, **kwargs))
+    _check(view, response)
+    return response
@@ -0,0 +1,57 @@
+import math
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(timings_ms, queries=None):
+    timings_ms = sorted(timings_ms)
+    calls = len(timings_ms)
+    summary = {
+        "calls": calls,
+        "p50_ms": round(percentile(timings_ms, 50), 3),
+        "p95_ms": round(percentile(timings_ms, 95), 3),
+        "p99_ms": round(percentile(timings_ms, 99), 3),
+        "mean_ms": round(sum(timings_ms) / calls, 3) if calls else 0.0,
+        "max_ms": round(timings_ms[-1], 3) if calls else 0.0,
+    }
+    if queries is not None:
+        summary["queries_per_call"] = round(sum(queries) / calls, 2) if calls else 0.0
+    return summary
+
+
+def measure(run, iterations, warmup=1, prepare=None):
+    """
+    Times `run(ctx)` `iterations` times and returns latency percentiles
+    and the average number of SQL queries per call.
+
+    `prepare()` is called before every iteration (untimed) and its return
+    value is passed to `run`; use it for per-call state such as a fresh
+    assessment session.
+    """
+    for _ in range(warmup):
+        run(prepare() if prepare else None)
+
+    timings = []
+    queries = []
+    for _ in range(iterations):
+        ctx = prepare() if prepare else None
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            run(ctx)
+            elapsed = time.perf_counter() - start
+        timings.append(elapsed * 1000.0)
+        queries.append(len(captured.captured_queries))
+
+    return summarize(timings, queries)
@@ -0,0 +1,583 @@
+import itertools
+import json
+import math
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+from django.db import connection
+from django.test import AsyncRequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .. import adaptive, analytics_snapshots, content_index, fastjson, heartbeats, path_regeneration, profile_summaries, provisioning, views, views_async, views_auth
+from ..agents import ProfileAgent
+from ..llm import use_backend
+from ..llm.backends import FakeBackend
+from ..models import AssessmentQuestion, AssessmentSession, Employee, LearningContent, LearningProgress
+from .concurrency import asgi_burst, auth_header, run_async, wsgi_burst
+from .runner import measure, summarize
+from .synthetic import build_questions, extend_catalog
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    """
+    Registers `fn(org, options)` as a benchmark scenario.
+    """
+    def decorator(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return decorator
+
+
+def fake_llm(latency_ms=0):
+    """
+    Routes every LLM call through the deterministic FakeBackend.
+    """
+    return use_backend(FakeBackend(latency_ms=latency_ms))
+
+
+def _call(view, user, method="get", path="/", data=None, **kwargs):
+    factory = APIRequestFactory()
+    request = getattr(factory, method)(path, data=data, format="json")
+    force_authenticate(request, user=user)
+    response = view(request, **kwargs)
+    if response.status_code >= 400:
+        # DRF Responses are not rendered yet; their payload is in .data.
+        detail = getattr(response, "data", None) or response.content[:200]
+        raise RuntimeError(f"{view.__name__} returned {response.status_code}: {detail}")
+    return response
+
+
+@scenario("submit_assessment")
+def bench_submit_assessment(org, options):
+    rng = random.Random(org.seed)
+    employees = itertools.cycle(org.employees)
+    skills_by_name = {s.name: s for s in org.skills}
+
+    def prepare():
+        emp = next(employees)
+        session = AssessmentSession.objects.create(employee=emp)
+        skills = [skills_by_name[n] for n in emp.get_current_skills()]
+        questions = build_questions(session, skills, org.size.questions_per_skill, rng)
+        answers = {str(q.id): rng.choice("ABCD") for q in questions}
+        return emp, answers
+
+    def run(ctx):
+        emp, answers = ctx
+        _call(
+            views.submit_assessment, org.admin, "post",
+            data={"answers": answers}, employee_id=emp.id,
+        )
+
+    return measure(run, options["iterations"], options["warmup"], prepare)
+
+
+@scenario("submit_assessment_retry")
+def bench_submit_assessment_retry(org, options):
+    """
+    Duplicate submits (same body) of an assessment that already went
+    through: each should be a stored-result replay, not a regrade.
+    """
+    rng = random.Random(org.seed)
+    employees = itertools.cycle(org.employees)
+    skills_by_name = {s.name: s for s in org.skills}
+
+    def prepare():
+        emp = next(employees)
+        session = AssessmentSession.objects.create(employee=emp)
+        skills = [skills_by_name[n] for n in emp.get_current_skills()]
+        questions = build_questions(session, skills, org.size.questions_per_skill, rng)
+        data = {"answers": {str(q.id): rng.choice("ABCD") for q in questions}}
+        _call(views.submit_assessment, org.admin, "post", data=data, employee_id=emp.id)
+        return emp, data
+
+    def run(ctx):
+        emp, data = ctx
+        response = _call(views.submit_assessment, org.admin, "post", data=data, employee_id=emp.id)
+        if response.get("Idempotent-Replayed") != "true":
+            raise RuntimeError("duplicate submit was graded again")
+
+    return measure(run, options["iterations"], options["warmup"], prepare)
+
+
+@scenario("generate_learning_path")
+def bench_generate_learning_path(org, options):
+    employees = itertools.cycle(org.employees)
+
+    def run(_):
+        emp = next(employees)
+        _call(views.generate_learning_path, org.admin, "post", employee_id=emp.id)
+
+    return measure(run, options["iterations"], options["warmup"])
+
+
+@scenario("get_learning_path")
+def bench_get_learning_path(org, options):
+    employees = itertools.cycle(org.employees)
+
+    def run(_):
+        emp = next(employees)
+        _call(views.get_learning_path, org.admin, employee_id=emp.id)
+
+    return measure(run, options["iterations"], options["warmup"])
+
+
+@scenario("learner_dashboard")
+def bench_learner_dashboard(org, options):
+    # Cycles through a small working set, so after the first pass every
+    # call is served from the response cache.
+    employees = itertools.cycle(org.employees[:options.get("working_set", 20)])
+
+    def run(_):
+        emp = next(employees)
+        _call(views.learner_dashboard, org.admin, employee_id=emp.id)
+
+    # One process, so the in-memory cache is safe to turn on here.
+    with fake_llm(options["latency_ms"]), override_settings(RESPONSE_CACHE_ENABLED=True):
+        return measure(run, options["iterations"], options["warmup"])
+
+
+@scenario("admin_analytics")
+def bench_admin_analytics(org, options):
+    def run(_):
+        _call(views.admin_analytics, org.admin)
+
+    return measure(run, options["iterations"], options["warmup"])
+
+
+@scenario("llm_profile_parse")
+def bench_llm_profile_parse(org, options):
+    employees = itertools.cycle(org.employees)
+
+    def run(_):
+        result = ProfileAgent.build(next(employees))
+        if not result.get("strengths"):
+            raise RuntimeError(f"ProfileAgent returned {json.dumps(result)}")
+
+    with fake_llm(options["latency_ms"]):
+        return measure(run, options["iterations"], options["warmup"])
+
+
+@scenario("llm_generate_questions")
+def bench_llm_generate_questions(org, options):
+    employees = itertools.cycle(org.employees)
+
+    def prepare():
+        emp = next(employees)
+        AssessmentSession.objects.filter(
+            employee=emp, status=AssessmentSession.STARTED
+        ).update(status=AssessmentSession.COMPLETED)
+        AssessmentSession.objects.create(employee=emp)
+        return emp
+
+    def run(emp):
+        _call(
+            views.generate_assessment_questions, org.admin, "post",
+            employee_id=emp.id,
+        )
+
+    with fake_llm(options["latency_ms"]):
+        return measure(run, options["iterations"], options["warmup"], prepare)
+
+
+@scenario("adaptive_assessment")
+def bench_adaptive_assessment(org, options):
+    """
+    Simulated learners (true ability ~ N(0, 1) logits) take adaptive
+    assessments through the next/answer endpoints, answering each question
+    right with its Rasch probability. Reports questions per skill and the
+    score RMSE against the true score, next to the RMSE the fixed
+    5-question form gets for the same learners, and endpoint latency.
+    """
+    rng = random.Random(org.seed)
+    employees = itertools.cycle(org.employees)
+    fixed_items = views.QUESTIONS_PER_SKILL
+    timings = {"next": [], "answer": []}
+    errors = {"adaptive": [], "fixed": []}
+    items = []
+
+    def timed(name, *args, **kwargs):
+        start = time.perf_counter()
+        data = json.loads(_call(*args, **kwargs).content)
+        timings[name].append((time.perf_counter() - start) * 1000.0)
+        return data
+
+    with fake_llm(options["latency_ms"]):
+        for _ in range(options["iterations"]):
+            emp = next(employees)
+            AssessmentSession.objects.filter(
+                employee=emp, status=AssessmentSession.STARTED
+            ).update(status=AssessmentSession.COMPLETED)
+            _call(views.start_assessment, org.admin, "post", data={"mode": "adaptive"}, employee_id=emp.id)
+
+            ability = {skill: rng.gauss(0, 1) for skill in emp.get_current_skills()}
+            data = {"done": False}
+            while not data["done"]:
+                data = timed("next", views.adaptive_next_question, org.admin, "post", employee_id=emp.id)
+                if data["done"]:
+                    break
+                q = AssessmentQuestion.objects.get(id=data["question"]["id"])
+                p = adaptive.p_correct(ability[q.skill.name], q.rasch_difficulty)
+                data = timed(
+                    "answer", views.adaptive_answer, org.admin, "post",
+                    data={"question_id": q.id, "answer": q.correct_option if rng.random() < p else "-"},
+                    employee_id=emp.id,
+                )
+
+            for skill, theta in ability.items():
+                true_score = 100 * adaptive.p_correct(theta, 0.0)
+                errors["adaptive"].append(data["results"][skill] - true_score)
+                items.append(data["progress"][skill]["answered"])
+                right = sum(rng.random() < adaptive.p_correct(theta, 0.0) for _ in range(fixed_items))
+                errors["fixed"].append(100 * right / fixed_items - true_score)
+
+    def rmse(values):
+        return round(math.sqrt(sum(v * v for v in values) / len(values)), 2)
+
+    return {
+        "skills_assessed": len(items),
+        "questions_per_skill": {"adaptive": round(sum(items) / len(items), 2), "fixed": fixed_items},
+        "score_rmse": {"adaptive": rmse(errors["adaptive"]), "fixed": rmse(errors["fixed"])},
+        "next": summarize(timings["next"]),
+        "answer": summarize(timings["answer"]),
+    }
+
+
+@scenario("concurrency_wsgi_vs_asgi")
+def bench_concurrency_wsgi_vs_asgi(org, options):
+    """
+    Same burst of dashboard requests (one LLM call each, response cache
+    off) served by the sync views on a thread pool and by the async views
+    on an event loop; plus single-request question generation, where the
+    async view calls the LLM for every skill at once.
+    """
+    latency_ms = options["latency_ms"] or 200.0
+    threads = options.get("wsgi_threads", 8)
+    concurrency = options.get("concurrency", 100)
+    headers = auth_header(org.admin)
+    calls = [
+        ("get", f"/learner/{emp.id}/dashboard/", headers, {"employee_id": emp.id})
+        for emp in itertools.islice(itertools.cycle(org.employees), options["iterations"])
+    ]
+    result = {"llm_latency_ms": latency_ms, "wsgi_threads": threads, "asgi_concurrency": concurrency}
+
+    # Telemetry is off so its background writer can't lock SQLite mid-burst.
+    with override_settings(RESPONSE_CACHE_ENABLED=False, LLM_TELEMETRY_ENABLED=False):
+        with fake_llm(latency_ms) as backend:
+            result["wsgi"] = wsgi_burst(views.learner_dashboard, calls, threads)
+            result["wsgi"]["peak_llm_in_flight"] = backend.peak_in_flight
+        with fake_llm(latency_ms) as backend:
+            result["asgi"] = asgi_burst(views_async.learner_dashboard, calls, concurrency)
+            result["asgi"]["peak_llm_in_flight"] = backend.peak_in_flight
+
+        result["question_generation"] = _compare_question_generation(org, options, latency_ms, headers)
+
+    result["asgi_speedup"] = round(
+        result["asgi"]["throughput_rps"] / result["wsgi"]["throughput_rps"], 2
+    )
+    return result
+
+
+def _compare_question_generation(org, options, latency_ms, headers):
+    employees = itertools.cycle(org.employees)
+    factory = AsyncRequestFactory()
+    runs = max(1, min(options["iterations"], 10))
+    timings = {"sync": [], "async": []}
+
+    with fake_llm(latency_ms):
+        for _ in range(runs):
+            for mode in timings:
+                emp = next(employees)
+                AssessmentSession.objects.filter(
+                    employee=emp, status=AssessmentSession.STARTED
+                ).update(status=AssessmentSession.COMPLETED)
+                AssessmentSession.objects.create(employee=emp)
+
+                start = time.perf_counter()
+                if mode == "sync":
+                    _call(views.generate_assessment_questions, org.admin, "post", employee_id=emp.id)
+                else:
+                    request = factory.post(f"/learner/{emp.id}/assessment/generate/", headers=headers)
+                    run_async(views_async.generate_assessment_questions, request, employee_id=emp.id)
+                timings[mode].append((time.perf_counter() - start) * 1000.0)
+
+    return {mode: summarize(values) for mode, values in timings.items()}
+
+
+@scenario("content_related")
+def bench_content_related(org, options):
+    """
+    Builds the content similarity index (full, then incremental after
+    editing 1% of titles) and times related-content queries. Use
+    --index-items to grow the catalog first, e.g. --index-items 100000.
+    """
+    extend_catalog(org, options.get("index_items", 0), seed=org.seed)
+    ids = list(LearningContent.objects.values_list("id", flat=True))
+    rng = random.Random(org.seed)
+
+    with tempfile.TemporaryDirectory() as path, override_settings(CONTENT_INDEX_DIR=path):
+        result = {"items": len(ids), "full_build": content_index.build_index(full=True)}
+
+        edited = rng.sample(ids, max(1, len(ids) // 100))
+        for content in LearningContent.objects.filter(id__in=edited):
+            content.title += " (updated)"
+            content.save(update_fields=["title"])
+        result["incremental_build"] = content_index.build_index()
+
+        index = content_index.get_index()
+        result["similar"] = measure(
+            lambda _: index.similar(rng.choice(ids), k=10),
+            options["iterations"], options["warmup"],
+        )
+        result["endpoint"] = measure(
+            lambda _: _call(views.related_content, org.admin, content_id=rng.choice(ids)),
+            options["iterations"], options["warmup"],
+        )
+    return result
+
+
+@scenario("auth_overhead")
+def bench_auth_overhead(org, options):
+    """
+    An admin-only endpoint and an employee-scoped one (called by the
+    employee) with real bearer tokens, with and without
+    AUTH_TRUST_JWT_CLAIMS.
+    """
+    factory = APIRequestFactory()
+    admin_headers = auth_header(org.admin)
+    learners = [(emp, auth_header(org.employee_user(emp))) for emp in org.employees[:20]]
+    result = {}
+
+    def check(view, response):
+        if response.status_code >= 400:
+            raise RuntimeError(f"{view.__name__} returned {response.status_code}")
+
+    def run_admin(_):
+        check(views.admin_llm_usage, views.admin_llm_usage(factory.get("/admin/llm-usage/", headers=admin_headers)))
+
+    def run_learner(_):
+        emp, headers = rng.choice(learners)
+        request = factory.get(f"/learner/{emp.id}/progress-bar/", headers=headers)
+        check(views.learner_progress_bar, views.learner_progress_bar(request, employee_id=emp.id))
+
+    rng = random.Random(org.seed)
+    for mode, trusted in (("db_lookup", False), ("jwt_claims", True)):
+        with override_settings(AUTH_TRUST_JWT_CLAIMS=trusted):
+            result[mode] = {
+                "admin_llm_usage": measure(run_admin, options["iterations"], options["warmup"]),
+                "learner_progress_bar": measure(run_learner, options["iterations"], options["warmup"]),
+            }
+    return result
+
+
+@scenario("provision_accounts")
+def bench_provision_accounts(org, options):
+    """
+    Accounts for every employee of the org in one bulk run, against
+    register_user (one hashed account per call) on a small sample,
+    extrapolated to the same number of accounts.
+    """
+    # Only employees without an account yet (auth_overhead may have made some).
+    sample = list(Employee.objects.filter(userprofile__isnull=True).order_by("id")[:10])
+    register = []
+    for emp in sample:
+        start = time.perf_counter()
+        _call(views_auth.register_user, org.admin, "post", data={
+            "username": f"bench_register_{emp.id}",
+            "password": "bench-password",
+            "email": f"bench_register_{emp.id}@example.com",
+            "employee_id": emp.id,
+        })
+        register.append((time.perf_counter() - start) * 1000.0)
+
+    employees = Employee.objects.filter(userprofile__isnull=True)
+    count = employees.count()
+    start = time.perf_counter()
+    result = provisioning.provision_accounts(employees)
+    bulk_seconds = time.perf_counter() - start
+
+    return {
+        "accounts": len(result["created"]),
+        "bulk_seconds": round(bulk_seconds, 3),
+        "bulk_ms_per_account": round(bulk_seconds * 1000.0 / max(1, count), 3),
+        "register_user": summarize(register),
+        "register_user_seconds_extrapolated": round(sum(register) / max(1, len(register)) * count / 1000.0, 1),
+    }
+
+
+@scenario("analytics_trends")
+def bench_analytics_trends(org, options):
+    """
+    A year of daily snapshots, then weekly and monthly trend queries next
+    to the live admin_analytics totals.
+    """
+    today = timezone.localdate()
+    start = time.perf_counter()
+    for offset in range(364, -1, -1):
+        analytics_snapshots.take_snapshot(today - timedelta(days=offset))
+    snapshot_seconds = time.perf_counter() - start
+
+    factory = APIRequestFactory()
+
+    def trends(bucket):
+        def run(_):
+            request = factory.get(f"/admin/analytics/trends/?bucket={bucket}&from={today - timedelta(days=364)}")
+            force_authenticate(request, user=org.admin)
+            response = views.admin_analytics_trends(request)
+            if response.status_code >= 400:
+                raise RuntimeError(f"admin_analytics_trends returned {response.status_code}")
+        return run
+
+    return {
+        "snapshot_ms_per_day": round(snapshot_seconds * 1000.0 / 365, 2),
+        "trends_week": measure(trends("week"), options["iterations"], options["warmup"]),
+        "trends_month": measure(trends("month"), options["iterations"], options["warmup"]),
+        "admin_analytics": measure(lambda _: _call(views.admin_analytics, org.admin), options["iterations"], options["warmup"]),
+    }
+
+
+@scenario("regenerate_learning_paths")
+def bench_regenerate_learning_paths(org, options):
+    """
+    Every employee's path rebuilt by the chunked batch job (in process:
+    the bench database is in memory), against generate_learning_path per
+    employee, extrapolated to the whole org.
+    """
+    sample = org.employees[:min(20, len(org.employees))]
+    per_view = []
+    for emp in sample:
+        start = time.perf_counter()
+        _call(views.generate_learning_path, org.admin, "post", employee_id=emp.id)
+        per_view.append((time.perf_counter() - start) * 1000.0)
+
+    report = path_regeneration.regenerate_all(workers=1, restart=True, log=lambda *_: None)
+    return {
+        "employees": report["employees"],
+        "batch_seconds": report["seconds"],
+        "batch_employees_per_second": report["employees_per_second"],
+        "generate_learning_path": summarize(per_view),
+        "generate_learning_path_seconds_extrapolated": round(sum(per_view) / len(per_view) * len(org.employees) / 1000.0, 1),
+    }
+
+
+@scenario("profile_summaries")
+def bench_profile_summaries(org, options):
+    """
+    LLM requests for the nightly summary refresh (whole org on the first
+    night, then 10% of employees changed) and for uncached dashboard
+    builds, which now read the stored summary.
+    """
+    backend = FakeBackend(latency_ms=options["latency_ms"])
+    employees = itertools.cycle(org.employees)
+    with use_backend(backend):
+        start = time.perf_counter()
+        first = profile_summaries.summarize_changed(max_calls=len(org.employees))
+        first_seconds = time.perf_counter() - start
+
+        for emp in org.employees[::10]:
+            emp.experience_years += 1
+            emp.save(update_fields=["experience_years"])
+        nightly = profile_summaries.summarize_changed(max_calls=len(org.employees))
+
+        calls = backend.calls
+        dashboard = measure(
+            lambda _: views.build_learner_dashboard(next(employees).id), options["iterations"], options["warmup"]
+        )
+        dashboard_calls = backend.calls - calls
+
+    return {
+        "first_night": {**first, "seconds": round(first_seconds, 3)},
+        "nightly_10pct_changed": nightly,
+        "dashboard_builds": dashboard,
+        "dashboard_llm_calls": dashboard_calls,
+    }
+
+
+@scenario("json_payloads")
+def bench_json_payloads(org, options):
+    """
+    The largest JSON responses with each available encoder backend: the
+    admin employee list (whole org), learning path items and a full path
+    reload from learning-path/changes/, plus encoding the employee list
+    alone. learning_path_items_hydrated builds the same items from model
+    instances, as before the .values() fast path.
+    """
+    emp = org.employees[0]
+    _call(views.generate_learning_path, org.admin, "post", employee_id=emp.id)
+    rows = list(Employee.objects.values("id", "name", "tsr_role", "department", "experience_years"))
+
+    def hydrated(_):
+        items = [
+            {
+                "id": p.content.id,
+                "title": p.content.title,
+                "skill": p.content.skill.name,
+                "thumbnail": p.content.thumbnail_url,
+                "url": p.content.content_url,
+                "estimated_hours": p.content.duration_minutes,
+                "status": p.status,
+            }
+            for p in LearningProgress.objects.filter(employee=emp).select_related("content__skill")
+        ]
+        return fastjson.JsonResponse({"items": items})
+
+    iterations, warmup = options["iterations"], options["warmup"]
+    report = {"employees": len(rows)}
+    for backend in ["stdlib"] + (["orjson"] if fastjson.orjson is not None else []):
+        with override_settings(JSON_BACKEND=backend):
+            report[backend] = {
+                "employee_list": measure(lambda _: _call(views.list_employees, org.admin), iterations, warmup),
+                "encode_employee_list": measure(lambda _: fastjson.dumps(rows), iterations, warmup),
+                "learning_path_items": measure(lambda _: views.build_learning_path_items(emp.id), iterations, warmup),
+                "learning_path_items_hydrated": measure(hydrated, iterations, warmup),
+                # since=-1 is older than any history, so the whole path comes back.
+                "learning_path_full": measure(
+                    lambda _: _call(views.learning_path_changes, org.admin, path="/?since=-1", employee_id=emp.id),
+                    iterations, warmup,
+                ),
+            }
+    return report
+
+
+@scenario("progress_heartbeats")
+def bench_progress_heartbeats(org, options):
+    """
+    Learners each watching a video to the end with a heartbeat every
+    second, through learning_heartbeat. database_writes counts the INSERT
+    and UPDATE statements actually issued; per_tick_writes is what one
+    write per heartbeat would have cost.
+    """
+    content = LearningContent.objects.filter(duration_minutes__gt=0).order_by("id").first()
+    learners = org.employees[:min(20, len(org.employees))]
+    length = content.duration_minutes * 60
+    ticks = [(emp, second) for second in range(0, length + 1) for emp in learners]
+    ticks = ticks[:max(options["iterations"], len(learners))]
+    queue = iter(ticks)
+
+    def run(_):
+        emp, second = next(queue)
+        _call(
+            views.learning_heartbeat, org.admin, "post",
+            data={"content_id": content.id, "seconds": second}, employee_id=emp.id,
+        )
+
+    with CaptureQueriesContext(connection) as captured:
+        latency = measure(run, len(ticks), warmup=0)
+        heartbeats.flush()
+    writes = sum(1 for q in captured.captured_queries if q["sql"].lstrip().upper().startswith(("INSERT", "UPDATE")))
+    done = LearningProgress.objects.filter(content=content, employee__in=learners, status=LearningProgress.DONE).count()
+    return {
+        "learners": len(learners),
+        "video_seconds": length,
+        "heartbeats": len(ticks),
+        "per_tick_writes": len(ticks),
+        "database_writes": writes,
+        "completed": done,
+        "heartbeat": latency,
+    }
+
@@ -0,0 +1,129 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import OperationalError, connection
+
+from .runner import summarize
+
+# Sustained write throughput on a SQLite file with many threads, the
+# load learners put on start/complete content.
+#
+# Every mode runs in a fresh interpreter against its own database file,
+# since pragmas and coalescing are fixed at startup:
+#   default          stock pragmas, every write its own transaction
+#   tuned            SQLITE_PRODUCTION pragmas (WAL, synchronous=NORMAL, ...)
+#   tuned_coalesced  the pragmas plus group commit (WRITE_COALESCING)
+
+MODES = {
+    "default": {"SQLITE_PRODUCTION": "False", "WRITE_COALESCING": "False"},
+    "tuned": {"SQLITE_PRODUCTION": "True", "WRITE_COALESCING": "False"},
+    "tuned_coalesced": {"SQLITE_PRODUCTION": "True", "WRITE_COALESCING": "True"},
+}
+
+
+def write_load(threads, writes_per_thread, contents=200, seed=42):
+    """
+    Runs in the worker process, on the configured (fresh) database:
+    `threads` learners each start then complete random content through
+    the same write path as the views. Returns throughput, latency and
+    how many writes failed.
+    """
+    from .. import sqlite_tuning, write_coalescer
+    from ..models import Employee, LearningContent, Skill
+    from ..views import complete_progress, start_progress
+
+    call_command("migrate", verbosity=0)
+    skill = Skill.objects.create(name="Bench skill")
+    content_ids = [
+        c.id for c in LearningContent.objects.bulk_create([
+            LearningContent(skill=skill, title=f"Content {i}", source="bench", content_url=f"https://example.com/{i}")
+            for i in range(contents)
+        ])
+    ]
+    employee_ids = [
+        e.id for e in Employee.objects.bulk_create([
+            Employee(name=f"Learner {i}", tsr_role="Bench") for i in range(threads)
+        ])
+    ]
+    pragmas = sqlite_tuning.current_pragmas(connection)
+    connection.close()
+
+    latencies = [[] for _ in range(threads)]
+    failures = [0] * threads
+    start_barrier = threading.Barrier(threads + 1)
+
+    def learner(index):
+        rng = random.Random(seed + index)
+        employee_id = employee_ids[index]
+        start_barrier.wait()
+        try:
+            for i in range(writes_per_thread):
+                content_id = rng.choice(content_ids)
+                write = start_progress if i % 2 == 0 else complete_progress
+                started = time.perf_counter()
+                try:
+                    write_coalescer.run(write, employee_id, content_id)
+                except OperationalError:
+                    failures[index] += 1
+                latencies[index].append((time.perf_counter() - started) * 1000.0)
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=learner, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    start_barrier.wait()
+    wall_start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - wall_start
+
+    writes = threads * writes_per_thread
+    coalescer = write_coalescer._coalescer
+    return {
+        "writes": writes,
+        "failed": sum(failures),
+        "wall_seconds": round(wall, 3),
+        "writes_per_second": round((writes - sum(failures)) / wall, 1) if wall else 0.0,
+        "latency": summarize([ms for per_thread in latencies for ms in per_thread]),
+        "transactions": coalescer.batches if coalescer else writes,
+        "pragmas": pragmas,
+    }
+
+
+def sqlite_write_report(threads=32, writes_per_thread=200, modes=None):
+    """
+    Runs write_load once per mode, each in a subprocess on a new file.
+    """
+    report = {"threads": threads, "writes_per_thread": writes_per_thread, "modes": {}}
+    for mode in modes or MODES:
+        with tempfile.TemporaryDirectory() as path:
+            env = {
+                **os.environ,
+                **MODES[mode],
+                "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings"),
+                "SQLITE_PATH": os.path.join(path, "bench.sqlite3"),
+            }
+            env.pop("DATABASE_URL", None)
+            proc = subprocess.run(
+                [
+                    sys.executable, "manage.py", "bench_sqlite_writes", "--worker",
+                    "--threads", str(threads), "--writes-per-thread", str(writes_per_thread),
+                ],
+                cwd=settings.BASE_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(f"{mode} run failed:\n{proc.stderr[-2000:]}")
+            report["modes"][mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+    return report
@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from .runner import summarize
+
+# Cold-start measurements. Each sample is a fresh interpreter, so nothing
+# is shared with the process running the benchmark.
+
+# What a gunicorn worker does before serving its first request.
+WORKER_BOOT = (
+    "import backend.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+    return env
+
+
+def _run(args):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        args,
+        cwd=settings.BASE_DIR,
+        env=_env(),
+        capture_output=True,
+        text=True,
+    )
+    elapsed = (time.perf_counter() - start) * 1000.0
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{proc.stderr[-2000:]}")
+    return elapsed, proc.stderr
+
+
+def parse_importtime(stderr):
+    """
+    Parses `python -X importtime` output into
+    (module, self_us, cumulative_us, depth) tuples.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def import_report(snippet=WORKER_BOOT, top=15):
+    """
+    Imports `snippet` under -X importtime and returns the total import
+    time plus the most expensive top-level packages and modules.
+    """
+    _, stderr = _run([sys.executable, "-X", "importtime", "-c", snippet])
+    rows = parse_importtime(stderr)
+
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    return {
+        "total_import_ms": round(sum(r[1] for r in rows) / 1000.0, 1),
+        "modules_imported": len(rows),
+        "top_packages_ms": {
+            name: round(us / 1000.0, 1)
+            for name, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]
+        },
+        "top_modules_cumulative_ms": {
+            name: round(cumulative / 1000.0, 1)
+            for name, _, cumulative, _ in sorted(rows, key=lambda r: -r[2])[:top]
+        },
+    }
+
+
+def wall_times(args, runs):
+    return summarize([_run(args)[0] for _ in range(runs)])
+
+
+def startup_report(runs=5, top=15):
+    manage = os.path.join(settings.BASE_DIR, "manage.py")
+    return {
+        "worker_boot": wall_times([sys.executable, "-c", WORKER_BOOT], runs),
+        "manage_check": wall_times([sys.executable, manage, "check"], runs),
+        "imports": import_report(WORKER_BOOT, top),
+    }
@@ -0,0 +1,214 @@
+import json
+import random
+from dataclasses import dataclass
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from ..models import (
+    AssessmentQuestion,
+    AssessmentResult,
+    AssessmentSession,
+    Employee,
+    LearningContent,
+    LearningProgress,
+    Skill,
+    TSRSkillProfile,
+    UserProfile,
+)
+
+# Deterministic synthetic organisation used by the benchmark suite.
+
+DEPARTMENTS = ["Engineering", "Data", "Support", "Platform", "Security", "QA"]
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+SOURCES = ["YouTube", "Internal", "Udemy", "Coursera"]
+TITLE_WORDS = [
+    ["Intro to", "Practical", "Advanced", "Hands-on", "Mastering", "Debugging", "Testing", "Scaling"],
+    ["Python", "Django", "SQL", "React", "Docker", "Kubernetes", "REST APIs", "Git", "Linux",
+     "AWS", "Pandas", "TypeScript", "Redis", "Kafka", "GraphQL", "Terraform", "Go", "Rust"],
+    ["basics", "in production", "patterns", "performance", "security", "workshop", "deep dive", "crash course"],
+]
+
+
+@dataclass
+class OrgSize:
+    employees: int = 200
+    skills: int = 30
+    contents_per_skill: int = 10
+    sessions_per_employee: int = 2
+    questions_per_skill: int = 5
+    skills_per_employee: int = 6
+    roles: int = 8
+
+
+@dataclass
+class SyntheticOrg:
+    size: OrgSize
+    seed: int
+    skills: list
+    employees: list
+    admin: User
+
+    def employee_user(self, employee):
+        """
+        Returns (creating on first use) an EMPLOYEE user linked to `employee`.
+        """
+        username = f"bench_emp_{employee.id}"
+        user = User.objects.filter(username=username).first()
+        if user:
+            return user
+
+        user = User.objects.create(username=username)
+        UserProfile.objects.filter(user=user).update(employee=employee)
+        return User.objects.select_related("userprofile").get(id=user.id)
+
+
+def generate_org(size=None, seed=42):
+    """
+    Populates the current database with a reproducible organisation.
+
+    The same `size` and `seed` always produce the same rows in the same
+    order, so results can be compared across commits.
+    """
+    size = size or OrgSize()
+    rng = random.Random(seed)
+
+    skills = Skill.objects.bulk_create([
+        Skill(
+            name=f"Skill {i:03d}",
+            category=Skill.CORE if i % 3 else Skill.NICE_TO_HAVE,
+        )
+        for i in range(size.skills)
+    ])
+    skill_names = [s.name for s in skills]
+    per_employee = min(size.skills_per_employee, len(skills))
+
+    TSRSkillProfile.objects.bulk_create([
+        TSRSkillProfile(
+            tsr_role=f"TSR Role {r}",
+            expected_skills=json.dumps(rng.sample(skill_names, per_employee)),
+        )
+        for r in range(size.roles)
+    ])
+
+    contents = LearningContent.objects.bulk_create([
+        LearningContent(
+            title=f"{skill.name} lesson {c}",
+            skill=skill,
+            content_type=rng.choice([LearningContent.VIDEO, LearningContent.ARTICLE]),
+            thumbnail_url=f"https://img.example.com/{skill.id}/{c}.jpg",
+            content_url=f"https://learn.example.com/{skill.id}/{c}",
+            duration_minutes=rng.randint(5, 120),
+            difficulty=rng.choice(DIFFICULTIES),
+            source=rng.choice(SOURCES),
+        )
+        for skill in skills
+        for c in range(size.contents_per_skill)
+    ])
+    contents_by_skill = {}
+    for content in contents:
+        contents_by_skill.setdefault(content.skill_id, []).append(content)
+
+    employees = Employee.objects.bulk_create([
+        Employee(
+            name=f"Employee {i:05d}",
+            email=f"employee{i}@example.com",
+            tsr_role=f"TSR Role {i % size.roles}",
+            department=DEPARTMENTS[i % len(DEPARTMENTS)],
+            experience_years=rng.randint(0, 20),
+            current_skills=json.dumps(rng.sample(skill_names, per_employee)),
+        )
+        for i in range(size.employees)
+    ])
+    skills_by_name = {s.name: s for s in skills}
+
+    now = timezone.now()
+    sessions = AssessmentSession.objects.bulk_create([
+        AssessmentSession(
+            employee=emp,
+            status=AssessmentSession.COMPLETED,
+            completed_at=now,
+        )
+        for emp in employees
+        for _ in range(size.sessions_per_employee)
+    ])
+
+    results = []
+    progress = []
+    for session in sessions:
+        emp_skills = session.employee.get_current_skills()
+        for name in emp_skills:
+            results.append(AssessmentResult(
+                session=session,
+                skill=skills_by_name[name],
+                score=rng.randint(0, 100),
+            ))
+
+    for emp in employees:
+        for name in emp.get_current_skills():
+            for content in contents_by_skill[skills_by_name[name].id][:3]:
+                progress.append(LearningProgress(
+                    employee=emp,
+                    content=content,
+                    status=rng.choice([
+                        LearningProgress.NOT_STARTED,
+                        LearningProgress.IN_PROGRESS,
+                        LearningProgress.DONE,
+                    ]),
+                ))
+
+    AssessmentResult.objects.bulk_create(results, batch_size=1000)
+    LearningProgress.objects.bulk_create(progress, batch_size=1000)
+
+    admin = User.objects.create(username="bench_admin")
+    UserProfile.objects.filter(user=admin).update(role="ADMIN")
+    admin = User.objects.select_related("userprofile").get(id=admin.id)
+
+    return SyntheticOrg(
+        size=size,
+        seed=seed,
+        skills=skills,
+        employees=employees,
+        admin=admin,
+    )
+
+
+def build_questions(session, skills, per_skill, rng):
+    """
+    Creates `per_skill` MCQs per skill for `session` and returns them.
+    """
+    return AssessmentQuestion.objects.bulk_create([
+        AssessmentQuestion(
+            session=session,
+            skill=skill,
+            question_text=f"{skill.name} question {n}",
+            options={k: f"{skill.name} option {k}" for k in "ABCD"},
+            correct_option=rng.choice("ABCD"),
+            difficulty="Medium",
+        )
+        for skill in skills
+        for n in range(per_skill)
+    ])
+
+
+def extend_catalog(org, total, seed=0):
+    """
+    Tops the catalog up to `total` LearningContent rows with varied,
+    realistic-looking titles (for index and search benchmarks).
+    """
+    rng = random.Random(seed)
+    missing = total - LearningContent.objects.count()
+    if missing <= 0:
+        return
+    LearningContent.objects.bulk_create([
+        LearningContent(
+            title=" ".join(rng.choice(words) for words in TITLE_WORDS) + f" #{i}",
+            skill=rng.choice(org.skills),
+            content_type=rng.choice([LearningContent.VIDEO, LearningContent.ARTICLE]),
+            content_url=f"https://learn.example.com/extra/{i}",
+            duration_minutes=rng.randint(5, 120),
+            difficulty=rng.choice(DIFFICULTIES),
+            source=rng.choice(SOURCES),
+        )
+        for i in range(missing)
+    ], batch_size=2000)
@@ -0,0 +1,153 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import response_cache
+from .models import AssessmentSession, Employee, LearningPath, LearningProgress, ProfileSummary
+
+# Conditional GET (ETag / Last-Modified) for the per-employee endpoints.
+#
+# Both validators are worked out before the view builds (or loads from
+# cache) its payload, so a matching If-None-Match / If-Modified-Since
+# returns 304 without any of that work.
+#
+# With the response cache on (a cache shared by every worker), the ETag is
+# the employee's cache version from response_cache and needs no query.
+# Without it, that version would only be bumped by writes in the same
+# process, so the ETag is instead a digest of the employee's write state
+# read from the DB in one query: the latest write time (to the
+# microsecond) of the employee row, profile summary, learning progress,
+# assessment sessions and learning path, plus the path version. Every
+# worker computes the same value.
+#
+# Last-Modified only has one-second resolution, so it is left out while
+# the latest write is still in the current second; otherwise a second
+# write in that same second would be hidden from If-Modified-Since.
+
+STATE_FIELDS = [
+    "updated_at", "summary_at", "progress_at", "started_at", "completed_at", "path_at", "path_version",
+]
+
+
+def employee_etag(name, employee_id):
+    return f'"{name}-{employee_id}-{response_cache.employee_version(employee_id)}"'
+
+
+def _latest(model, field, employee_field="employee"):
+    return Subquery(
+        model.objects
+        .filter(**{employee_field: OuterRef("pk"), f"{field}__isnull": False})
+        .order_by(f"-{field}")
+        .values(field)[:1]
+    )
+
+
+def employee_state(employee_id):
+    """
+    The employee's write state (STATE_FIELDS) in one query, or None if
+    the employee does not exist.
+    """
+    return (
+        Employee.objects
+        .filter(id=employee_id)
+        .annotate(
+            summary_at=_latest(ProfileSummary, "updated_at"),
+            progress_at=_latest(LearningProgress, "updated_at"),
+            started_at=_latest(AssessmentSession, "started_at"),
+            completed_at=_latest(AssessmentSession, "completed_at"),
+            path_at=_latest(LearningPath, "updated_at"),
+            path_version=_latest(LearningPath, "version"),
+        )
+        .values(*STATE_FIELDS)
+        .first()
+    )
+
+
+def state_etag(name, employee_id, state):
+    digest = hashlib.md5(repr([state[f] for f in STATE_FIELDS]).encode()).hexdigest()[:16]
+    return f'"{name}-{employee_id}-{digest}"'
+
+
+def employee_last_modified(state):
+    """
+    Last-Modified (whole seconds) for an employee_state(), or None if
+    nothing was written yet or the latest write is in the current second.
+    """
+    stamps = [value for field, value in state.items() if field != "path_version" and value]
+    if not stamps:
+        return None
+    latest = max(stamps).timestamp()
+    if int(latest) >= int(time.time()):
+        return None
+    return int(latest)
+
+
+def _preconditions(request, name, employee_id):
+    """
+    Returns (etag, last_modified, not_modified_response_or_None).
+
+    With the response cache on, the DB state is only read when the client
+    did not send If-None-Match (which takes precedence anyway).
+    """
+    etag, state = None, None
+    if settings.RESPONSE_CACHE_ENABLED:
+        etag = employee_etag(name, employee_id)
+        if not request.META.get("HTTP_IF_NONE_MATCH"):
+            state = employee_state(employee_id)
+    else:
+        state = employee_state(employee_id)
+        if state is not None:
+            etag = state_etag(name, employee_id, state)
+    last_modified = employee_last_modified(state) if state else None
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None and etag:
+        not_modified["ETag"] = etag
+    return etag, last_modified, not_modified
+
+
+def conditional_employee_response(request, name, employee_id, build):
+    """
+    Serves `name` for the employee with ETag/Last-Modified validators,
+    answering 304 when the client's copy is current. Otherwise falls
+    through to the response cache (and `build()` on a miss).
+    """
+    etag, last_modified, not_modified = _preconditions(request, name, employee_id)
+    if not_modified is not None:
+        return not_modified
+
+    response = response_cache.cached_employee_response(name, employee_id, build)
+    return _with_validators(response, etag, last_modified)
+
+
+async def aconditional_employee_response(request, name, employee_id, abuild):
+    """
+    Async `conditional_employee_response`; `abuild` is a coroutine function.
+    """
+    etag, last_modified, not_modified = await sync_to_async(_preconditions)(
+        request, name, employee_id
+    )
+    if not_modified is not None:
+        return not_modified
+
+    response = await response_cache.acached_employee_response(name, employee_id, abuild)
+    return _with_validators(response, etag, last_modified)
+
+
+def _validated(response):
+    return response.status_code == 200 and "no-store" not in response.get("Cache-Control", "")
+
+
+def _with_validators(response, etag, last_modified):
+    if _validated(response) and etag:
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+        # Let browsers keep a copy but revalidate on every use.
+        response["Cache-Control"] = "private, no-cache"
+    return response
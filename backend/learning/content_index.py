@@ -0,0 +1,453 @@
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import F
+
+# Similarity index over the LearningContent catalog.
+#
+# Each item's title, skill name and source are turned into word, bigram
+# and character-trigram features, hashed into CONTENT_INDEX_DIMS buckets
+# and TF-IDF weighted. Rows are very sparse (tens of buckets out of 2^18),
+# so the matrix is kept in sparse form as plain .npy arrays that are
+# memory-mapped at query time; every worker shares the OS page cache:
+#
+#   ids, hashes             per row: LearningContent id, crc32 of its text
+#   indptr, cols, tf        row-major (CSR) raw sublinear term frequencies
+#   w_indptr, w_cols,       row-major TF-IDF, L2-normalised per row
+#   weights
+#   col_ptr, col_rows,      column-major (CSC) copy of the TF-IDF rows:
+#   col_weights             the posting list of every bucket
+#
+# A query only walks the posting lists of its own buckets, so its cost
+# depends on how common its terms are, not on catalog size. Buckets found
+# in more than MAX_DF of the catalog say almost nothing about similarity
+# and would have the longest lists, so they are left out of the TF-IDF
+# rows like stop words (the raw TF keeps them, for later builds).
+#
+# Each build goes into its own directory under CONTENT_INDEX_DIR and
+# meta.json, which names the current one, is replaced last, so readers
+# never mix files from two builds. Builds are incremental: only content
+# whose indexed text changed (by hash) is re-tokenised; IDF and norms are
+# recomputed for every row from the stored TF, which is cheap.
+#
+# Catalog changes are counted in the ContentIndexState row (bumped by
+# signals), and each build records the count it indexed, so any process
+# (e.g. the cron running `build_content_index --if-stale`) can tell
+# whether the index is behind.
+#
+# numpy is imported lazily; nothing here is loaded at boot.
+
+FIELD_WEIGHTS = (("title", 1.0), ("skill__name", 1.5), ("source", 0.5))
+MAX_DF = 0.1
+MAX_DF_FLOOR = 100
+# Weakest match still worth suggesting for a sparse skill.
+MIN_RELATED_SCORE = 0.2
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+
+class IndexNotBuilt(Exception):
+    pass
+
+
+def features(row):
+    """
+    Weighted feature counts for one content row (a dict with the
+    FIELD_WEIGHTS keys).
+    """
+    counts = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        words = _WORD.findall((row.get(field) or "").lower())
+        for word in words:
+            counts["w:" + word] += weight
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                counts["c:" + padded[i:i + 3]] += weight * 0.5
+        for a, b in zip(words, words[1:]):
+            counts[f"b:{a} {b}"] += weight
+    return counts
+
+
+def text_hash(row):
+    return zlib.crc32("\x1f".join(row.get(f) or "" for f, _ in FIELD_WEIGHTS).encode())
+
+
+def hashed_tf(row, dims):
+    """
+    {bucket: sublinear TF} for one row. The top hash bit picks a sign so
+    colliding features tend to cancel rather than pile up.
+    """
+    vec = {}
+    for feature, count in features(row).items():
+        h = zlib.crc32(feature.encode())
+        tf = 1.0 + math.log(count) if count >= 1 else count
+        bucket = h % dims
+        vec[bucket] = vec.get(bucket, 0.0) + (tf if h & 0x80000000 else -tf)
+    return {b: v for b, v in vec.items() if v}
+
+
+def idf(df, rows, np):
+    return (np.log((1.0 + rows) / (1.0 + df)) + 1.0).astype(np.float32)
+
+
+def _index_dir():
+    return str(settings.CONTENT_INDEX_DIR)
+
+
+def _catalog():
+    from .models import LearningContent
+
+    return list(
+        LearningContent.objects
+        .order_by("id")
+        .values("id", "title", "source", "skill__name")
+    )
+
+
+def build_index(full=False, path=None):
+    """
+    Brings the on-disk index up to date with the catalog and returns a
+    summary of what changed.
+    """
+    import numpy as np
+
+    from .models import ContentIndexState
+
+    path = path or _index_dir()
+    dims = settings.CONTENT_INDEX_DIMS
+    os.makedirs(path, exist_ok=True)
+    started = time.perf_counter()
+    # Read first: changes made during the build leave the index stale.
+    changes = _state().changes
+
+    catalog = _catalog()
+    ids = np.array([r["id"] for r in catalog], dtype=np.int64)
+    hashes = np.array([text_hash(r) for r in catalog], dtype=np.uint32)
+
+    old = None if full else _load(path, np)
+    if old is not None and old["meta"]["dims"] != dims:
+        old = None
+    old_rows = {int(i): r for r, i in enumerate(old["ids"])} if old is not None else {}
+
+    cols, tfs = [], []
+    vectorised = 0
+    for pos, row in enumerate(catalog):
+        prev = old_rows.get(row["id"])
+        if prev is not None and old["hashes"][prev] == hashes[pos]:
+            start, end = old["indptr"][prev], old["indptr"][prev + 1]
+            cols.append(old["cols"][start:end])
+            tfs.append(old["tf"][start:end])
+            continue
+        vec = hashed_tf(row, dims)
+        buckets = sorted(vec)
+        cols.append(np.array(buckets, dtype=np.int32))
+        tfs.append(np.array([vec[b] for b in buckets], dtype=np.float32))
+        vectorised += 1
+
+    arrays = _assemble(ids, hashes, cols, tfs, dims, np)
+    meta = {"dims": dims, "rows": len(catalog), "nnz": int(len(arrays["cols"])),
+            "built_at": time.time(), "version": time.time_ns()}
+    _write(path, np, meta, arrays)
+    ContentIndexState.objects.filter(pk=1, built_changes__lt=changes).update(built_changes=changes)
+
+    return {
+        "full": old is None,
+        "rows": len(catalog),
+        "vectorised": vectorised,
+        "removed": len(set(old_rows) - set(ids.tolist())),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _assemble(ids, hashes, cols, tfs, dims, np):
+    rows = len(ids)
+    lengths = np.array([len(c) for c in cols], dtype=np.int64)
+    indptr = np.zeros(rows + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    cols = np.concatenate(cols) if rows else np.zeros(0, dtype=np.int32)
+    tf = np.concatenate(tfs) if rows else np.zeros(0, dtype=np.float32)
+
+    # TF-IDF over the whole catalog minus the too-common buckets, then
+    # L2-normalise each row.
+    df = np.bincount(cols, minlength=dims)
+    keep = (df <= max(MAX_DF * rows, MAX_DF_FLOOR))[cols]
+    entry_rows = np.repeat(np.arange(rows, dtype=np.int32), lengths)[keep]
+    w_cols = cols[keep]
+    weights = tf[keep] * idf(df, rows, np)[w_cols]
+    norms = np.sqrt(np.bincount(entry_rows, weights=weights * weights, minlength=rows))
+    norms[norms == 0] = 1.0
+    weights = (weights / norms[entry_rows]).astype(np.float32)
+    w_indptr = np.zeros(rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(entry_rows, minlength=rows), out=w_indptr[1:])
+
+    order = np.argsort(w_cols, kind="stable")
+    col_ptr = np.zeros(dims + 1, dtype=np.int64)
+    np.cumsum(np.bincount(w_cols, minlength=dims), out=col_ptr[1:])
+
+    return {
+        "ids": ids,
+        "hashes": hashes,
+        "indptr": indptr,
+        "cols": cols,
+        "tf": tf,
+        "df": df.astype(np.int32),
+        "w_indptr": w_indptr,
+        "w_cols": w_cols,
+        "weights": weights,
+        "col_ptr": col_ptr,
+        "col_rows": entry_rows[order],
+        "col_weights": weights[order],
+    }
+
+
+def _read_meta(path):
+    with open(os.path.join(path, "meta.json")) as fh:
+        return json.load(fh)
+
+
+def _load(path, np, names=None):
+    """
+    meta plus the named arrays (all by default), memory-mapped. None if
+    there is no usable index at `path`.
+    """
+    try:
+        meta = _read_meta(path)
+        build_dir = os.path.join(path, str(meta["version"]))
+        names = names or [n[:-4] for n in os.listdir(build_dir) if n.endswith(".npy")]
+        loaded = {"meta": meta}
+        for name in names:
+            loaded[name] = np.load(os.path.join(build_dir, f"{name}.npy"), mmap_mode="r")
+        return loaded
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+def _write(path, np, meta, arrays):
+    build_dir = os.path.join(path, str(meta["version"]))
+    os.makedirs(build_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(build_dir, f"{name}.npy"), array)
+
+    tmp = os.path.join(path, ".meta.json.tmp")
+    with open(tmp, "w") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+
+    # Older builds can go; a worker still mapping one keeps its pages
+    # until it reloads.
+    for name in os.listdir(path):
+        old = os.path.join(path, name)
+        if name.isdigit() and old != build_dir:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def _state():
+    from .models import ContentIndexState
+
+    state, _ = ContentIndexState.objects.get_or_create(pk=1)
+    return state
+
+
+def mark_stale():
+    """
+    Notes that the catalog changed since the last build; see
+    `build_content_index --if-stale`.
+    """
+    from .models import ContentIndexState
+
+    if not ContentIndexState.objects.filter(pk=1).update(changes=F("changes") + 1):
+        _state()
+        ContentIndexState.objects.filter(pk=1).update(changes=F("changes") + 1)
+
+
+def is_stale(path=None):
+    """
+    True if the catalog changed since the last build, or there is none.
+    """
+    path = path or _index_dir()
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        return True
+    state = _state()
+    return state.changes > state.built_changes
+
+
+# --------------------------------------------------
+# Queries
+# --------------------------------------------------
+
+class ContentIndex:
+    """
+    Read side of the index. Memory-maps one build; `get_index` swaps in a
+    new instance when a newer build lands.
+    """
+
+    ARRAYS = ["ids", "df", "w_indptr", "w_cols", "weights", "col_ptr", "col_rows", "col_weights"]
+
+    def __init__(self, path):
+        import numpy as np
+
+        self._np = np
+        loaded = _load(path, np, self.ARRAYS)
+        if loaded is None:
+            raise IndexNotBuilt(f"No content index in {path}; run manage.py build_content_index")
+        self.meta = loaded.pop("meta")
+        for name, array in loaded.items():
+            setattr(self, name, array)
+        self.rows = {int(i): r for r, i in enumerate(self.ids)}
+        rows = self.meta["rows"]
+        df = np.asarray(self.df)
+        self.idf = idf(df, rows, np)
+        # Same stop-bucket rule as the build, for free-text queries.
+        self.idf[df > max(MAX_DF * rows, MAX_DF_FLOOR)] = 0.0
+
+    def row_vector(self, row):
+        start, end = self.w_indptr[row], self.w_indptr[row + 1]
+        return self.w_cols[start:end], self.weights[start:end]
+
+    def text_vector(self, text):
+        np = self._np
+        vec = hashed_tf({"title": text}, self.meta["dims"])
+        cols = np.array(sorted(vec), dtype=np.int64)
+        weights = np.array([vec[c] for c in cols], dtype=np.float32) * self.idf[cols]
+        cols, weights = cols[weights != 0], weights[weights != 0]
+        norm = np.linalg.norm(weights)
+        return cols, (weights / norm if norm else weights)
+
+    def similar(self, content_id, k=10, diversity=0.3, candidates=100):
+        """
+        Up to `k` (content_id, score) pairs most like `content_id`,
+        diversified with MMR. Returns [] for content not in the index.
+        """
+        row = self.rows.get(content_id)
+        if row is None:
+            return []
+        return self.query(self.row_vector(row), k, diversity, candidates, exclude={row})
+
+    def search(self, text, k=10, diversity=0.3, candidates=100, exclude_ids=(), min_score=0.0):
+        exclude = {self.rows[i] for i in exclude_ids if i in self.rows}
+        return self.query(self.text_vector(text), k, diversity, candidates, exclude, min_score)
+
+    def query(self, vector, k=10, diversity=0.3, candidates=100, exclude=(), min_score=0.0):
+        """
+        Cosine similarity of a sparse (cols, weights) vector against every
+        row, accumulated over the posting lists of its buckets; then
+        Maximal Marginal Relevance picks `k` of the best `candidates`,
+        each step taking the one maximising
+
+            (1 - diversity) * sim(query, c) - diversity * max sim(c, picked)
+
+        so near-identical items don't crowd out the rest.
+        """
+        np = self._np
+        q_cols, q_weights = vector
+        if not len(self.ids) or not len(q_cols):
+            return []
+
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for col, weight in zip(q_cols.tolist(), q_weights.tolist()):
+            start, end = self.col_ptr[col], self.col_ptr[col + 1]
+            if start != end:
+                # A bucket lists each row at most once, so fancy += is safe.
+                scores[self.col_rows[start:end]] += weight * self.col_weights[start:end]
+        for row in exclude:
+            scores[row] = 0.0
+
+        n = min(candidates, len(scores))
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[scores[top] > min_score]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        if not len(top):
+            return []
+
+        relevance = scores[top]
+        if diversity <= 0:
+            picked = list(range(min(k, len(top))))
+        else:
+            picked = self._mmr(top, relevance, k, diversity)
+        return [(int(self.ids[top[i]]), round(float(relevance[i]), 4)) for i in picked]
+
+    def _mmr(self, top, relevance, k, diversity):
+        np = self._np
+        # Dense block over just the buckets the candidates use.
+        parts = [self.row_vector(r) for r in top.tolist()]
+        used, local = np.unique(np.concatenate([c for c, _ in parts]), return_inverse=True)
+        block = np.zeros((len(top), len(used)), dtype=np.float32)
+        offset = 0
+        for i, (cols, weights) in enumerate(parts):
+            block[i, local[offset:offset + len(cols)]] = weights
+            offset += len(cols)
+        pairwise = block @ block.T
+
+        picked = []
+        max_sim = np.zeros(len(top), dtype=np.float32)
+        available = np.ones(len(top), dtype=bool)
+        for _ in range(min(k, len(top))):
+            mmr = (1 - diversity) * relevance - diversity * max_sim
+            mmr[~available] = -np.inf
+            best = int(np.argmax(mmr))
+            picked.append(best)
+            available[best] = False
+            np.maximum(max_sim, pairwise[best], out=max_sim)
+        return picked
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Shared ContentIndex for this process, reloaded when meta.json is
+    replaced by a newer build. Raises IndexNotBuilt if there is none.
+    """
+    global _index
+    path = _index_dir()
+    try:
+        mtime = os.stat(os.path.join(path, "meta.json")).st_mtime_ns
+    except FileNotFoundError:
+        raise IndexNotBuilt(f"No content index in {path}; run manage.py build_content_index")
+
+    if _index is None or _index.mtime != mtime:
+        with _index_lock:
+            if _index is None or _index.mtime != mtime:
+                try:
+                    index = ContentIndex(path)
+                except IndexNotBuilt:
+                    # A build replaced meta.json while we were loading.
+                    index = ContentIndex(path)
+                index.mtime = mtime
+                _index = index
+    return _index
+
+
+def fill_sparse_skills(skill_counts, exclude_ids, minimum):
+    """
+    {skill name: [content ids]} of related catalog items for every skill
+    in `skill_counts` ({name: items it already has}) below `minimum`.
+    Empty when the index has not been built (or numpy is missing).
+    """
+    try:
+        index = get_index()
+    except (IndexNotBuilt, ImportError):
+        return {}
+
+    taken = set(exclude_ids)
+    extra = {}
+    for name, count in skill_counts.items():
+        if count >= minimum:
+            continue
+        hits = index.search(
+            name, k=minimum - count, exclude_ids=taken, min_score=MIN_RELATED_SCORE
+        )
+        if hits:
+            extra[name] = [content_id for content_id, _ in hits]
+            taken.update(extra[name])
+    return extra
@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Optional read replica (DATABASES["replica"], see settings.py).
+#
+# Nothing goes to the replica unless asked: read-only views are wrapped
+# in @replica_reads and read-only management commands use
+# `with use_replica():`. Inside such a block reads go to the replica and
+# writes still go to the primary; after the first write the rest of the
+# block reads from the primary too, so it sees its own changes.
+#
+# Replicas lag, so a user who just wrote (submitted an assessment,
+# generated a path, ...) is pinned to the primary for REPLICA_PIN_SECONDS:
+# PrimaryPinMiddleware notices any write during a request and stores the
+# pin in the cache, where @replica_reads checks it. With several workers
+# the cache must be shared (REDIS_URL / CACHE_DIR) for the pin to follow
+# the user.
+#
+# Without a replica alias every read goes to "default" as before.
+
+REPLICA = "replica"
+PIN_KEY = "db:pin:{}"
+
+# {"replica": bool, "wrote": bool} for the current request or block.
+_state = ContextVar("db_route", default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def pin_user(user_id):
+    cache.set(PIN_KEY.format(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    if user is None or not user.is_authenticated:
+        return False
+    return bool(cache.get(PIN_KEY.format(user.id)))
+
+
+@contextmanager
+def use_replica():
+    """
+    Sends reads in the block to the replica, if one is configured.
+    """
+    state = _state.get()
+    if state is None:
+        token = _state.set({"replica": replica_configured(), "wrote": False})
+        try:
+            yield
+        finally:
+            _state.reset(token)
+        return
+
+    previous = state["replica"]
+    state["replica"] = replica_configured()
+    try:
+        yield
+    finally:
+        state["replica"] = previous
+
+
+def replica_reads(view):
+    """
+    View decorator: serve the view from the replica unless the user is
+    pinned to the primary. Put it below @api_view so request.user is the
+    authenticated user.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_configured() or is_pinned(getattr(request, "user", None)):
+            return view(request, *args, **kwargs)
+        with use_replica():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state["replica"] and not state["wrote"]:
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state["wrote"] = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary.
+        return db != REPLICA
+
+
+class PrimaryPinMiddleware:
+    """
+    Tracks writes per request and pins the user to the primary after one.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_configured():
+            return self.get_response(request)
+
+        state = {"replica": False, "wrote": False}
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if state["wrote"]:
+            # DRF copies the authenticated user onto the Django request.
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_user(user.id)
+        return response
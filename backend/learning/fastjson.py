@@ -0,0 +1,92 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+# JSON encoding/decoding for API responses and request bodies.
+#
+# With orjson installed (pip install orjson) dumps()/loads() use it, which
+# serializes the large list payloads several times faster than the stdlib
+# encoder; without it, or with JSON_BACKEND=stdlib, they fall back to the
+# json module. The rest of the app only uses this module:
+#   - JsonResponse: drop-in for django.http.JsonResponse
+#   - renderers.FastJSONRenderer / FastJSONParser: DRF defaults (settings.py)
+#   - loads(): model JSON columns and raw request bodies
+#
+# Output is the same JSON either way. Datetimes, Decimals and anything
+# else orjson does not handle natively go through Django's (or DRF's)
+# encoder, so dates keep their existing format; the only visible
+# differences are no spaces after separators and non-ASCII written as
+# UTF-8 rather than \u escapes.
+#
+# Edge cases where orjson differs: NaN and Infinity are written as null
+# (the stdlib writes non-standard NaN) and rejected when parsing, and
+# integers beyond 64 bits are parsed as floats.
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+else:
+    # Numpy scalars (content index scores) are floats to the stdlib
+    # encoder; datetimes are left to `encoder` to keep their format.
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def backend():
+    """
+    "orjson" or "stdlib", per JSON_BACKEND ("auto" picks orjson if installed).
+    """
+    if settings.JSON_BACKEND == "stdlib" or orjson is None:
+        return "stdlib"
+    return "orjson"
+
+
+def dumps(obj, encoder=DjangoJSONEncoder):
+    """
+    `obj` as UTF-8 JSON bytes. `encoder` handles types the backend does
+    not (datetimes, Decimal, lazy strings, ...).
+    """
+    if backend() == "orjson":
+        try:
+            return orjson.dumps(
+                obj,
+                default=encoder().default,
+                option=OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, which the stdlib encodes; anything
+            # `encoder` rejects raises the stdlib's TypeError below.
+            pass
+    return json.dumps(obj, cls=encoder).encode("utf-8")
+
+
+def loads(data):
+    """
+    Parses JSON from str or bytes. Raises ValueError (a JSONDecodeError
+    with either backend) on bad input.
+    """
+    if backend() == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JsonResponse(HttpResponse):
+    """
+    django.http.JsonResponse through dumps(). A custom `json_dumps_params`
+    (indent, sort_keys, ...) uses the stdlib encoder as before.
+    """
+
+    def __init__(self, data, encoder=DjangoJSONEncoder, safe=True, json_dumps_params=None, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault("content_type", "application/json")
+        if json_dumps_params:
+            content = json.dumps(data, cls=encoder, **json_dumps_params)
+        else:
+            content = dumps(data, encoder)
+        super().__init__(content=content, **kwargs)
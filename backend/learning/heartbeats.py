@@ -0,0 +1,345 @@
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from . import response_cache, write_coalescer
+from .models import Employee, LearningContent, LearningProgress
+
+# Watch-progress heartbeats from the player (POST .../learning/heartbeat/).
+#
+# The player reports every few seconds, so heartbeats are not written as
+# they arrive. Each process keeps the furthest point reported per
+# (employee, content) in a HeartbeatBuffer and writes it only when:
+#   - it is the first heartbeat this process has seen for the pair
+#     (NOT_STARTED -> IN_PROGRESS),
+#   - it moved HEARTBEAT_MIN_DELTA_PERCENT points since the last write,
+#   - it reached LEARNING_COMPLETE_PERCENT (the content becomes DONE), or
+#   - HEARTBEAT_FLUSH_SECONDS passed with unwritten progress (a background
+#     thread flushes those, and whatever is left at exit).
+# A learner watching a 10 minute video at one heartbeat a second causes
+# ~10 writes instead of 600. Writes go through write_coalescer and update
+# every due row in one transaction.
+#
+# Progress only moves forward: seeking back or a late heartbeat from
+# another worker never lowers watched_percent, and DONE is never undone.
+#
+# Content durations are cached per process (at most DURATION_CACHE_SIZE,
+# dropped on save or delete in this process). Another process may still
+# accept a heartbeat for content deleted since, so persist() checks that
+# both the employee and the content exist; rows that fail anyway are
+# dropped, not retried.
+
+MAX_HEARTBEATS = 100
+DURATION_CACHE_SIZE = 10000
+
+_durations = {}
+
+
+def content_durations(ids):
+    """
+    {content id: duration in minutes} for those of `ids` that exist. Only
+    ids this process has not seen yet are queried.
+    """
+    missing = [i for i in ids if i not in _durations]
+    if missing:
+        if len(_durations) + len(missing) > DURATION_CACHE_SIZE:
+            _durations.clear()
+        _durations.update(
+            LearningContent.objects.filter(id__in=missing).values_list("id", "duration_minutes")
+        )
+    return {i: _durations[i] for i in ids if i in _durations}
+
+
+def forget_content(content_id):
+    """
+    Drops a content's cached duration (it was changed or deleted).
+    """
+    _durations.pop(content_id, None)
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+
+def parse(data):
+    """
+    [(content id, percent or None, seconds or None)] from a request body,
+    either one heartbeat ({"content_id", "percent" | "seconds"}) or
+    {"heartbeats": [...]}. Raises ValueError with a message for the client.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    beats = data["heartbeats"] if "heartbeats" in data else [data]
+    if not isinstance(beats, list) or not beats:
+        raise ValueError("heartbeats must be a non-empty list")
+    if len(beats) > MAX_HEARTBEATS:
+        raise ValueError(f"At most {MAX_HEARTBEATS} heartbeats per request")
+
+    parsed = []
+    for beat in beats:
+        if not isinstance(beat, dict) or not isinstance(beat.get("content_id"), int) or isinstance(beat["content_id"], bool):
+            raise ValueError("Each heartbeat needs an integer content_id")
+        percent, seconds = beat.get("percent"), beat.get("seconds")
+        if percent is None and seconds is None:
+            raise ValueError("Each heartbeat needs percent or seconds")
+        if (percent is not None and not _number(percent)) or (seconds is not None and not _number(seconds)):
+            raise ValueError("percent and seconds must be non-negative numbers")
+        parsed.append((beat["content_id"], percent, seconds))
+    return parsed
+
+
+def progress(percent, seconds, duration_minutes):
+    """
+    (percent 0-100, seconds) for a heartbeat, filling in whichever one the
+    player did not send from the content's duration.
+    """
+    length = (duration_minutes or 0) * 60
+    if percent is None:
+        percent = seconds * 100 / length if length else 0
+    if seconds is None:
+        seconds = percent * length / 100
+    return min(int(percent), 100), int(seconds)
+
+
+class _Entry:
+    __slots__ = ("percent", "seconds", "written", "pending_since", "seen")
+
+    def __init__(self):
+        self.percent = 0
+        self.seconds = 0
+        self.written = None  # percent last written; None = not yet
+        self.pending_since = None
+        self.seen = 0.0
+
+
+class HeartbeatBuffer:
+    def __init__(self, flush_seconds=30, min_delta=10, complete_percent=90):
+        self.flush_seconds = flush_seconds
+        self.min_delta = min_delta
+        self.complete_percent = complete_percent
+        self.heartbeats = 0
+        self.rows_written = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def add(self, employee_id, beats):
+        """
+        Records [(content id, percent, seconds)] for the employee. Returns
+        the (employee id, content id, percent, seconds) rows that should be
+        written now; the rest wait for the flush interval.
+        """
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for content_id, percent, seconds in beats:
+                self.heartbeats += 1
+                key = (employee_id, content_id)
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _Entry()
+                entry.seen = now
+                if entry.written is not None and percent <= entry.percent and seconds <= entry.seconds:
+                    continue
+                entry.percent = max(entry.percent, percent)
+                entry.seconds = max(entry.seconds, seconds)
+                if self._meaningful(entry):
+                    due.append(self._take(key, entry))
+                elif entry.pending_since is None:
+                    entry.pending_since = now
+        self._ensure_thread()
+        return due
+
+    def _meaningful(self, entry):
+        if entry.written is None:
+            return True
+        if entry.percent >= self.complete_percent > entry.written:
+            return True
+        return entry.percent - entry.written >= self.min_delta
+
+    def _take(self, key, entry):
+        entry.written = entry.percent
+        entry.pending_since = None
+        return (*key, entry.percent, entry.seconds)
+
+    def take_due(self, everything=False):
+        """
+        Rows whose progress has waited the flush interval (or all unwritten
+        rows), marked as written. Forgets pairs idle for a while.
+        """
+        now = time.monotonic()
+        idle = max(self.flush_seconds * 10, 600)
+        due = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.pending_since is not None:
+                    if everything or now - entry.pending_since >= self.flush_seconds:
+                        due.append(self._take(key, entry))
+                elif now - entry.seen > idle:
+                    del self._entries[key]
+        return due
+
+    def retry(self, rows):
+        """
+        Puts rows whose write failed back as unwritten.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for employee_id, content_id, _, _ in rows:
+                entry = self._entries.get((employee_id, content_id))
+                if entry is not None:
+                    entry.written = None
+                    entry.pending_since = now
+
+    def write(self, rows):
+        """
+        Writes `rows` (through the write coalescer) and returns
+        {(employee id, content id): status}.
+        """
+        if not rows:
+            return {}
+        try:
+            statuses, touched = write_coalescer.run(persist, rows)
+        except IntegrityError:
+            # Something was deleted since persist() checked: write the rows
+            # one by one and drop those that still fail.
+            statuses, touched = {}, set()
+            for i, row in enumerate(rows):
+                try:
+                    written, employees = write_coalescer.run(persist, [row])
+                except IntegrityError as e:
+                    print(f"Dropped heartbeat progress for employee {row[0]}, content {row[1]}: {e}")
+                    continue
+                except Exception:
+                    self.retry(rows[i:])
+                    raise
+                statuses.update(written)
+                touched |= employees
+        except Exception:
+            self.retry(rows)
+            raise
+        self.rows_written += len(statuses)
+        for employee_id in touched:
+            response_cache.invalidate_employee(employee_id)
+        return statuses
+
+    def flush(self, everything=True):
+        return self.write(self.take_due(everything))
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="heartbeat-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(max(1.0, self.flush_seconds / 4))
+            try:
+                self.flush(everything=False)
+            except Exception as e:
+                print(f"Heartbeat flush failed: {e}")
+            finally:
+                close_old_connections()
+
+
+def persist(rows):
+    """
+    Applies [(employee id, content id, percent, seconds)] to LearningProgress
+    in one transaction, creating missing records. Returns
+    ({(employee id, content id): status}, ids of employees whose records
+    changed). Rows for employees or contents that do not exist are dropped.
+    """
+    complete = settings.LEARNING_COMPLETE_PERCENT
+    wanted = {(e, c): (p, s) for e, c, p, s in rows}
+    employees = set(
+        Employee.objects.filter(id__in={e for e, _ in wanted}).values_list("id", flat=True)
+    )
+    contents = set(
+        LearningContent.objects.filter(id__in={c for _, c in wanted}).values_list("id", flat=True)
+    )
+    now = timezone.now()
+    statuses, created, changed = {}, [], []
+
+    with transaction.atomic():
+        existing = {
+            (p.employee_id, p.content_id): p
+            for p in LearningProgress.objects
+            .select_for_update()
+            .filter(employee_id__in=employees, content_id__in={c for _, c in wanted})
+            .only("id", "employee_id", "content_id", "status", "watched_percent", "watched_seconds")
+        }
+        for key, (percent, seconds) in wanted.items():
+            if key[0] not in employees or key[1] not in contents:
+                continue
+            record = existing.get(key)
+            if record is None:
+                record = LearningProgress(employee_id=key[0], content_id=key[1], updated_at=now)
+                created.append(record)
+            before = (record.status, record.watched_percent, record.watched_seconds)
+            record.watched_percent = max(record.watched_percent, percent)
+            record.watched_seconds = max(record.watched_seconds, seconds)
+            if record.status != LearningProgress.DONE:
+                record.status = LearningProgress.DONE if record.watched_percent >= complete else LearningProgress.IN_PROGRESS
+            if record.pk and before != (record.status, record.watched_percent, record.watched_seconds):
+                record.updated_at = now
+                changed.append(record)
+            statuses[key] = record.status
+
+        LearningProgress.objects.bulk_create(created)
+        LearningProgress.objects.bulk_update(changed, ["status", "watched_percent", "watched_seconds", "updated_at"])
+
+    return statuses, {p.employee_id for p in created + changed}
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = HeartbeatBuffer(
+                    flush_seconds=settings.HEARTBEAT_FLUSH_SECONDS,
+                    min_delta=settings.HEARTBEAT_MIN_DELTA_PERCENT,
+                    complete_percent=settings.LEARNING_COMPLETE_PERCENT,
+                )
+                atexit.register(_flush_at_exit)
+    return _buffer
+
+
+def record(employee_id, beats):
+    """
+    Buffers [(content id, percent, seconds)] for the employee and writes
+    whatever is due. Returns {content id: status} for the contents written
+    by this call.
+    """
+    buffer = get_buffer()
+    statuses = buffer.write(buffer.add(employee_id, beats))
+    return {content_id: status for (_, content_id), status in statuses.items()}
+
+
+def flush():
+    """
+    Writes all buffered progress now (e.g. before a batch job exits).
+    """
+    if _buffer is not None:
+        _buffer.flush()
+
+
+def _flush_at_exit():
+    try:
+        _buffer.flush()
+    except Exception as e:
+        print(f"Heartbeat flush at exit failed: {e}")
@@ -0,0 +1,65 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .models import IdempotencyRecord
+
+# Replay of stored responses for retried non-repeatable requests.
+#
+# The client sends an `Idempotency-Key` header; without one the key is a
+# hash of the request body, which covers double-clicks and blind client
+# retries. The first successful response is stored under the key in the
+# same transaction as the write it reports, so a duplicate either finds
+# the record (one indexed lookup, no regrading) or is serialized behind
+# the original by the row lock and finds it then.
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+
+
+def request_key(request):
+    key = request.META.get(HEADER, "").strip()
+    if key:
+        return key[:255]
+    return "body:" + hashlib.sha256(request.body).hexdigest()
+
+
+def replay(employee_id, endpoint, key):
+    """
+    The stored response for `key`, or None. Records older than
+    IDEMPOTENCY_TTL_HOURS are not replayed.
+    """
+    since = timezone.now() - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+    record = (
+        IdempotencyRecord.objects
+        .filter(employee_id=employee_id, endpoint=endpoint, key=key, created_at__gte=since)
+        .values_list("status_code", "response")
+        .first()
+    )
+    if record is None:
+        return None
+    status_code, content = record
+    response = HttpResponse(content, status=status_code, content_type="application/json")
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def store(employee_id, endpoint, key, response, session=None):
+    """
+    Saves `response` for `key` (replacing an expired record). Call inside
+    the transaction that makes the write the response describes.
+    """
+    IdempotencyRecord.objects.update_or_create(
+        employee_id=employee_id,
+        endpoint=endpoint,
+        key=key,
+        defaults={
+            "session": session,
+            "status_code": response.status_code,
+            "response": response.content.decode("utf-8"),
+            "created_at": timezone.now(),
+        },
+    )
+    return response
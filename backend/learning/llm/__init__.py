@@ -0,0 +1,43 @@
+"""
+Shared LLM client layer.
+
+Agents and views call the model through `get_client()` instead of
+building their own `genai.Client`:
+
+    from ..llm import get_client, LLMError
+
+    data = get_client().generate_json(prompt)
+
+The backend is chosen with the LLM_BACKEND setting ("gemini" or "fake").
+"""
+from .client import LLMClient, get_client, set_client, use_backend
+from .errors import (
+    LLMCircuitOpenError,
+    LLMError,
+    LLMQuotaError,
+    LLMResponseError,
+    LLMThrottledError,
+    LLMTimeoutError,
+    LLMUnavailableError,
+)
+from .parsing import extract_text, parse_json, strip_code_fences
+from .streaming import JSONObjectStream, iter_json_objects
+
+__all__ = [
+    "LLMClient",
+    "get_client",
+    "set_client",
+    "use_backend",
+    "LLMCircuitOpenError",
+    "LLMError",
+    "LLMQuotaError",
+    "LLMResponseError",
+    "LLMThrottledError",
+    "LLMTimeoutError",
+    "LLMUnavailableError",
+    "extract_text",
+    "parse_json",
+    "strip_code_fences",
+    "JSONObjectStream",
+    "iter_json_objects",
+]
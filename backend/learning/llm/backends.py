@@ -0,0 +1,341 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+from .errors import LLMError, LLMQuotaError, LLMTimeoutError, LLMUnavailableError
+from .parsing import extract_text
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    model: str
+    usage: dict = field(default_factory=dict)
+
+
+# --------------------------------------------------
+# Gemini
+# --------------------------------------------------
+
+def _retry_after(exc):
+    """
+    Reads the server's suggested wait (seconds) from a Gemini APIError.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+
+    details = exc.details.get("error", exc.details) if isinstance(exc.details, dict) else {}
+    for detail in details.get("details", []) if isinstance(details, dict) else []:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        if delay and delay.endswith("s"):
+            try:
+                return float(delay[:-1])
+            except ValueError:
+                pass
+    return None
+
+
+def to_llm_error(exc):
+    """
+    Maps SDK / transport exceptions onto the LLMError hierarchy.
+    """
+    import httpx
+    from google.genai import errors as genai_errors
+
+    if isinstance(exc, LLMError):
+        return exc
+    if isinstance(exc, httpx.TimeoutException):
+        return LLMTimeoutError(str(exc) or "LLM request timed out")
+    if isinstance(exc, httpx.TransportError):
+        return LLMUnavailableError(str(exc))
+    if isinstance(exc, genai_errors.APIError):
+        if exc.code == 429 or exc.status == "RESOURCE_EXHAUSTED":
+            return LLMQuotaError(str(exc), retry_after=_retry_after(exc))
+        if exc.code in (408, 504):
+            return LLMTimeoutError(str(exc))
+        if exc.code and exc.code >= 500:
+            return LLMUnavailableError(str(exc))
+    return LLMError(str(exc))
+
+
+class GeminiBackend:
+    """
+    Talks to Gemini through one process-wide `genai.Client`.
+
+    The client owns a single pooled `httpx.Client` (and an
+    `httpx.AsyncClient` for the `a*` methods), so keep-alive connections
+    are reused across requests instead of re-handshaking TLS on every
+    call. The SDK itself is imported here rather than at module level; it
+    takes most of a second to import.
+    """
+    name = "gemini"
+
+    def __init__(self, api_key, timeout, max_connections=10):
+        import httpx
+        from google import genai
+        from google.genai import types
+
+        self._types = types
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._http = httpx.Client(timeout=timeout, limits=limits)
+        self._async_http = httpx.AsyncClient(timeout=timeout, limits=limits)
+        self._client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                timeout=int(timeout * 1000),
+                httpx_client=self._http,
+                httpx_async_client=self._async_http,
+            ),
+        )
+
+    def _config(self, timeout):
+        types = self._types
+        return types.GenerateContentConfig(
+            http_options=types.HttpOptions(timeout=int(timeout * 1000)),
+        )
+
+    def generate(self, prompt, model, timeout):
+        config = self._config(timeout)
+        try:
+            resp = self._client.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=config,
+            )
+        except Exception as e:
+            raise to_llm_error(e) from e
+
+        return LLMResponse(text=extract_text(resp), model=model, usage=_usage(resp))
+
+    def stream(self, prompt, model, timeout, usage=None):
+        """
+        Yields the reply text chunk by chunk (generate_content_stream).
+        `timeout` applies to each read, so a stalled stream still fails.
+        Token counts from the final chunk are written into `usage`.
+        """
+        config = self._config(timeout)
+        try:
+            for resp in self._client.models.generate_content_stream(
+                model=model,
+                contents=prompt,
+                config=config,
+            ):
+                if usage is not None and getattr(resp, "usage_metadata", None):
+                    usage.update(_usage(resp))
+                text = extract_text(resp)
+                if text:
+                    yield text
+        except Exception as e:
+            raise to_llm_error(e) from e
+
+    async def agenerate(self, prompt, model, timeout):
+        try:
+            resp = await self._client.aio.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=self._config(timeout),
+            )
+        except Exception as e:
+            raise to_llm_error(e) from e
+
+        return LLMResponse(text=extract_text(resp), model=model, usage=_usage(resp))
+
+    async def astream(self, prompt, model, timeout, usage=None):
+        try:
+            async for resp in await self._client.aio.models.generate_content_stream(
+                model=model,
+                contents=prompt,
+                config=self._config(timeout),
+            ):
+                if usage is not None and getattr(resp, "usage_metadata", None):
+                    usage.update(_usage(resp))
+                text = extract_text(resp)
+                if text:
+                    yield text
+        except Exception as e:
+            raise to_llm_error(e) from e
+
+
+def _usage(resp):
+    meta = getattr(resp, "usage_metadata", None)
+    if meta is None:
+        return {}
+    return {
+        "prompt_tokens": meta.prompt_token_count or 0,
+        "response_tokens": meta.candidates_token_count or 0,
+    }
+
+
+# --------------------------------------------------
+# Offline fake
+# --------------------------------------------------
+
+FAKE_WORDS = (
+    "cache index query thread deploy schema latency request buffer token "
+    "module service cluster commit branch record stream batch replica lock"
+).split()
+
+
+def fake_payload(prompt, rng):
+    """
+    Builds a plausible JSON reply for one of the prompts the app sends.
+    """
+    if "multiple choice questions" in prompt:
+        # Distinct questions, but the same ones for the same prompt, like
+        # a model repeating itself across sessions.
+        level = next((d for d in ("Easy", "Medium", "Hard") if f"must be {d}" in prompt), None)
+        return [
+            {
+                "question": f"Which {' '.join(rng.sample(FAKE_WORDS, 4))} is correct?",
+                "options": {k: " ".join(rng.sample(FAKE_WORDS, 2)) for k in "ABCD"},
+                "correct_option": rng.choice("ABCD"),
+                "difficulty": level or rng.choice(("Easy", "Medium", "Hard")),
+            }
+            for n in range(5)
+        ]
+    if "keyed by employee id" in prompt:
+        return {
+            employee_id: {
+                "strengths": ["Communication"],
+                "weaknesses": [rng.choice(("Testing", "Design", "Security"))],
+                "summary": "Synthetic profile summary.",
+            }
+            for employee_id in re.findall(r"^\s*Employee (\d+):", prompt, re.MULTILINE)
+        }
+    if "matched_skills" in prompt:
+        return {
+            "matched_skills": [],
+            "missing_skills": [],
+            "learning_path": [
+                {"title": "Fundamentals", "description": "", "estimated_hours": 4}
+            ],
+        }
+    return {
+        "strengths": ["Communication"],
+        "weaknesses": ["Testing"],
+        "summary": "Synthetic profile summary.",
+    }
+
+
+class FakeBackend:
+    """
+    Deterministic offline stand-in with tunable latency.
+
+    Replies depend only on the prompt, so two runs over the same data
+    produce identical output. Use it for local development
+    (LLM_BACKEND=fake) and benchmarks.
+    """
+    name = "fake"
+
+    def __init__(self, latency_ms=0, fenced=True):
+        self.latency_ms = latency_ms
+        self.fenced = fenced
+        self.calls = 0
+        # Calls waiting on "the network" right now, and the most seen at once.
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _reply(self, prompt):
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+        text = json.dumps(fake_payload(prompt, rng))
+        if self.fenced:
+            text = f"```json\n{text}\n```"
+        return text
+
+    def _wait(self, seconds, timeout):
+        if seconds > timeout:
+            time.sleep(timeout)
+            raise LLMTimeoutError("Fake LLM request timed out")
+        time.sleep(seconds)
+
+    def generate(self, prompt, model, timeout):
+        self._enter()
+        try:
+            if self.latency_ms:
+                self._wait(self.latency_ms / 1000.0, timeout)
+        finally:
+            self._exit()
+
+        text = self._reply(prompt)
+        return LLMResponse(
+            text=text,
+            model=model,
+            usage={"prompt_tokens": len(prompt) // 4, "response_tokens": len(text) // 4},
+        )
+
+    def stream(self, prompt, model, timeout, usage=None, chunk_chars=64):
+        """
+        Yields the same reply as `generate` in `chunk_chars` pieces, with
+        the latency spread evenly across them.
+        """
+        text = self._reply(prompt)
+        if usage is not None:
+            usage.update(prompt_tokens=len(prompt) // 4, response_tokens=len(text) // 4)
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        self._enter()
+        try:
+            for chunk in chunks:
+                if self.latency_ms:
+                    self._wait(self.latency_ms / 1000.0 / len(chunks), timeout)
+                yield chunk
+        finally:
+            self._exit()
+
+    async def _await(self, seconds, timeout):
+        if seconds > timeout:
+            await asyncio.sleep(timeout)
+            raise LLMTimeoutError("Fake LLM request timed out")
+        await asyncio.sleep(seconds)
+
+    async def agenerate(self, prompt, model, timeout):
+        self._enter()
+        try:
+            if self.latency_ms:
+                await self._await(self.latency_ms / 1000.0, timeout)
+        finally:
+            self._exit()
+
+        text = self._reply(prompt)
+        return LLMResponse(
+            text=text,
+            model=model,
+            usage={"prompt_tokens": len(prompt) // 4, "response_tokens": len(text) // 4},
+        )
+
+    async def astream(self, prompt, model, timeout, usage=None, chunk_chars=64):
+        text = self._reply(prompt)
+        if usage is not None:
+            usage.update(prompt_tokens=len(prompt) // 4, response_tokens=len(text) // 4)
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        self._enter()
+        try:
+            for chunk in chunks:
+                if self.latency_ms:
+                    await self._await(self.latency_ms / 1000.0 / len(chunks), timeout)
+                yield chunk
+        finally:
+            self._exit()
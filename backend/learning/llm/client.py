@@ -0,0 +1,359 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .errors import LLMQuotaError, LLMTimeoutError
+from .parsing import parse_json
+from .streaming import JSONObjectStream, iter_json_objects
+from .telemetry import track
+
+
+class LLMClient:
+    """
+    Single entry point for every LLM call made by the app.
+
+    Each attempt gets its own timeout and the whole call is bounded by
+    `deadline` seconds, so a hung upstream can never hold a worker longer
+    than that. Retryable failures (429, 5xx, timeouts) are retried with
+    exponential backoff and full jitter; a 429 that asks us to wait longer
+    than `max_delay` is surfaced immediately instead of sleeping.
+    """
+
+    def __init__(self, backend, model, timeout=30.0, deadline=60.0,
+                 max_retries=3, base_delay=1.0, max_delay=20.0, guard=None, sleep=time.sleep):
+        self.backend = backend
+        self.guard = guard
+        self.model = model
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+
+    def backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    def is_available(self):
+        """
+        False while the circuit breaker is open; callers can skip straight
+        to their degraded path.
+        """
+        return not (self.guard and self.guard.is_open())
+
+    def _attempt(self, prompt, model, timeout):
+        if self.guard is None:
+            return self.backend.generate(prompt, model, timeout)
+
+        self.guard.before_call()
+        try:
+            response = self.backend.generate(prompt, model, timeout)
+        except Exception as e:
+            self.guard.record_failure(e)
+            raise
+        self.guard.record_success()
+        return response
+
+    def _retry_delay(self, error, attempt, started):
+        """
+        Seconds to wait before retrying `error`, or None to give up.
+        """
+        if not getattr(error, "retryable", False) or attempt >= self.max_retries:
+            return None
+
+        retry_after = getattr(error, "retry_after", None)
+        if isinstance(error, LLMQuotaError) and retry_after and retry_after > self.max_delay:
+            return None
+
+        delay = self.backoff(attempt, retry_after)
+        if time.monotonic() - started + delay >= self.deadline:
+            return None
+        print(f"LLM call failed ({error.__class__.__name__}), retrying in {delay:.1f}s")
+        return delay
+
+    def _remaining(self, started):
+        remaining = self.deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            raise LLMTimeoutError(f"LLM call exceeded {self.deadline}s deadline")
+        return remaining
+
+    def _generate(self, prompt, model, call):
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            remaining = self._remaining(started)
+            try:
+                response = self._attempt(prompt, model, min(self.timeout, remaining))
+                call["usage"] = response.usage
+                return response
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, started)
+                if delay is None:
+                    raise
+                self._sleep(delay)
+                attempt += 1
+                call["retries"] = attempt
+
+    def generate(self, prompt, model=None, caller=""):
+        """
+        Returns the backend's LLMResponse, retrying transient failures.
+        `caller` names the feature in the telemetry ledger.
+        """
+        model = model or self.model
+        with track(caller, model) as call:
+            return self._generate(prompt, model, call)
+
+    def generate_text(self, prompt, model=None, caller=""):
+        return self.generate(prompt, model, caller).text
+
+    def generate_json(self, prompt, model=None, caller=""):
+        """
+        Calls the model and parses its reply (markdown fences stripped).
+        """
+        model = model or self.model
+        with track(caller, model) as call:
+            return parse_json(self._generate(prompt, model, call).text)
+
+    def stream_text(self, prompt, model=None, caller=""):
+        """
+        Yields the reply as text chunks while the model is still writing.
+
+        Failures before the first chunk are retried like `generate`; once
+        output has started an error is raised to the caller, who may
+        already have acted on earlier chunks. The overall deadline still
+        applies to the whole stream.
+        """
+        model = model or self.model
+        with track(caller, model) as call:
+            started = time.monotonic()
+            attempt = 0
+
+            while True:
+                remaining = self._remaining(started)
+                if self.guard:
+                    self.guard.before_call()
+                chunks = self.backend.stream(
+                    prompt, model, min(self.timeout, remaining), usage=call["usage"]
+                )
+                try:
+                    first = next(chunks, None)
+                    break
+                except Exception as e:
+                    if self.guard:
+                        self.guard.record_failure(e)
+                    delay = self._retry_delay(e, attempt, started)
+                    if delay is None:
+                        raise
+                    self._sleep(delay)
+                    attempt += 1
+                    call["retries"] = attempt
+
+            try:
+                if first is not None:
+                    yield first
+                for chunk in chunks:
+                    self._remaining(started)
+                    yield chunk
+            except Exception as e:
+                if self.guard:
+                    self.guard.record_failure(e)
+                raise
+            finally:
+                chunks.close()
+            if self.guard:
+                self.guard.record_success()
+
+    def stream_json_objects(self, prompt, model=None, stream=None, caller=""):
+        """
+        Yields each object of a JSON-array reply as soon as it is complete.
+        Malformed items are skipped and counted in `stream.errors`.
+        """
+        return iter_json_objects(self.stream_text(prompt, model, caller), stream)
+
+    # --------------------------------------------------
+    # Async variants, for views served under ASGI. Same retry, deadline,
+    # guard and telemetry behaviour; waiting on the provider (and on
+    # backoff) yields the event loop instead of holding a thread.
+    # --------------------------------------------------
+
+    async def _guard(self, method, *args):
+        # The guard keeps its state in the DB, so it runs off the loop.
+        if self.guard:
+            await sync_to_async(getattr(self.guard, method))(*args)
+
+    async def _aattempt(self, prompt, model, timeout):
+        await self._guard("before_call")
+        try:
+            response = await self.backend.agenerate(prompt, model, timeout)
+        except Exception as e:
+            await self._guard("record_failure", e)
+            raise
+        await self._guard("record_success")
+        return response
+
+    async def _agenerate(self, prompt, model, call):
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            remaining = self._remaining(started)
+            try:
+                response = await self._aattempt(prompt, model, min(self.timeout, remaining))
+                call["usage"] = response.usage
+                return response
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, started)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                call["retries"] = attempt
+
+    async def agenerate(self, prompt, model=None, caller=""):
+        model = model or self.model
+        with track(caller, model) as call:
+            return await self._agenerate(prompt, model, call)
+
+    async def agenerate_json(self, prompt, model=None, caller=""):
+        model = model or self.model
+        with track(caller, model) as call:
+            return parse_json((await self._agenerate(prompt, model, call)).text)
+
+    async def astream_text(self, prompt, model=None, caller=""):
+        """
+        Async `stream_text`: retried until the first chunk, deadline-bound
+        throughout.
+        """
+        model = model or self.model
+        with track(caller, model) as call:
+            started = time.monotonic()
+            attempt = 0
+
+            while True:
+                remaining = self._remaining(started)
+                await self._guard("before_call")
+                chunks = self.backend.astream(
+                    prompt, model, min(self.timeout, remaining), usage=call["usage"]
+                )
+                try:
+                    first = await anext(chunks, None)
+                    break
+                except Exception as e:
+                    await self._guard("record_failure", e)
+                    delay = self._retry_delay(e, attempt, started)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    call["retries"] = attempt
+
+            try:
+                if first is not None:
+                    yield first
+                async for chunk in chunks:
+                    self._remaining(started)
+                    yield chunk
+            except Exception as e:
+                await self._guard("record_failure", e)
+                raise
+            finally:
+                await chunks.aclose()
+            await self._guard("record_success")
+
+    async def astream_json_objects(self, prompt, model=None, stream=None, caller=""):
+        stream = stream or JSONObjectStream()
+        async for chunk in self.astream_text(prompt, model, caller):
+            for item in stream.feed(chunk):
+                yield item
+        stream.close()
+
+
+# --------------------------------------------------
+# Process-wide client
+# --------------------------------------------------
+
+_client = None
+_lock = threading.Lock()
+
+
+def build_backend(name=None):
+    name = name or settings.LLM_BACKEND
+    if name == "fake":
+        from .backends import FakeBackend
+        return FakeBackend(latency_ms=settings.LLM_FAKE_LATENCY_MS)
+    if name == "gemini":
+        from .backends import GeminiBackend
+        return GeminiBackend(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+        )
+    raise ValueError(f"Unknown LLM_BACKEND: {name!r}")
+
+
+def build_guard():
+    if not settings.LLM_GUARD_ENABLED:
+        return None
+    from .guard import LLMGuard
+    return LLMGuard(
+        name=settings.LLM_BACKEND,
+        rate_per_minute=settings.LLM_RATE_LIMIT_PER_MINUTE,
+        burst=settings.LLM_RATE_LIMIT_BURST,
+        max_wait=settings.LLM_RATE_LIMIT_MAX_WAIT,
+        failure_threshold=settings.LLM_BREAKER_THRESHOLD,
+        cooldown=settings.LLM_BREAKER_COOLDOWN_SECONDS,
+    )
+
+
+def get_client():
+    """
+    Returns the shared LLMClient, building it on first use.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = LLMClient(
+                    backend=build_backend(),
+                    model=settings.LLM_MODEL,
+                    timeout=settings.LLM_TIMEOUT_SECONDS,
+                    deadline=settings.LLM_DEADLINE_SECONDS,
+                    max_retries=settings.LLM_MAX_RETRIES,
+                    base_delay=settings.LLM_RETRY_BASE_DELAY,
+                    max_delay=settings.LLM_RETRY_MAX_DELAY,
+                    guard=build_guard(),
+                )
+    return _client
+
+
+def set_client(client):
+    global _client
+    with _lock:
+        _client = client
+
+
+@contextmanager
+def use_backend(backend, **kwargs):
+    """
+    Temporarily routes every LLM call through `backend`.
+
+        with use_backend(FakeBackend(latency_ms=200)):
+            ...
+    """
+    global _client
+    previous = _client
+    set_client(LLMClient(backend=backend, model=settings.LLM_MODEL, **kwargs))
+    try:
+        yield backend
+    finally:
+        set_client(previous)
@@ -0,0 +1,54 @@
+class LLMError(Exception):
+    """
+    Base class for every failure raised by the LLM client layer.
+    """
+    retryable = False
+
+
+class LLMQuotaError(LLMError):
+    """
+    The provider rejected the call with 429 / RESOURCE_EXHAUSTED.
+    """
+    retryable = True
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMTimeoutError(LLMError):
+    """
+    The call did not finish within the configured timeout.
+    """
+    retryable = True
+
+
+class LLMUnavailableError(LLMError):
+    """
+    5xx or connection-level failure talking to the provider.
+    """
+    retryable = True
+
+
+class LLMResponseError(LLMError):
+    """
+    The provider answered, but the reply was empty or not valid JSON.
+    """
+
+
+class LLMThrottledError(LLMQuotaError):
+    """
+    Our own outbound rate limiter refused the call; nothing was sent.
+    """
+    retryable = False
+
+
+class LLMCircuitOpenError(LLMError):
+    """
+    The circuit breaker is open after repeated provider failures; the call
+    was short-circuited without touching the network.
+    """
+
+    def __init__(self, name, retry_after=None):
+        super().__init__(f"LLM provider {name} is temporarily unavailable")
+        self.retry_after = retry_after
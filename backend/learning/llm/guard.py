@@ -0,0 +1,106 @@
+import time
+
+from django.db import transaction
+
+from ..models import LLMGuardState
+from .errors import LLMCircuitOpenError, LLMQuotaError, LLMThrottledError, LLMTimeoutError, LLMUnavailableError
+
+# Failures that count towards opening the breaker. Bad JSON or a 400 is
+# our problem, not the provider's, so they do not trip it.
+BREAKER_ERRORS = (LLMQuotaError, LLMUnavailableError, LLMTimeoutError)
+
+
+class LLMGuard:
+    """
+    Cross-worker token bucket plus circuit breaker for one provider.
+
+    State is kept in a single `LLMGuardState` row updated under
+    `select_for_update`, so all gunicorn workers share one budget. While
+    the breaker is open, `before_call` raises `LLMCircuitOpenError` from a
+    per-process copy of `opened_until` without touching the DB or network.
+    After the cooldown one caller is let through as a half-open probe;
+    its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, name, rate_per_minute=60, burst=10, max_wait=2.0,
+                 failure_threshold=5, cooldown=60.0, clock=time.time, sleep=time.sleep):
+        self.name = name
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_wait = max_wait
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._sleep = sleep
+        self._opened_until = 0.0
+
+    def _state(self):
+        state, _ = LLMGuardState.objects.select_for_update().get_or_create(
+            name=self.name,
+            defaults={"tokens": self.burst, "refilled_at": self._clock()},
+        )
+        return state
+
+    def is_open(self):
+        return self._clock() < self._opened_until
+
+    def before_call(self):
+        """
+        Blocks until a token is available (at most `max_wait` seconds).
+
+        Raises LLMCircuitOpenError while the breaker is open and
+        LLMThrottledError when the shared budget is exhausted.
+        """
+        if self.is_open():
+            raise LLMCircuitOpenError(self.name, retry_after=self._opened_until - self._clock())
+
+        waited = 0.0
+        while True:
+            with transaction.atomic():
+                state = self._state()
+                now = self._clock()
+
+                if state.opened_until > now:
+                    self._opened_until = state.opened_until
+                    raise LLMCircuitOpenError(self.name, retry_after=state.opened_until - now)
+                if state.failures >= self.failure_threshold:
+                    # Half-open: let this caller probe, keep everyone else out.
+                    state.opened_until = now + self.cooldown
+
+                state.tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+                state.refilled_at = now
+                if state.tokens >= 1:
+                    state.tokens -= 1
+                    state.save()
+                    return
+                state.save()
+                wait = (1 - state.tokens) / self.rate if self.rate else self.max_wait + 1
+
+            if waited + wait > self.max_wait:
+                raise LLMThrottledError(
+                    f"Outbound LLM rate limit reached for {self.name}",
+                    retry_after=wait,
+                )
+            self._sleep(wait)
+            waited += wait
+
+    def record_success(self):
+        self._opened_until = 0.0
+        LLMGuardState.objects.filter(name=self.name).exclude(
+            failures=0, opened_until=0
+        ).update(failures=0, opened_until=0)
+
+    def record_failure(self, error):
+        if not isinstance(error, BREAKER_ERRORS) or isinstance(error, LLMThrottledError):
+            return
+
+        with transaction.atomic():
+            state = self._state()
+            now = self._clock()
+            state.failures += 1
+            if state.failures >= self.failure_threshold:
+                cooldown = max(self.cooldown, getattr(error, "retry_after", None) or 0)
+                state.opened_until = now + cooldown
+                self._opened_until = state.opened_until
+                print(f"LLM circuit for {self.name} opened for {cooldown:.0f}s after {state.failures} failures")
+            state.save()
@@ -0,0 +1,62 @@
+import json
+import re
+
+from .errors import LLMResponseError
+
+# Helpers shared by every caller that turns a model reply into JSON.
+
+
+def extract_text(resp):
+    """
+    Returns the text of a Gemini `GenerateContentResponse`.
+    """
+    if hasattr(resp, "candidates") and resp.candidates:
+        parts = resp.candidates[0].content.parts or []
+        return "".join(part.text or "" for part in parts)
+    if hasattr(resp, "text"):
+        return resp.text or ""
+    return str(resp)
+
+
+def strip_code_fences(text):
+    """
+    Removes a surrounding ```json ... ``` markdown block, if present.
+    """
+    cleaned = (text or "").strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.split("```")[1]
+        if cleaned.startswith("json"):
+            cleaned = cleaned[4:]
+    return cleaned.strip()
+
+
+# Models sometimes drop the closing quote of a value: "key}," -> "key"},
+_UNQUOTED_VALUE = re.compile(r'(\w+)\}(?=,|\s*})')
+
+
+def repair_json(text):
+    """
+    Applies the known fix-ups for malformed model JSON.
+    """
+    return _UNQUOTED_VALUE.sub(r'"\1"}', text)
+
+
+def parse_json(text):
+    """
+    Parses a model reply into Python objects.
+
+    Raises LLMResponseError when the reply is empty or cannot be repaired.
+    """
+    if not text or not text.strip():
+        raise LLMResponseError("No response received")
+
+    cleaned = strip_code_fences(text)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError as e:
+        error = e
+
+    try:
+        return json.loads(repair_json(cleaned))
+    except json.JSONDecodeError:
+        raise LLMResponseError(f"Failed to parse response: {error}") from error
@@ -0,0 +1,117 @@
+import json
+import re
+
+from .parsing import repair_json
+
+# Characters that can change the parser's state; everything else is skipped.
+_SPECIAL = re.compile(r'[{}\[\]"\\]')
+
+
+class JSONObjectStream:
+    """
+    Incremental parser for a streamed JSON array of objects.
+
+    Feed it text chunks as they arrive; it returns each top-level object as
+    soon as its closing brace is seen. Markdown fences, the surrounding
+    `[`, commas and any chatter between objects are ignored. Only the
+    object currently being read is buffered, so memory stays bounded by
+    `max_item_chars` however long the reply is. An object that fails to
+    decode (even after `repair_json`) is counted in `errors` and skipped;
+    it does not affect the objects around it.
+
+        stream = JSONObjectStream()
+        for chunk in chunks:
+            for item in stream.feed(chunk):
+                ...
+        stream.close()
+    """
+
+    def __init__(self, max_item_chars=64 * 1024):
+        self.max_item_chars = max_item_chars
+        self.errors = 0
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, chunk):
+        text = self._text + chunk
+        pos = self._pos
+        items = []
+
+        while True:
+            if self._depth == 0:
+                start = text.find("{", pos)
+                if start == -1:
+                    text, pos = "", 0
+                    break
+                text, pos, self._depth = text[start:], 1, 1
+                continue
+
+            match = _SPECIAL.search(text, pos)
+            if match is None:
+                pos = len(text)
+                if pos > self.max_item_chars:
+                    self._drop()
+                    text, pos = "", 0
+                break
+
+            char, pos = match.group(), match.end()
+            if self._in_string:
+                if char == "\\":
+                    if pos >= len(text):
+                        # Escape split across chunks: wait for the next one.
+                        pos = match.start()
+                        break
+                    pos += 1
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    item = self._decode(text[:pos])
+                    if item is not None:
+                        items.append(item)
+                    text, pos = text[pos:], 0
+
+        self._text, self._pos = text, pos
+        return items
+
+    def close(self):
+        """
+        Call once the stream ends; a truncated trailing object counts as
+        an error.
+        """
+        if self._depth:
+            self._drop()
+        self._text, self._pos = "", 0
+
+    def _drop(self):
+        self.errors += 1
+        self._depth = 0
+        self._in_string = False
+
+    def _decode(self, raw):
+        for candidate in (raw, repair_json(raw)):
+            try:
+                item = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(item, dict):
+                return item
+        self.errors += 1
+        return None
+
+
+def iter_json_objects(chunks, stream=None):
+    """
+    Yields every complete object found in an iterable of text chunks.
+    """
+    stream = stream or JSONObjectStream()
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    stream.close()
@@ -0,0 +1,273 @@
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .errors import (
+    LLMCircuitOpenError,
+    LLMQuotaError,
+    LLMResponseError,
+    LLMThrottledError,
+    LLMTimeoutError,
+    LLMUnavailableError,
+)
+
+# Most specific first: LLMThrottledError is also an LLMQuotaError.
+OUTCOMES = [
+    (LLMCircuitOpenError, "circuit_open"),
+    (LLMThrottledError, "throttled"),
+    (LLMQuotaError, "quota"),
+    (LLMTimeoutError, "timeout"),
+    (LLMUnavailableError, "unavailable"),
+    (LLMResponseError, "bad_response"),
+]
+
+
+def outcome_for(error):
+    if error is None:
+        return "ok"
+    for cls, outcome in OUTCOMES:
+        if isinstance(error, cls):
+            return outcome
+    return "error"
+
+
+class TelemetryRecorder:
+    """
+    Buffers LLM call records in memory and writes them with bulk_create
+    from a background thread, so the request that made the call never
+    waits on the ledger. The queue is bounded; when it is full new
+    records are dropped (and counted) rather than growing without limit.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=5.0, max_queue=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def record(self, **fields):
+        fields.setdefault("created_at", time.time())
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="llm-telemetry", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"LLM telemetry flush failed: {e}")
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """
+        Writes everything queued so far. Safe to call from any thread.
+        """
+        from ..models import LLMCall
+
+        with self._flush_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return
+                LLMCall.objects.bulk_create([
+                    LLMCall(**{
+                        **fields,
+                        "created_at": datetime.fromtimestamp(fields["created_at"], tz=timezone.utc),
+                    })
+                    for fields in batch
+                ])
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = TelemetryRecorder(
+                    batch_size=settings.LLM_TELEMETRY_BATCH_SIZE,
+                    flush_interval=settings.LLM_TELEMETRY_FLUSH_SECONDS,
+                    max_queue=settings.LLM_TELEMETRY_MAX_QUEUE,
+                )
+                atexit.register(_flush_at_exit)
+    return _recorder
+
+
+def flush():
+    """
+    Writes any queued records now (e.g. before a batch job exits).
+    """
+    if _recorder is not None:
+        _recorder.flush()
+
+
+def _flush_at_exit():
+    try:
+        _recorder.flush()
+    except Exception as e:
+        print(f"LLM telemetry flush at exit failed: {e}")
+
+
+def record(caller, model="", outcome="ok", latency_ms=0.0, prompt_tokens=0,
+           response_tokens=0, retries=0, cache_hit=False):
+    """
+    Adds one entry to the ledger (written asynchronously).
+    """
+    if not settings.LLM_TELEMETRY_ENABLED:
+        return
+    get_recorder().record(
+        caller=caller or "unknown",
+        model=model,
+        outcome=outcome,
+        latency_ms=latency_ms,
+        prompt_tokens=prompt_tokens,
+        response_tokens=response_tokens,
+        retries=retries,
+        cache_hit=cache_hit,
+    )
+
+
+def record_cache_hit(caller, model=""):
+    """
+    Notes that `caller` answered from stored output instead of the LLM.
+    """
+    record(caller, model=model, outcome="cache_hit", cache_hit=True)
+
+
+@contextmanager
+def track(caller, model):
+    """
+    Times the enclosed LLM call and records it, including failures.
+
+    The body can fill in `call["usage"]` and `call["retries"]`.
+    """
+    call = {"usage": {}, "retries": 0}
+    started = time.perf_counter()
+    error = None
+    try:
+        yield call
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        if isinstance(error, GeneratorExit):
+            # The caller stopped reading a stream early; not a failure.
+            error = None
+        record(
+            caller,
+            model=model,
+            outcome=outcome_for(error),
+            latency_ms=round((time.perf_counter() - started) * 1000.0, 2),
+            prompt_tokens=call["usage"].get("prompt_tokens", 0),
+            response_tokens=call["usage"].get("response_tokens", 0),
+            retries=call["retries"],
+        )
+
+
+# --------------------------------------------------
+# Reporting
+# --------------------------------------------------
+
+def estimate_cost(model, prompt_tokens, response_tokens):
+    input_price, output_price = settings.LLM_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + response_tokens * output_price) / 1_000_000
+
+
+def usage_report(since):
+    """
+    Aggregates the ledger since `since` by day and by caller, with token
+    totals, latency and estimated cost. Callers are sorted most expensive
+    first.
+    """
+    from django.db.models import Count, Q, Sum
+    from django.db.models.functions import TruncDate
+
+    from ..models import LLMCall
+
+    rows = (
+        LLMCall.objects
+        .filter(created_at__gte=since)
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "caller", "model")
+        .annotate(
+            calls=Count("id"),
+            cache_hits=Count("id", filter=Q(cache_hit=True)),
+            errors=Count("id", filter=~Q(outcome__in=["ok", "cache_hit"])),
+            retries=Sum("retries"),
+            prompt_tokens=Sum("prompt_tokens"),
+            response_tokens=Sum("response_tokens"),
+            latency_ms=Sum("latency_ms"),
+        )
+    )
+
+    def empty():
+        return {
+            "calls": 0, "cache_hits": 0, "errors": 0, "retries": 0,
+            "prompt_tokens": 0, "response_tokens": 0, "latency_ms": 0.0,
+            "cost_usd": 0.0,
+        }
+
+    by_day = {}
+    by_caller = {}
+    for row in rows:
+        cost = estimate_cost(row["model"], row["prompt_tokens"], row["response_tokens"])
+        for bucket in (
+            by_day.setdefault(row["day"].isoformat(), empty()),
+            by_caller.setdefault(row["caller"], empty()),
+        ):
+            for key in ("calls", "cache_hits", "errors", "retries",
+                        "prompt_tokens", "response_tokens", "latency_ms"):
+                bucket[key] += row[key]
+            bucket["cost_usd"] += cost
+
+    def finish(name, key, bucket):
+        llm_calls = bucket["calls"] - bucket["cache_hits"]
+        total_latency = bucket.pop("latency_ms")
+        return {
+            key: name,
+            **bucket,
+            "cost_usd": round(bucket["cost_usd"], 6),
+            "avg_latency_ms": round(total_latency / llm_calls, 1) if llm_calls else 0.0,
+            "total_latency_ms": round(total_latency, 1),
+        }
+
+    return {
+        "by_day": [finish(day, "day", b) for day, b in sorted(by_day.items())],
+        "by_caller": sorted(
+            (finish(caller, "caller", b) for caller, b in by_caller.items()),
+            key=lambda row: (-row["cost_usd"], -row["total_latency_ms"]),
+        ),
+    }
@@ -0,0 +1,116 @@
+import io
+import json
+import os
+import platform
+import time
+from contextlib import redirect_stdout
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from learning.benchmarks.scenarios import SCENARIOS
+from learning.llm import telemetry
+from learning.benchmarks.synthetic import OrgSize, generate_org
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the hot-path micro-benchmarks against a throwaway database "
+        "filled with synthetic data and prints the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenarios", nargs="*", help="Scenario names (default: all)")
+        parser.add_argument("--list", action="store_true", help="List scenarios and exit")
+        parser.add_argument("--employees", type=int, default=OrgSize.employees)
+        parser.add_argument("--skills", type=int, default=OrgSize.skills)
+        parser.add_argument("--contents-per-skill", type=int, default=OrgSize.contents_per_skill)
+        parser.add_argument("--sessions-per-employee", type=int, default=OrgSize.sessions_per_employee)
+        parser.add_argument("--questions-per-skill", type=int, default=OrgSize.questions_per_skill)
+        parser.add_argument("--skills-per-employee", type=int, default=OrgSize.skills_per_employee)
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--latency-ms", type=float, default=0.0, help="Fake Gemini latency per call")
+        parser.add_argument("--concurrency", type=int, default=100,
+                            help="Max in-flight requests for the ASGI side of concurrency_wsgi_vs_asgi")
+        parser.add_argument("--wsgi-threads", type=int, default=8,
+                            help="Worker threads for the WSGI side of concurrency_wsgi_vs_asgi")
+        parser.add_argument("--index-items", type=int, default=0,
+                            help="Grow the catalog to this many items for content_related")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--label", default="", help="Free-form label stored with the run (e.g. a commit id)")
+        parser.add_argument("--output", help="Also write the JSON report to this file")
+
+    def handle(self, *args, **opts):
+        if opts["list"]:
+            for name in SCENARIOS:
+                self.stdout.write(name)
+            return
+
+        names = opts["scenarios"] or list(SCENARIOS)
+        unknown = [n for n in names if n not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(unknown)}")
+
+        size = OrgSize(
+            employees=opts["employees"],
+            skills=opts["skills"],
+            contents_per_skill=opts["contents_per_skill"],
+            sessions_per_employee=opts["sessions_per_employee"],
+            questions_per_skill=opts["questions_per_skill"],
+            skills_per_employee=opts["skills_per_employee"],
+        )
+        options = {
+            "iterations": opts["iterations"],
+            "warmup": opts["warmup"],
+            "latency_ms": opts["latency_ms"],
+            "concurrency": opts["concurrency"],
+            "wsgi_threads": opts["wsgi_threads"],
+            "index_items": opts["index_items"],
+        }
+
+        # Never touch the configured database or cache: benchmark a fresh
+        # test copy and a private in-memory cache.
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        isolated_cache = override_settings(CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "bench",
+            }
+        })
+        isolated_cache.enable()
+        try:
+            # Views and agents print debugging output; keep the report clean.
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                org = generate_org(size, seed=opts["seed"])
+                setup_seconds = time.perf_counter() - start
+
+                results = {}
+                for name in names:
+                    results[name] = SCENARIOS[name](org, options)
+                # Land telemetry in the throwaway DB, not the real one.
+                telemetry.flush()
+        finally:
+            isolated_cache.disable()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            "label": opts["label"],
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "database": connection.vendor,
+            },
+            "data": {**size.__dict__, "seed": opts["seed"], "setup_seconds": round(setup_seconds, 3)},
+            "options": options,
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as fh:
+                fh.write(output)
+        self.stdout.write(output)
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from learning.benchmarks.sqlite_writes import MODES, sqlite_write_report, write_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures sustained SQLite write throughput with many threads, with "
+        "stock settings, with SQLITE_PRODUCTION pragmas and with write "
+        "coalescing. Each mode uses a fresh temporary database file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--writes-per-thread", type=int, default=200)
+        parser.add_argument("--modes", nargs="*", choices=list(MODES), help="Default: all")
+        parser.add_argument("--label", default="")
+        parser.add_argument("--output", help="Also write the JSON report to this file")
+        # Internal: run the load in this process on the configured database.
+        parser.add_argument("--worker", action="store_true", help="(internal)")
+
+    def handle(self, *args, **opts):
+        if opts["worker"]:
+            self.stdout.write(json.dumps(write_load(opts["threads"], opts["writes_per_thread"])))
+            return
+
+        report = {
+            "label": opts["label"],
+            **sqlite_write_report(opts["threads"], opts["writes_per_thread"], opts["modes"]),
+        }
+        output = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as fh:
+                fh.write(output)
+        self.stdout.write(output)
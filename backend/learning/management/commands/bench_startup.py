@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from learning.benchmarks.startup import startup_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures cold start: worker boot and `manage.py check` wall time "
+        "over fresh interpreters, plus a -X importtime breakdown."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=15, help="Packages/modules to list")
+        parser.add_argument("--label", default="")
+        parser.add_argument("--output", help="Also write the JSON report to this file")
+
+    def handle(self, *args, **opts):
+        report = {
+            "label": opts["label"],
+            **startup_report(runs=opts["runs"], top=opts["top"]),
+        }
+        output = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as fh:
+                fh.write(output)
+        self.stdout.write(output)
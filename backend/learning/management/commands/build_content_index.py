@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from learning import content_index
+from learning.db_router import use_replica
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds or incrementally updates the TF-IDF similarity index over "
+        "LearningContent (CONTENT_INDEX_DIR). Run from cron or after "
+        "catalog imports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Re-vectorise every item")
+        parser.add_argument(
+            "--if-stale", action="store_true",
+            help="Do nothing unless content changed since the last build",
+        )
+        parser.add_argument(
+            "--replica", action="store_true",
+            help="Read the catalog from the read replica (changes it has not "
+                 "replicated yet are picked up by the next build)",
+        )
+
+    def handle(self, *args, **opts):
+        if opts["if_stale"] and not content_index.is_stale():
+            self.stdout.write("Content index is up to date")
+            return
+        if opts["replica"]:
+            with use_replica():
+                summary = content_index.build_index(full=opts["full"])
+        else:
+            summary = content_index.build_index(full=opts["full"])
+        self.stdout.write(json.dumps(summary))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from learning import question_dedup
+
+
+class Command(BaseCommand):
+    help = (
+        "Signs and LSH-indexes assessment questions created before "
+        "near-duplicate detection, so new questions are checked against them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        indexed = question_dedup.backfill(batch_size=opts["batch_size"])
+        self.stdout.write(f"Indexed {indexed} question(s)")
@@ -0,0 +1,59 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning import provisioning
+from learning.models import Employee
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates login accounts (User + UserProfile) for employees that do "
+        "not have one, in batches, and writes their one-time activation "
+        "tokens to a CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("employee_ids", nargs="*", type=int, help="Default: every employee without an account")
+        parser.add_argument("--role", default="EMPLOYEE", choices=["EMPLOYEE", "ADMIN"])
+        parser.add_argument("--batch-size", type=int, default=provisioning.DEFAULT_BATCH_SIZE)
+        parser.add_argument("--output", default="activation_tokens.csv", help="CSV for username, activation token")
+        parser.add_argument(
+            "--passwords",
+            help="CSV of employee_id,password: set these initial passwords instead of activation tokens",
+        )
+        parser.add_argument("--workers", type=int, help="Processes for password hashing (default: one per CPU)")
+
+    def handle(self, *args, **opts):
+        if opts["employee_ids"]:
+            employees = Employee.objects.filter(id__in=opts["employee_ids"])
+        else:
+            employees = Employee.objects.filter(userprofile__isnull=True)
+
+        passwords = None
+        if opts["passwords"]:
+            try:
+                with open(opts["passwords"], newline="") as f:
+                    passwords = {int(row[0]): row[1] for row in csv.reader(f) if row and row[0].strip().isdigit()}
+            except (OSError, IndexError, ValueError) as e:
+                raise CommandError(f"Could not read {opts['passwords']}: {e}")
+
+        result = provisioning.provision_accounts(
+            employees,
+            role=opts["role"],
+            batch_size=opts["batch_size"],
+            passwords=passwords,
+            workers=opts["workers"],
+        )
+
+        if passwords is None and result["created"]:
+            with open(opts["output"], "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["employee_id", "user_id", "username", "activation_token"])
+                for row in result["created"]:
+                    writer.writerow([row["employee_id"], row["user_id"], row["username"], row["activation_token"]])
+            self.stdout.write(f"Activation tokens written to {opts['output']}")
+
+        for row in result["skipped"]:
+            self.stdout.write(f"Skipped employee {row['employee_id']}: {row['reason']}")
+        self.stdout.write(f"Created {len(result['created'])} account(s), skipped {len(result['skipped'])}")
@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning import path_regeneration
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenerates the learning path of every employee with a completed "
+        "assessment, in checkpointed chunks across a process pool. An "
+        "interrupted run resumes where it stopped when run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, help="Processes (default: one per CPU)")
+        parser.add_argument("--chunk-size", type=int, default=path_regeneration.DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--weekly-hours", type=float,
+            help="Study hours per week for every schedule, overriding each employee's own (a resumed run keeps its own)",
+        )
+        parser.add_argument("--restart", action="store_true", help="Start a new run instead of resuming an unfinished one")
+
+    def handle(self, *args, **opts):
+        if opts["weekly_hours"] is not None and not 0 < opts["weekly_hours"] <= 168:
+            raise CommandError("--weekly-hours must be between 0 and 168")
+        if opts["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        try:
+            report = path_regeneration.regenerate_all(
+                opts["weekly_hours"],
+                chunk_size=opts["chunk_size"],
+                workers=opts["workers"],
+                restart=opts["restart"],
+                log=self.stdout.write,
+            )
+        except KeyboardInterrupt:
+            raise CommandError("Interrupted. Finished chunks are saved; run the command again to resume.")
+        self.stdout.write(json.dumps(report, indent=2))
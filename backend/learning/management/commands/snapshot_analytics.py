@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from learning import analytics_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Records today's org-wide and per-department analytics snapshot "
+        "(run daily, e.g. from cron). Re-running for a day replaces it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Day to snapshot (YYYY-MM-DD), default today")
+        parser.add_argument(
+            "--backfill-days", type=int, default=0,
+            help="Also snapshot this many days before --date. Learning status "
+                 "counts cannot be reconstructed and are taken as of now.",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            day = date.fromisoformat(opts["date"]) if opts["date"] else timezone.localdate()
+        except ValueError:
+            raise CommandError("--date must be YYYY-MM-DD")
+
+        for offset in range(opts["backfill_days"], -1, -1):
+            snapshot_day = day - timedelta(days=offset)
+            rows = analytics_snapshots.take_snapshot(snapshot_day)
+            self.stdout.write(f"{snapshot_day}: {rows} snapshot row(s)")
@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from learning import profile_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Refreshes the stored profile summary of every employee whose "
+        "skills, experience or TSR role changed, several employees per LLM "
+        "request (run nightly, e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Employees per LLM request (default PROFILE_SUMMARY_BATCH_SIZE)")
+        parser.add_argument("--max-calls", type=int, help="LLM request budget for this run (default PROFILE_SUMMARY_MAX_CALLS)")
+        parser.add_argument("--max-tokens", type=int, help="Token budget for this run, 0 for none (default PROFILE_SUMMARY_MAX_TOKENS)")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the employees that need a new summary")
+
+    def handle(self, *args, **opts):
+        if opts["dry_run"]:
+            self.stdout.write(f"{len(profile_summaries.changed_employees())} employee(s) need a new summary")
+            return
+
+        report = profile_summaries.summarize_changed(
+            batch_size=opts["batch_size"],
+            max_calls=opts["max_calls"],
+            max_tokens=opts["max_tokens"],
+        )
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,31 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from learning.db_router import REPLICA, replica_configured
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the SQLite primary database over the SQLite replica "
+        "(SQLITE_REPLICA_PATH), standing in for replication when testing "
+        "read-replica routing locally."
+    )
+
+    def handle(self, *args, **opts):
+        if not replica_configured():
+            raise CommandError("No replica configured; set SQLITE_REPLICA_PATH")
+        primary, replica = connections["default"], connections[REPLICA]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("Only SQLite primary and replica can be synced this way")
+
+        replica.close()
+        source = sqlite3.connect(str(primary.settings_dict["NAME"]))
+        target = sqlite3.connect(str(replica.settings_dict["NAME"]))
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        self.stdout.write(f"Copied {primary.settings_dict['NAME']} to {replica.settings_dict['NAME']}")
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0008_userprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMGuardState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('tokens', models.FloatField(default=0)),
+                ('refilled_at', models.FloatField(default=0)),
+                ('failures', models.IntegerField(default=0)),
+                ('opened_until', models.FloatField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0009_llmguardstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('caller', models.CharField(max_length=100)),
+                ('model', models.CharField(blank=True, max_length=100)),
+                ('outcome', models.CharField(max_length=30)),
+                ('latency_ms', models.FloatField(default=0)),
+                ('prompt_tokens', models.IntegerField(default=0)),
+                ('response_tokens', models.IntegerField(default=0)),
+                ('retries', models.IntegerField(default=0)),
+                ('cache_hit', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
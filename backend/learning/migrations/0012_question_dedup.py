@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0011_employee_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assessmentsession',
+            name='reused_questions',
+            field=models.ManyToManyField(blank=True, related_name='reused_in', to='learning.assessmentquestion'),
+        ),
+        migrations.CreateModel(
+            name='QuestionLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='learning.assessmentquestion')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='learning.skill')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill', 'key'], name='learning_qu_skill_i_ba6396_idx')],
+            },
+        ),
+    ]
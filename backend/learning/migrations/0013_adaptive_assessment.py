@@ -0,0 +1,54 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_rasch_difficulty(apps, schema_editor):
+    # Start existing questions at the logit for their label.
+    AssessmentQuestion = apps.get_model("learning", "AssessmentQuestion")
+    for label, logit in (("Easy", -1.0), ("Hard", 1.0)):
+        AssessmentQuestion.objects.filter(difficulty__iexact=label).update(rasch_difficulty=logit)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0012_question_dedup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='rasch_difficulty',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='times_answered',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='assessmentsession',
+            name='mode',
+            field=models.CharField(choices=[('FIXED', 'Fixed'), ('ADAPTIVE', 'Adaptive')], default='FIXED', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='AssessmentResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected_option', models.CharField(blank=True, max_length=255)),
+                ('is_correct', models.BooleanField(null=True)),
+                ('ability', models.FloatField(blank=True, null=True)),
+                ('served_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('answered_at', models.DateTimeField(blank=True, null=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='learning.assessmentquestion')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='learning.assessmentsession')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('session', 'question'), name='unique_response_per_question')],
+            },
+        ),
+        migrations.RunPython(seed_rasch_difficulty, migrations.RunPython.noop),
+    ]
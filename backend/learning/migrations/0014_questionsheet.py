@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0013_adaptive_assessment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionSheet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('questions', models.TextField()),
+                ('answer_key', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sheet', to='learning.assessmentsession')),
+            ],
+        ),
+    ]
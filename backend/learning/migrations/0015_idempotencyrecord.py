@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0014_questionsheet'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=255)),
+                ('status_code', models.IntegerField(default=200)),
+                ('response', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='learning.employee')),
+                ('session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='learning.assessmentsession')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('employee', 'endpoint', 'key'), name='unique_idempotency_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0016_account_activation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('department', models.CharField(max_length=255)),
+                ('employees', models.IntegerField(default=0)),
+                ('assessments_completed', models.IntegerField(default=0)),
+                ('avg_score', models.FloatField(blank=True, null=True)),
+                ('open_skill_gaps', models.IntegerField(default=0)),
+                ('learning_in_progress', models.IntegerField(default=0)),
+                ('learning_done', models.IntegerField(default=0)),
+                ('assessments_completed_day', models.IntegerField(default=0)),
+                ('learning_completed_day', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('department', 'date'), name='unique_analytics_snapshot')],
+            },
+        ),
+    ]
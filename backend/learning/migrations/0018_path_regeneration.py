@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0017_analytics_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PathRegenerationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('RUNNING', 'Running'), ('DONE', 'Done')], default='RUNNING', max_length=20)),
+                ('weekly_hours', models.FloatField()),
+                ('chunk_size', models.IntegerField()),
+                ('total_employees', models.IntegerField(default=0)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PathRegenerationChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_employee_id', models.IntegerField()),
+                ('last_employee_id', models.IntegerField()),
+                ('employees', models.IntegerField(default=0)),
+                ('paths_written', models.IntegerField(default=0)),
+                ('done_at', models.DateTimeField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='learning.pathregenerationrun')),
+            ],
+        ),
+    ]
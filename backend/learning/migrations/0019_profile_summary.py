@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0018_path_regeneration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile', models.TextField()),
+                ('input_hash', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile_summary', to='learning.employee')),
+            ],
+        ),
+    ]
@@ -0,0 +1,152 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:36
+
+import json
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def items_to_rows(apps, schema_editor):
+    # Keep each employee's latest path as version 1 and turn its JSON
+    # items into LearningPathItem rows.
+    LearningPath = apps.get_model("learning", "LearningPath")
+    LearningPathItem = apps.get_model("learning", "LearningPathItem")
+    latest = {}
+    for path in LearningPath.objects.order_by("employee_id", "-created_at", "-id"):
+        if path.employee_id in latest:
+            path.delete()
+            continue
+        latest[path.employee_id] = path
+        try:
+            items = json.loads(path.items)
+        except (TypeError, ValueError):
+            items = []
+        LearningPathItem.objects.filter(learning_path=path).delete()
+        LearningPathItem.objects.bulk_create([
+            LearningPathItem(
+                learning_path=path,
+                position=position,
+                content_id=str(item.get("content_id")),
+                title=item.get("title") or "",
+                skill=item.get("skill") or "",
+                url=item.get("content_url") or "",
+                thumbnail=item.get("thumbnail") or "",
+                duration=item.get("duration") or 0,
+                estimated_hours=round((item.get("duration") or 0) / 60),
+                difficulty=item.get("difficulty") or "",
+                content_type=item.get("content_type") or "",
+                status=item.get("status") or "NOT_STARTED",
+                priority=item.get("priority") or 0,
+                week=item.get("week"),
+            )
+            for position, item in enumerate(items)
+            if isinstance(item, dict) and item.get("content_id") is not None
+        ])
+        path.version = 1
+        path.updated_at = path.created_at
+        path.save(update_fields=["version", "updated_at"])
+
+
+def rows_to_items(apps, schema_editor):
+    # Reverse: rebuild each path's JSON items from its LearningPathItem rows.
+    LearningPath = apps.get_model("learning", "LearningPath")
+    LearningPathItem = apps.get_model("learning", "LearningPathItem")
+    items = {}
+    for row in LearningPathItem.objects.order_by("learning_path_id", "position", "id"):
+        content_id = int(row.content_id) if row.content_id.isdigit() else row.content_id
+        items.setdefault(row.learning_path_id, []).append({
+            "content_id": content_id,
+            "title": row.title,
+            "skill": row.skill,
+            "content_url": row.url,
+            "thumbnail": row.thumbnail,
+            "duration": row.duration,
+            "difficulty": row.difficulty,
+            "content_type": row.content_type,
+            "status": row.status,
+            "priority": row.priority,
+            "week": row.week,
+        })
+    for path in LearningPath.objects.all():
+        path.items = json.dumps(items.get(path.id, []))
+        path.save(update_fields=["items"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0019_profile_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningpath',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='learningpath',
+            name='version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='learningpathitem',
+            name='content_type',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='learningpathitem',
+            name='difficulty',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='learningpathitem',
+            name='duration',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='learningpathitem',
+            name='position',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='learningpathitem',
+            name='priority',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='learningpathitem',
+            name='week',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='learningpathitem',
+            name='learning_path',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='path_items', to='learning.learningpath'),
+        ),
+        migrations.CreateModel(
+            name='LearningPathChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.IntegerField()),
+                ('changes', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('learning_path', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='learning.learningpath')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('learning_path', 'version'), name='unique_path_version')],
+            },
+        ),
+        # A default lets a rollback re-add the column before rows_to_items fills it.
+        migrations.AlterField(
+            model_name='learningpath',
+            name='items',
+            field=models.TextField(default='[]'),
+        ),
+        migrations.RunPython(items_to_rows, rows_to_items),
+        migrations.RemoveField(
+            model_name='learningpath',
+            name='items',
+        ),
+    ]
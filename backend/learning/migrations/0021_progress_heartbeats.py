@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0020_learning_path_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningprogress',
+            name='watched_percent',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='learningprogress',
+            name='watched_seconds',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:55
+
+from django.db import migrations, models
+
+
+def drop_duplicate_paths(apps, schema_editor):
+    # Concurrent generations could create a second path for an employee;
+    # keep the most recently updated one.
+    LearningPath = apps.get_model("learning", "LearningPath")
+    seen = set()
+    duplicates = []
+    for path_id, employee_id in (
+        LearningPath.objects.order_by("employee_id", "-updated_at", "-version", "-id").values_list("id", "employee_id")
+    ):
+        if employee_id in seen:
+            duplicates.append(path_id)
+        seen.add(employee_id)
+    LearningPath.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0021_progress_heartbeats'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_paths, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='learningpath',
+            constraint=models.UniqueConstraint(fields=('employee',), name='unique_learning_path_per_employee'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0022_unique_learning_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningpath',
+            name='weekly_hours',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='pathregenerationrun',
+            name='weekly_hours',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0023_path_weekly_hours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentIndexState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('changes', models.BigIntegerField(default=0)),
+                ('built_changes', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
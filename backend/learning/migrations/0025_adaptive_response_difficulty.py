@@ -0,0 +1,51 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def prepare_responses(apps, schema_editor):
+    AssessmentQuestion = apps.get_model("learning", "AssessmentQuestion")
+    AssessmentResponse = apps.get_model("learning", "AssessmentResponse")
+
+    # Answers given so far were graded against difficulties that are no
+    # longer known; the question's current one is the closest there is.
+    AssessmentResponse.objects.filter(answered_at__isnull=False).update(
+        difficulty=Subquery(
+            AssessmentQuestion.objects.filter(id=OuterRef("question_id")).values("rasch_difficulty")[:1]
+        )
+    )
+
+    # Concurrent "next" calls could serve two questions at once; keep the
+    # first one served.
+    seen = set()
+    duplicates = []
+    for response_id, session_id in (
+        AssessmentResponse.objects.filter(answered_at__isnull=True)
+        .order_by("session_id", "served_at", "id")
+        .values_list("id", "session_id")
+    ):
+        if session_id in seen:
+            duplicates.append(response_id)
+        seen.add(session_id)
+    AssessmentResponse.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0024_content_index_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentresponse',
+            name='difficulty',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(prepare_responses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='assessmentresponse',
+            constraint=models.UniqueConstraint(condition=models.Q(('answered_at__isnull', True)), fields=('session',), name='one_pending_response_per_session'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:02
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    # The index below is case-insensitive and only covers non-empty
+    # emails. Existing duplicates are reported, not resolved: merging
+    # accounts is an admin's decision.
+    User = apps.get_model("auth", "User")
+    duplicates = list(
+        User.objects.using(schema_editor.connection.alias)
+        .exclude(email="")
+        .annotate(address=Lower("email"))
+        .values("address")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .values_list("address", flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add a unique index on user emails; these are used by more "
+            f"than one account: {', '.join(sorted(duplicates))}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('learning', '0025_adaptive_response_difficulty'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX learning_user_email_ci ON auth_user (LOWER(email)) WHERE email <> ''",
+            "DROP INDEX learning_user_email_ci",
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-import json
+from . import fastjson
 from django.utils import timezone
 from django.contrib.auth.models import User
 
@@ -11,10 +11,11 @@ class Employee(models.Model):
     department = models.CharField(max_length=255, blank=True)
     experience_years = models.IntegerField(default=0)
     current_skills = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def get_current_skills(self):
         try:
-            return json.loads(self.current_skills)
+            return fastjson.loads(self.current_skills)
         except:
             return []
 
@@ -26,11 +27,29 @@ class TSRSkillProfile(models.Model):
     tsr_role = models.CharField(max_length=255, unique=True)
     expected_skills = models.TextField()
 
+    def get_expected_skills(self):
+        """
+        Flat list of expected skills; accepts either a JSON list or
+        {"core": [...], "nice_to_have": [...]}.
+        """
+        try:
+            data = fastjson.loads(self.expected_skills)
+        except:
+            return []
+        if isinstance(data, dict):
+            return [s for group in data.values() if isinstance(group, list) for s in group]
+        return data if isinstance(data, list) else []
+
     def __str__(self):
         return f"{self.tsr_role}"
 
 
 class LearningPath(models.Model):
+    """
+    One per employee. Items live in LearningPathItem rows, kept in step
+    with each regeneration by diff (see paths.save_plans); every change
+    bumps `version` and is logged as a LearningPathChange.
+    """
     STATUS = [
         ("NOT_STARTED", "Not Started"),
         ("IN_PROGRESS", "In Progress"),
@@ -39,28 +58,40 @@ class LearningPath(models.Model):
 
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
     status = models.CharField(max_length=25, choices=STATUS)
-    items = models.TextField()
     matched_skills = models.TextField(blank=True)
     missing_skills = models.TextField(blank=True)
+    version = models.IntegerField(default=0)
+    # Study hours per week the schedule was planned for (None: the default).
+    weekly_hours = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["employee"], name="unique_learning_path_per_employee"),
+        ]
 
     def get_items(self):
-        try:
-            return json.loads(self.items)
-        except:
-            return []
+        # Sorted in Python so a prefetch_related("path_items") is used.
+        return [item.to_item() for item in sorted(self.path_items.all(), key=lambda i: i.position)]
 
     def __str__(self):
         return f"{self.employee.name}"
 
 class LearningPathItem(models.Model):
-    learning_path = models.ForeignKey(LearningPath, on_delete=models.CASCADE)
+    learning_path = models.ForeignKey(LearningPath, on_delete=models.CASCADE, related_name="path_items")
     content_id = models.CharField(max_length=100)
     title = models.CharField(max_length=255)
     skill = models.CharField(max_length=100)
     url = models.TextField()
     thumbnail = models.TextField()
     estimated_hours = models.IntegerField(default=0)
+    position = models.IntegerField(default=0)
+    week = models.IntegerField(null=True, blank=True)
+    priority = models.FloatField(default=0)
+    duration = models.IntegerField(default=0)  # minutes
+    difficulty = models.CharField(max_length=50, blank=True)
+    content_type = models.CharField(max_length=20, blank=True)
 
     STATUS = [
         ("NOT_STARTED", "Not Started"),
@@ -80,6 +111,44 @@ class LearningPathItem(models.Model):
             "status": self.status
         }
 
+    def to_item(self):
+        """
+        The item as the planner produced it (learning path API format).
+        """
+        return {
+            "content_id": int(self.content_id),
+            "title": self.title,
+            "skill": self.skill,
+            "content_url": self.url,
+            "thumbnail": self.thumbnail,
+            "duration": self.duration,
+            "difficulty": self.difficulty,
+            "content_type": self.content_type,
+            "status": self.status,
+            "priority": self.priority,
+            "week": self.week,
+        }
+
+
+class LearningPathChange(models.Model):
+    """
+    What one version of a learning path changed: items added (in full),
+    updated (changed fields only) and removed (content ids), plus the
+    skill lists when they changed. JSON in `changes`.
+    """
+    learning_path = models.ForeignKey(LearningPath, on_delete=models.CASCADE, related_name="changes")
+    version = models.IntegerField()
+    changes = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["learning_path", "version"], name="unique_path_version"),
+        ]
+
+    def get_changes(self):
+        return fastjson.loads(self.changes)
+
 
 class LearningEvent(models.Model):
     Employee = models.ForeignKey(Employee,on_delete=models.CASCADE)
@@ -141,6 +210,19 @@ class LearningContent(models.Model):
         return self.title
 
 
+class ContentIndexState(models.Model):
+    """
+    Single row shared by every process: catalog signals bump `changes`,
+    and each content index build stores the value it indexed in
+    `built_changes` (see content_index.is_stale).
+    """
+    changes = models.BigIntegerField(default=0)
+    built_changes = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Content index state ({self.changes} changes, {self.built_changes} indexed)"
+
+
 class LearningProgress(models.Model):
     NOT_STARTED = "NOT_STARTED"
     IN_PROGRESS = "IN_PROGRESS"
@@ -167,6 +249,9 @@ class LearningProgress(models.Model):
         choices=STATUS_CHOICES,
         default=NOT_STARTED
     )
+    # Furthest point watched, from player heartbeats (learning/heartbeats.py).
+    watched_percent = models.PositiveSmallIntegerField(default=0)
+    watched_seconds = models.PositiveIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
@@ -182,6 +267,14 @@ class AssessmentSession(models.Model):
         (COMPLETED, "Completed"),
     ]
 
+    FIXED = "FIXED"
+    ADAPTIVE = "ADAPTIVE"
+
+    MODE_CHOICES = [
+        (FIXED, "Fixed"),
+        (ADAPTIVE, "Adaptive"),
+    ]
+
     employee = models.ForeignKey(
         Employee,
         on_delete=models.CASCADE,
@@ -192,14 +285,46 @@ class AssessmentSession(models.Model):
         choices=STATUS_CHOICES,
         default=STARTED
     )
+    mode = models.CharField(
+        max_length=20,
+        choices=MODE_CHOICES,
+        default=FIXED
+    )
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # Questions generated for earlier sessions and served again in this one
+    # (see learning/question_dedup.py).
+    reused_questions = models.ManyToManyField(
+        "AssessmentQuestion",
+        blank=True,
+        related_name="reused_in"
+    )
+
+    def questions(self):
+        """
+        Every question in this session: the ones generated for it plus
+        the reused ones.
+        """
+        return AssessmentQuestion.objects.filter(
+            models.Q(session=self) | models.Q(reused_in=self)
+        ).distinct()
 
     def __str__(self):
         return f"{self.employee.name} - {self.status}"
 
 
 class AssessmentQuestion(models.Model):
+    EASY = "Easy"
+    MEDIUM = "Medium"
+    HARD = "Hard"
+
+    # Starting Rasch difficulty (logits) for each generated label.
+    DIFFICULTY_LOGITS = {
+        EASY: -1.0,
+        MEDIUM: 0.0,
+        HARD: 1.0,
+    }
+
     session = models.ForeignKey(AssessmentSession, on_delete=models.CASCADE)
     # session = models.ForeignKey(
     #     AssessmentSession,
@@ -216,11 +341,121 @@ class AssessmentQuestion(models.Model):
     options = models.JSONField()
     correct_option = models.CharField(max_length=255)
     difficulty = models.CharField(max_length=50, blank=True)
+    # Rasch item difficulty in logits, refined from answers (learning/adaptive.py).
+    rasch_difficulty = models.FloatField(default=0.0)
+    times_answered = models.IntegerField(default=0)
+    # MinHash signature of the question text and options.
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.skill.name} - {self.difficulty}"
 
 
+class QuestionLSHBucket(models.Model):
+    """
+    One LSH band of a question's MinHash signature. Questions that share
+    a bucket with a new one (same skill) are its near-duplicate candidates.
+    """
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
+    key = models.BigIntegerField()
+    question = models.ForeignKey(
+        AssessmentQuestion,
+        on_delete=models.CASCADE,
+        related_name="lsh_buckets"
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["skill", "key"])]
+
+    def __str__(self):
+        return f"{self.skill_id}:{self.key} -> {self.question_id}"
+
+
+class QuestionSheet(models.Model):
+    """
+    A fixed-mode session's questions, serialized once when generation
+    completes, with the answer key kept apart so the sheet can be served
+    as stored (see learning/question_sheet.py).
+    """
+    session = models.OneToOneField(
+        AssessmentSession,
+        on_delete=models.CASCADE,
+        related_name="sheet"
+    )
+    questions = models.TextField()  # JSON array, exactly as served
+    answer_key = models.TextField()  # JSON {question id: [skill id, skill name, correct option]}
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Sheet for session {self.session_id}"
+
+
+class IdempotencyRecord(models.Model):
+    """
+    The stored response of a non-repeatable request, replayed for retries
+    that carry the same key (see learning/idempotency.py).
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
+    endpoint = models.CharField(max_length=100)
+    key = models.CharField(max_length=255)
+    session = models.ForeignKey(
+        AssessmentSession,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+    status_code = models.IntegerField(default=200)
+    response = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["employee", "endpoint", "key"], name="unique_idempotency_key")
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.key} ({self.status_code})"
+
+
+class AssessmentResponse(models.Model):
+    """
+    One question served in an adaptive session, and the answer to it
+    (empty until answered).
+    """
+    session = models.ForeignKey(
+        AssessmentSession,
+        on_delete=models.CASCADE,
+        related_name="responses"
+    )
+    question = models.ForeignKey(
+        AssessmentQuestion,
+        on_delete=models.CASCADE,
+        related_name="responses"
+    )
+    selected_option = models.CharField(max_length=255, blank=True)
+    is_correct = models.BooleanField(null=True)
+    # Skill ability estimate (logits) after this answer.
+    ability = models.FloatField(null=True, blank=True)
+    # Question difficulty (logits) the answer was graded against; the
+    # question itself keeps being recalibrated by later answers.
+    difficulty = models.FloatField(null=True, blank=True)
+    served_at = models.DateTimeField(default=timezone.now)
+    answered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["session", "question"], name="unique_response_per_question"),
+            models.UniqueConstraint(
+                fields=["session"],
+                condition=models.Q(answered_at__isnull=True),
+                name="one_pending_response_per_session",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.session_id} - {self.question_id}: {self.selected_option}"
+
+
 class AssessmentResult(models.Model):
     session = models.ForeignKey(
         AssessmentSession,
@@ -255,4 +490,146 @@ class UserProfile(models.Model):
     )
 
     def __str__(self):
-        return f"{self.user.username} ({self.role})"
\ No newline at end of file
+        return f"{self.user.username} ({self.role})"
+
+
+class AccountActivation(models.Model):
+    """
+    One-time token that lets a bulk-provisioned user set their first
+    password (see learning/provisioning.py). Only a SHA-256 of the token
+    is stored.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="activation")
+    token_hash = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField()
+    used_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Activation for user {self.user_id}"
+
+
+class LLMGuardState(models.Model):
+    """
+    Shared outbound rate-limit bucket and circuit-breaker state for one
+    LLM provider. Lives in the DB so every worker process sees it.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField(default=0)
+    refilled_at = models.FloatField(default=0)
+    failures = models.IntegerField(default=0)
+    opened_until = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.name} (failures={self.failures})"
+
+
+class LLMCall(models.Model):
+    """
+    One row per LLM call (or answer served from stored output), written
+    in batches by learning.llm.telemetry.
+    """
+    caller = models.CharField(max_length=100)
+    model = models.CharField(max_length=100, blank=True)
+    outcome = models.CharField(max_length=30)
+    latency_ms = models.FloatField(default=0)
+    prompt_tokens = models.IntegerField(default=0)
+    response_tokens = models.IntegerField(default=0)
+    retries = models.IntegerField(default=0)
+    cache_hit = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.caller} {self.outcome} ({self.latency_ms:.0f} ms)"
+
+
+class AnalyticsSnapshot(models.Model):
+    """
+    Org-wide (department ORG) or per-department learning and assessment
+    metrics for one day, written by `snapshot_analytics` (see
+    learning/analytics_snapshots.py).
+    """
+    ORG = "*"
+
+    date = models.DateField()
+    department = models.CharField(max_length=255)
+    employees = models.IntegerField(default=0)
+    # Cumulative up to the end of the day
+    assessments_completed = models.IntegerField(default=0)
+    avg_score = models.FloatField(null=True, blank=True)
+    # Results below the gap threshold in each employee's latest assessment
+    open_skill_gaps = models.IntegerField(default=0)
+    # Learning progress by status when the snapshot was taken
+    learning_in_progress = models.IntegerField(default=0)
+    learning_done = models.IntegerField(default=0)
+    # Activity during the day
+    assessments_completed_day = models.IntegerField(default=0)
+    learning_completed_day = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["department", "date"], name="unique_analytics_snapshot")
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.department}"
+
+
+class PathRegenerationRun(models.Model):
+    """
+    One org-wide learning path regeneration (`regenerate_learning_paths`),
+    split into id-range chunks so an interrupted run can resume.
+    """
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+
+    STATUS_CHOICES = [
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=RUNNING)
+    # Override for every path; None keeps each employee's own weekly hours.
+    weekly_hours = models.FloatField(null=True, blank=True)
+    chunk_size = models.IntegerField()
+    total_employees = models.IntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Path regeneration {self.id} ({self.status})"
+
+
+class PathRegenerationChunk(models.Model):
+    """
+    Employees first_employee_id..last_employee_id of a run. done_at is
+    set in the same transaction that writes their paths.
+    """
+    run = models.ForeignKey(PathRegenerationRun, on_delete=models.CASCADE, related_name="chunks")
+    first_employee_id = models.IntegerField()
+    last_employee_id = models.IntegerField()
+    employees = models.IntegerField(default=0)
+    paths_written = models.IntegerField(default=0)
+    done_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Run {self.run_id} employees {self.first_employee_id}-{self.last_employee_id}"
+
+
+class ProfileSummary(models.Model):
+    """
+    Precomputed ProfileAgent output that the dashboard serves as is
+    (see profile_summaries.py). input_hash covers what the prompt is
+    built from, so a changed hash means the summary is out of date.
+    """
+    employee = models.OneToOneField(Employee, on_delete=models.CASCADE, related_name="profile_summary")
+    profile = models.TextField()
+    input_hash = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def get_profile(self):
+        return fastjson.loads(self.profile)
+
+    def __str__(self):
+        return f"Profile summary for {self.employee_id}"
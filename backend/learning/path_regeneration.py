@@ -0,0 +1,201 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import paths, response_cache
+from .models import (
+    AssessmentResult,
+    AssessmentSession,
+    Employee,
+    LearningPath,
+    LearningProgress,
+    PathRegenerationChunk,
+    PathRegenerationRun,
+)
+
+# Org-wide learning path regeneration (`regenerate_learning_paths`), for
+# when the catalog or the gap threshold changes.
+#
+# A run splits employees into id ranges of `chunk_size`, stored up front
+# as PathRegenerationChunk rows. Chunks are spread over a process pool;
+# each one reads everything it needs in four queries (latest completed
+# sessions, their results, existing progress, and the content catalog
+# once per worker), plans every path in memory with paths.plan_path, then
+# writes them with paths.save_plans and marks the chunk done in one
+# transaction. A chunk is therefore either fully written and checkpointed
+# or not at all, and re-running the command picks up the chunks that are
+# still open (--restart starts over).
+#
+# Every path is planned for the weekly hours it already has (the default
+# for paths that never had any); a run's weekly_hours, when given,
+# overrides that for everyone.
+#
+# Employees without a completed assessment keep whatever path they have,
+# as generate_learning_path would refuse them.
+
+DEFAULT_CHUNK_SIZE = 500
+
+_catalog = None
+
+
+def _get_catalog():
+    # Loaded once per worker process and reused for all its chunks.
+    global _catalog
+    if _catalog is None:
+        _catalog = paths.ContentCatalog.load()
+    return _catalog
+
+
+def start_run(weekly_hours=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Creates a run and its chunks over all current employees. `weekly_hours`
+    overrides every employee's own (None keeps them).
+    """
+    ids = list(Employee.objects.order_by("id").values_list("id", flat=True))
+    with transaction.atomic():
+        run = PathRegenerationRun.objects.create(
+            weekly_hours=weekly_hours, chunk_size=chunk_size, total_employees=len(ids)
+        )
+        PathRegenerationChunk.objects.bulk_create([
+            PathRegenerationChunk(
+                run=run,
+                first_employee_id=ids[i],
+                last_employee_id=ids[min(i + chunk_size, len(ids)) - 1],
+                employees=len(ids[i:i + chunk_size]),
+            )
+            for i in range(0, len(ids), chunk_size)
+        ])
+    return run
+
+
+def latest_run():
+    """
+    The most recent run that has not finished, or None.
+    """
+    return PathRegenerationRun.objects.filter(status=PathRegenerationRun.RUNNING).order_by("-id").first()
+
+
+def regenerate_chunk(chunk_id):
+    """
+    Rebuilds the paths for one chunk and checkpoints it. Returns
+    (employees, paths that changed); (0, 0) if the chunk was already done.
+    """
+    chunk = PathRegenerationChunk.objects.select_related("run").get(id=chunk_id)
+    if chunk.done_at is not None:
+        return 0, 0
+
+    employees = {
+        e.id: e for e in Employee.objects.filter(
+            id__gte=chunk.first_employee_id, id__lte=chunk.last_employee_id
+        )
+    }
+
+    latest = {}
+    for session in (
+        AssessmentSession.objects
+        .filter(employee_id__in=employees, status=AssessmentSession.COMPLETED)
+        .order_by("employee_id", "-completed_at")
+        .only("id", "employee_id")
+    ):
+        latest.setdefault(session.employee_id, session.id)
+
+    results = {}
+    for r in AssessmentResult.objects.filter(session_id__in=latest.values()).select_related("skill").order_by("id"):
+        results.setdefault(r.session_id, []).append(r)
+
+    progress = {}
+    for p in LearningProgress.objects.filter(employee_id__in=latest):
+        progress.setdefault(p.employee_id, {})[p.content_id] = p
+
+    # Each employee keeps their own schedule unless the run overrides it.
+    own_hours = dict(
+        LearningPath.objects.filter(employee_id__in=latest).values_list("employee_id", "weekly_hours")
+    )
+
+    catalog = _get_catalog()
+    plans = [
+        paths.plan_path(
+            employees[employee_id],
+            results.get(session_id, []),
+            progress.get(employee_id, {}),
+            chunk.run.weekly_hours or own_hours.get(employee_id) or settings.LEARNING_WEEKLY_HOURS,
+            catalog=catalog,
+        )
+        for employee_id, session_id in latest.items()
+    ]
+
+    with transaction.atomic():
+        paths.save_plans(plans)
+        changed = [plan.employee.id for plan in plans if plan.changed]
+        claimed = PathRegenerationChunk.objects.filter(id=chunk.id, done_at__isnull=True).update(
+            done_at=timezone.now(), paths_written=len(changed)
+        )
+        if not claimed:
+            # Another worker finished this chunk first; keep its writes.
+            transaction.set_rollback(True)
+            return 0, 0
+
+    for employee_id in changed:
+        response_cache.invalidate_employee(employee_id)
+    return len(employees), len(changed)
+
+
+def _worker_init():
+    django.setup()
+
+
+def regenerate_all(weekly_hours=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, restart=False, log=print):
+    """
+    Runs (or resumes) a regeneration over the whole org on `workers`
+    processes (default: one per core) and returns throughput figures.
+    """
+    run = None if restart else latest_run()
+    if run is None:
+        run = start_run(weekly_hours, chunk_size)
+        log(f"Started run {run.id}: {run.total_employees} employees")
+    else:
+        log(f"Resuming run {run.id} (weekly_hours={run.weekly_hours or 'own'}, chunk_size={run.chunk_size})")
+
+    pending = list(run.chunks.filter(done_at__isnull=True).order_by("id").values_list("id", flat=True))
+    done_before = run.chunks.filter(done_at__isnull=False).count()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+
+    employees = written = finished = 0
+    started = time.perf_counter()
+    if workers == 1:
+        for chunk_id in pending:
+            n, w = regenerate_chunk(chunk_id)
+            employees, written, finished = employees + n, written + w, finished + 1
+            log(f"  chunk {done_before + finished}/{done_before + len(pending)}: {n} employees, {w} paths")
+    else:
+        # Children must not inherit the parent's open connections.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+            futures = [pool.submit(regenerate_chunk, chunk_id) for chunk_id in pending]
+            for future in as_completed(futures):
+                n, w = future.result()
+                employees, written, finished = employees + n, written + w, finished + 1
+                log(f"  chunk {done_before + finished}/{done_before + len(pending)}: {n} employees, {w} paths")
+    seconds = time.perf_counter() - started
+
+    if not run.chunks.filter(done_at__isnull=True).exists():
+        run.status = PathRegenerationRun.DONE
+        run.finished_at = timezone.now()
+        run.save(update_fields=["status", "finished_at"])
+
+    return {
+        "run": run.id,
+        "status": run.status,
+        "workers": workers,
+        "chunks": len(pending),
+        "chunks_resumed_past": done_before,
+        "employees": employees,
+        "paths_written": written,
+        "seconds": round(seconds, 2),
+        "employees_per_second": round(employees / seconds, 1) if seconds else 0.0,
+    }
@@ -0,0 +1,308 @@
+import json
+from collections import Counter
+from dataclasses import dataclass
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from . import content_index
+from .agents import PlannerAgent
+from .models import LearningContent, LearningPath, LearningPathChange, LearningPathItem, LearningProgress
+
+# Learning path building, shared by generate_learning_path (one employee)
+# and regenerate_learning_paths (the whole org, see path_regeneration.py).
+#
+# plan_path() works out everything a path needs from data the caller has
+# already loaded and writes nothing; save_plans() writes any number of
+# plans with a handful of bulk queries. The batch job passes a preloaded
+# ContentCatalog so no per-employee catalog queries are made.
+#
+# Each employee has one LearningPath whose items are LearningPathItem
+# rows. save_plans() diffs the plan against those rows and only inserts,
+# updates or deletes the items that changed; if nothing changed it writes
+# nothing at all. Otherwise the path's version goes up by one and the
+# diff is stored as a LearningPathChange, so clients can fetch what
+# changed since the version they have (changes_since()): items added,
+# fields updated, content ids removed, and the new order when items
+# moved. Only the last LEARNING_PATH_HISTORY_VERSIONS diffs are kept per
+# path.
+#
+# A path also stores the weekly hours it was planned for; regenerations
+# reuse them unless given new ones.
+
+GAP_THRESHOLD = 70
+
+# Planned item key -> LearningPathItem column.
+ITEM_COLUMNS = {
+    "title": "title",
+    "skill": "skill",
+    "content_url": "url",
+    "thumbnail": "thumbnail",
+    "duration": "duration",
+    "difficulty": "difficulty",
+    "content_type": "content_type",
+    "status": "status",
+    "priority": "priority",
+    "week": "week",
+}
+ITEM_KEYS = {column: key for key, column in ITEM_COLUMNS.items()}
+ROW_FIELDS = ["position", "estimated_hours", *ITEM_COLUMNS.values()]
+
+
+@dataclass
+class PathPlan:
+    employee: object
+    matched_skills: list
+    missing_skills: list
+    items: list
+    new_progress: list
+    weekly_hours: float = None
+    path: LearningPath = None
+    changed: bool = False
+
+
+class ContentCatalog:
+    """
+    The whole LearningContent table in memory, by id and by lowercase
+    skill name (both in id order).
+    """
+
+    def __init__(self, contents):
+        self.by_id = {c.id: c for c in contents}
+        self.by_skill = {}
+        for c in contents:
+            self.by_skill.setdefault(c.skill.name.lower(), []).append(c)
+
+    @classmethod
+    def load(cls):
+        return cls(list(LearningContent.objects.select_related("skill").order_by("id")))
+
+
+def _skill_contents(missing_skills, catalog):
+    if not missing_skills:
+        return []
+    if catalog is None:
+        return list(
+            LearningContent.objects
+            .filter(reduce(or_, (Q(skill__name__iexact=s.name) for s in missing_skills)))
+            .select_related("skill")
+            .order_by("id")
+        )
+    names = {s.name.lower() for s in missing_skills}
+    return sorted((c for name in names for c in catalog.by_skill.get(name, [])), key=lambda c: c.id)
+
+
+def _contents_by_id(ids, catalog):
+    if catalog is None:
+        return LearningContent.objects.select_related("skill").in_bulk(ids)
+    return {i: catalog.by_id[i] for i in ids if i in catalog.by_id}
+
+
+def plan_path(employee, results, progress_by_content, weekly_hours, catalog=None):
+    """
+    The learning path for `employee` from the results (with skills) of
+    their latest completed assessment. `progress_by_content` is the
+    employee's {content id: LearningProgress}. Returns a PathPlan.
+    """
+    missing_skills = []
+    matched_skills = []
+    gaps = {}
+
+    for r in results:
+        if r.score < GAP_THRESHOLD:
+            missing_skills.append(r.skill)
+            gaps[r.skill.name] = PlannerAgent.gap(r.score)
+        else:
+            matched_skills.append(r.skill)
+
+    skills_by_name = {s.name.lower(): s for s in missing_skills}
+    contents = _skill_contents(missing_skills, catalog)
+    pairs = [(c, skills_by_name[c.skill.name.lower()]) for c in contents]
+
+    # Skills with a thin catalog borrow the closest content from the index.
+    have = Counter(skill.name for _, skill in pairs)
+    extra = content_index.fill_sparse_skills(
+        {s.name: have[s.name] for s in missing_skills},
+        [c.id for c in contents],
+        settings.CONTENT_INDEX_MIN_PER_SKILL,
+    )
+    if extra:
+        related = _contents_by_id([i for ids in extra.values() for i in ids], catalog)
+        for skill in missing_skills:
+            pairs += [(related[i], skill) for i in extra.get(skill.name, []) if i in related]
+
+    new_progress = []
+    learning_items = []
+    for content, skill in pairs:
+        progress = progress_by_content.get(content.id)
+        if progress is None:
+            new_progress.append(LearningProgress(employee=employee, content=content, status="NOT_STARTED"))
+        learning_items.append({
+            "content_id": content.id,
+            "title": content.title,
+            "skill": skill.name,
+            "content_url": content.content_url,
+            "thumbnail": content.thumbnail_url,
+            "duration": content.duration_minutes,
+            "difficulty": content.difficulty,
+            "content_type": content.content_type,
+            "status": progress.status if progress else "NOT_STARTED"
+        })
+
+    # Most valuable content first, packed into weeks of `weekly_hours`.
+    learning_items = PlannerAgent.plan(learning_items, gaps, weekly_hours)
+
+    return PathPlan(
+        employee=employee,
+        matched_skills=matched_skills,
+        missing_skills=missing_skills,
+        items=learning_items,
+        new_progress=new_progress,
+        weekly_hours=weekly_hours,
+    )
+
+
+def _row_values(item, position):
+    values = {column: item[key] for key, column in ITEM_COLUMNS.items()}
+    values["position"] = position
+    values["estimated_hours"] = round((item["duration"] or 0) / 60)
+    return values
+
+
+def _diff(path, plan):
+    """
+    (rows to add, rows to update, rows to delete, changes) that turn the
+    path's current items into plan.items. Updated rows are modified in
+    place; `changes` is empty when there is nothing to do.
+    """
+    current = {row.content_id: row for row in path.path_items.all()} if path.pk else {}
+    added, updated, changes = [], [], {}
+    reordered = False
+
+    for position, item in enumerate(plan.items):
+        content_id = str(item["content_id"])
+        values = _row_values(item, position)
+        row = current.pop(content_id, None)
+        if row is None:
+            added.append(LearningPathItem(learning_path=path, content_id=content_id, **values))
+            changes.setdefault("added", []).append({**item, "position": position})
+            continue
+        changed = {name: value for name, value in values.items() if getattr(row, name) != value}
+        if not changed:
+            continue
+        for name, value in changed.items():
+            setattr(row, name, value)
+        updated.append(row)
+        if "position" in changed:
+            reordered = True
+        fields = {ITEM_KEYS[name]: value for name, value in changed.items() if name in ITEM_KEYS}
+        if fields:
+            changes.setdefault("updated", []).append({"content_id": item["content_id"], **fields})
+
+    removed = list(current.values())
+    if removed:
+        changes["removed"] = [int(row.content_id) for row in removed]
+    if reordered:
+        # One list instead of a position change for every item that moved.
+        changes["order"] = [item["content_id"] for item in plan.items]
+
+    for field, skills in (("matched_skills", plan.matched_skills), ("missing_skills", plan.missing_skills)):
+        names = json.dumps([s.name for s in skills])
+        if getattr(path, field) != names:
+            setattr(path, field, names)
+            changes[field] = [s.name for s in skills]
+    if path.weekly_hours != plan.weekly_hours:
+        path.weekly_hours = plan.weekly_hours
+        changes["weekly_hours"] = plan.weekly_hours
+    return added, updated, removed, changes
+
+
+def save_plans(plans):
+    """
+    Creates the missing LearningProgress rows and applies each plan to the
+    employee's LearningPath by diff; sets plan.path and plan.changed. Run
+    inside a transaction. Callers invalidate the response cache of the
+    employees whose plan changed.
+    """
+    if not plans:
+        return
+    LearningProgress.objects.bulk_create([p for plan in plans for p in plan.new_progress])
+
+    existing = {
+        path.employee_id: path
+        for path in LearningPath.objects
+        .select_for_update()
+        .filter(employee__in=[plan.employee for plan in plans])
+        .prefetch_related("path_items")
+    }
+
+    now = timezone.now()
+    new_paths, changed_paths, history = [], [], []
+    add_rows, update_rows, delete_ids = [], [], []
+    for plan in plans:
+        path = existing.get(plan.employee.id) or LearningPath(employee=plan.employee, status="NOT_STARTED")
+        plan.path = path
+        added, updated, removed, changes = _diff(path, plan)
+        plan.changed = bool(changes)
+        if not changes:
+            continue
+
+        path.version += 1
+        path.updated_at = now
+        (changed_paths if path.pk else new_paths).append(path)
+        add_rows += added
+        update_rows += updated
+        delete_ids += [row.id for row in removed]
+        history.append(LearningPathChange(learning_path=path, version=path.version, changes=json.dumps(changes), created_at=now))
+
+    if not history:
+        return
+    LearningPath.objects.bulk_create(new_paths)
+    LearningPath.objects.bulk_update(changed_paths, ["version", "updated_at", "matched_skills", "missing_skills", "weekly_hours"])
+    LearningPathItem.objects.filter(id__in=delete_ids).delete()
+    LearningPathItem.objects.bulk_update(update_rows, ROW_FIELDS)
+    LearningPathItem.objects.bulk_create(add_rows)
+    LearningPathChange.objects.bulk_create(history)
+
+    keep = settings.LEARNING_PATH_HISTORY_VERSIONS
+    expired = [Q(learning_path=p, version__lte=p.version - keep) for p in changed_paths if p.version > keep]
+    if expired:
+        LearningPathChange.objects.filter(reduce(or_, expired)).delete()
+
+
+def path_items(path):
+    """
+    The path's items in order, built from .values() rows without
+    instantiating LearningPathItem (same dicts as get_items()).
+    """
+    rows = (
+        LearningPathItem.objects
+        .filter(learning_path=path)
+        .order_by("position")
+        .values("content_id", *ITEM_COLUMNS.values())
+    )
+    return [
+        {"content_id": int(row["content_id"]), **{key: row[column] for key, column in ITEM_COLUMNS.items()}}
+        for row in rows
+    ]
+
+
+def changes_since(path, since):
+    """
+    The path's changes after version `since`, oldest first, or None when
+    the kept history does not reach back that far (reload the whole path).
+    """
+    if since == path.version:
+        return []
+    if since > path.version:
+        return None
+    rows = list(path.changes.filter(version__gt=since).order_by("version"))
+    if not rows or rows[0].version != since + 1:
+        return None
+    return [
+        {"version": row.version, "created_at": row.created_at.isoformat(), **row.get_changes()}
+        for row in rows
+    ]
@@ -0,0 +1,198 @@
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from . import response_cache
+from .agents import ProfileAgent
+from .llm import LLMCircuitOpenError, LLMError, LLMQuotaError, get_client, parse_json
+from .models import Employee, ProfileSummary, TSRSkillProfile
+
+# Precomputed profile summaries for the learner dashboard.
+#
+# A summary only depends on an employee's skills, experience and the
+# expected skills of their TSR role, so the dashboard reads it from the
+# ProfileSummary table instead of asking the LLM on every view.
+# `summarize_profiles` (run nightly, e.g. from cron) finds employees whose
+# inputs changed since their summary was written (input_hash) and sends
+# them PROFILE_SUMMARY_BATCH_SIZE at a time in one prompt, asking for a
+# JSON object keyed by employee id. LLM calls per day therefore follow the
+# number of changed employees, not page views.
+#
+# A run stops when it has spent PROFILE_SUMMARY_MAX_CALLS requests (or
+# PROFILE_SUMMARY_MAX_TOKENS tokens) or the provider reports its quota is
+# exhausted; whoever is left, or was missing from a reply, is picked up
+# by the next run. Employees without any summary yet go first.
+#
+# An employee with no summary at all (new hire before the next run) gets
+# one ProfileAgent call on their first dashboard view, stored here too.
+
+CALLER = "ProfileSummaries"
+
+
+def input_hash(employee, tsr):
+    inputs = {
+        "skills": employee.get_current_skills(),
+        "tsr": tsr.expected_skills if tsr else None,
+        "experience": employee.experience_years,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def changed_employees():
+    """
+    [(employee, tsr, input hash)] for employees whose summary is missing
+    or out of date, missing ones first, then the oldest.
+    """
+    tsr_by_role = {t.tsr_role: t for t in TSRSkillProfile.objects.all()}
+    changed = []
+    for emp in Employee.objects.select_related("profile_summary").order_by("id"):
+        tsr = tsr_by_role.get(emp.tsr_role)
+        digest = input_hash(emp, tsr)
+        summary = getattr(emp, "profile_summary", None)
+        if summary is None or summary.input_hash != digest:
+            changed.append((emp, tsr, digest))
+
+    def age(entry):
+        summary = getattr(entry[0], "profile_summary", None)
+        return (summary is not None, summary.updated_at if summary else timezone.now(), entry[0].id)
+
+    return sorted(changed, key=age)
+
+
+def batch_prompt(entries):
+    employees = "\n".join(
+        f"""
+        Employee {emp.id}:
+        Skills: {emp.get_current_skills()}
+        TSR: {tsr.expected_skills if tsr else "N/A"}
+        Experience: {emp.experience_years}
+        """
+        for emp, tsr, _ in entries
+    )
+    return f"""
+        Analyze each employee's skills against their TSR expectations.
+        Return ONLY one JSON object keyed by employee id, with an entry for every employee below:
+        {{
+        "<employee id>": {{"strengths": [], "weaknesses": [], "summary": ""}}
+        }}
+        {employees}
+        """
+
+
+def _valid(profile):
+    return (
+        isinstance(profile, dict)
+        and isinstance(profile.get("summary"), str)
+        and isinstance(profile.get("strengths"), list)
+        and isinstance(profile.get("weaknesses"), list)
+    )
+
+
+def store(rows, invalidate=True):
+    """
+    Upserts [(employee, input hash, profile)] and drops the employees'
+    cached dashboard responses (unless the caller is building one).
+    """
+    if not rows:
+        return
+    ProfileSummary.objects.bulk_create(
+        [
+            ProfileSummary(employee=emp, input_hash=digest, profile=json.dumps(profile))
+            for emp, digest, profile in rows
+        ],
+        update_conflicts=True,
+        unique_fields=["employee"],
+        update_fields=["profile", "input_hash", "updated_at"],
+    )
+    if invalidate:
+        for emp, _, _ in rows:
+            response_cache.invalidate_employee(emp.id)
+
+
+def summarize_changed(batch_size=None, max_calls=None, max_tokens=None, client=None):
+    """
+    Refreshes the summaries of changed employees within the call/token
+    budget. Returns counts for the run.
+    """
+    batch_size = batch_size or settings.PROFILE_SUMMARY_BATCH_SIZE
+    max_calls = settings.PROFILE_SUMMARY_MAX_CALLS if max_calls is None else max_calls
+    max_tokens = settings.PROFILE_SUMMARY_MAX_TOKENS if max_tokens is None else max_tokens
+    client = client or get_client()
+
+    changed = changed_employees()
+    report = {"changed": len(changed), "summarized": 0, "missing": 0, "calls": 0, "tokens": 0, "stopped": None}
+
+    for start in range(0, len(changed), batch_size):
+        entries = changed[start:start + batch_size]
+        prompt = batch_prompt(entries)
+        if report["calls"] >= max_calls:
+            report["stopped"] = "call budget"
+            break
+        # Expect the average cost of the calls so far; without usage
+        # figures yet, ~4 characters per token of prompt.
+        expected = report["tokens"] // report["calls"] if report["calls"] else len(prompt) // 4
+        if max_tokens and report["tokens"] + expected > max_tokens:
+            report["stopped"] = "token budget"
+            break
+
+        report["calls"] += 1
+        try:
+            response = client.generate(prompt, caller=CALLER)
+            report["tokens"] += response.usage.get("prompt_tokens", 0) + response.usage.get("response_tokens", 0)
+            profiles = parse_json(response.text)
+        except (LLMQuotaError, LLMCircuitOpenError) as e:
+            print(f"Profile summaries stopped: {e}")
+            report["stopped"] = "quota"
+            break
+        except LLMError as e:
+            print(f"Profile summary batch failed: {e}")
+            report["missing"] += len(entries)
+            continue
+
+        if not isinstance(profiles, dict):
+            profiles = {}
+        rows = []
+        for emp, _, digest in entries:
+            profile = profiles.get(str(emp.id))
+            if _valid(profile):
+                rows.append((emp, digest, profile))
+        store(rows)
+        report["summarized"] += len(rows)
+        report["missing"] += len(entries) - len(rows)
+
+    report["remaining"] = report["changed"] - report["summarized"]
+    return report
+
+
+def dashboard_profile(employee):
+    """
+    The employee's stored summary; on first use, builds one with
+    ProfileAgent and stores it (unless the LLM was unavailable).
+    """
+    summary = ProfileSummary.objects.filter(employee=employee).first()
+    if summary:
+        return summary.get_profile()
+
+    profile = ProfileAgent.build(employee)
+    if not profile.get("degraded"):
+        tsr = TSRSkillProfile.objects.filter(tsr_role=employee.tsr_role).first()
+        store([(employee, input_hash(employee, tsr), profile)], invalidate=False)
+    return profile
+
+
+async def adashboard_profile(employee):
+    """
+    Async dashboard_profile for ASGI views.
+    """
+    summary = await ProfileSummary.objects.filter(employee=employee).afirst()
+    if summary:
+        return summary.get_profile()
+
+    profile = await ProfileAgent.abuild(employee)
+    if not profile.get("degraded"):
+        tsr = await TSRSkillProfile.objects.filter(tsr_role=employee.tsr_role).afirst()
+        await sync_to_async(store)([(employee, input_hash(employee, tsr), profile)], invalidate=False)
+    return profile
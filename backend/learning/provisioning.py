@@ -0,0 +1,221 @@
+import hashlib
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import AccountActivation, Employee, UserProfile
+
+# Bulk creation of login accounts for existing employees.
+#
+# register_user costs several existence queries, the create_user_profile
+# signal plus an update_or_create, and a full password hash (hundreds of
+# milliseconds by design) per account. Here each batch of employees is
+# checked with two queries and written with three bulk_creates (User,
+# UserProfile, AccountActivation); bulk_create sends no post_save, so the
+# profile signal is skipped and the profile is created with its final
+# role and employee link.
+#
+# Accounts start with an unusable password and a one-time activation
+# token; the user picks a password through /auth/activate/, so the hash
+# is paid once, by that request, instead of 10k times up front. Only the
+# SHA-256 of the token is stored: tokens are 256-bit random, so a slow
+# hash adds nothing. When initial passwords are given anyway, they are
+# hashed across worker processes.
+#
+# Usernames and emails are compared and stored in lowercase. The database
+# has the final say: User.username is unique and migration 0026 adds a
+# case-insensitive unique index on email, so an account created between
+# the existence check and the insert (another provisioning run, a
+# register_user) fails the batch insert, which is then retried one row at
+# a time and the conflicting rows are skipped.
+
+TOKEN_BYTES = 32
+DEFAULT_BATCH_SIZE = 500
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def email_for(employee):
+    return (employee.email or "").strip().lower()
+
+
+def username_for(employee):
+    return email_for(employee) or f"employee{employee.id}"
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    make_password over `passwords` (in order) on a process pool. Workers
+    only need the settings module, not the app registry.
+    """
+    if not passwords:
+        return []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) == 1:
+        return [make_password(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def _insert(rows, role, with_tokens, expires_at):
+    """
+    Creates the User, UserProfile and (with_tokens) AccountActivation of
+    each (username, email, employee, password hash) row. Returns
+    [(user, employee, token)]; raises IntegrityError on a conflict.
+    """
+    users = [User(username=username, email=email, password=hashed) for username, email, _, hashed in rows]
+    for user in users:
+        if not user.password:
+            user.set_unusable_password()
+    tokens = {}
+    with transaction.atomic():
+        # No post_save for bulk_create: the profile is created right here.
+        User.objects.bulk_create(users)
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, role=role, employee=row[2])
+            for user, row in zip(users, rows)
+        ])
+        if with_tokens:
+            tokens = {user.id: secrets.token_urlsafe(TOKEN_BYTES) for user in users}
+            AccountActivation.objects.bulk_create([
+                AccountActivation(user=user, token_hash=hash_token(tokens[user.id]), expires_at=expires_at)
+                for user in users
+            ])
+    return [(user, row[2], tokens.get(user.id)) for user, row in zip(users, rows)]
+
+
+def _provision_batch(employees, role, passwords, workers, expires_at):
+    created, skipped = [], []
+
+    linked = set(
+        UserProfile.objects
+        .filter(employee__in=employees)
+        .values_list("employee_id", flat=True)
+    )
+    wanted = {}
+    for emp in employees:
+        if emp.id in linked:
+            skipped.append({"employee_id": emp.id, "reason": "already has an account"})
+            continue
+        username = username_for(emp)
+        if username in wanted:
+            skipped.append({"employee_id": emp.id, "reason": f"username {username} is used by another employee in this batch"})
+            continue
+        wanted[username] = emp
+
+    emails = [email_for(emp) for emp in wanted.values() if email_for(emp)]
+    taken = set(
+        User.objects.annotate(name=Lower("username"))
+        .filter(name__in=list(wanted))
+        .values_list("name", flat=True)
+    )
+    taken |= set(
+        User.objects.annotate(address=Lower("email"))
+        .filter(address__in=emails)
+        .values_list("address", flat=True)
+    )
+    for username, emp in list(wanted.items()):
+        if username in taken or email_for(emp) in taken:
+            skipped.append({"employee_id": emp.id, "reason": f"username or email {username} already exists"})
+            del wanted[username]
+
+    if not wanted:
+        return created, skipped
+
+    hashes = [""] * len(wanted)
+    if passwords is not None:
+        hashes = hash_passwords([passwords[emp.id] for emp in wanted.values()], workers)
+    rows = [
+        (username, email_for(emp), emp, hashed)
+        for (username, emp), hashed in zip(wanted.items(), hashes)
+    ]
+
+    try:
+        inserted = _insert(rows, role, passwords is None, expires_at)
+    except IntegrityError:
+        # Taken since the check above: find the conflicting rows one by one.
+        inserted = []
+        for row in rows:
+            try:
+                inserted += _insert([row], role, passwords is None, expires_at)
+            except IntegrityError:
+                skipped.append({"employee_id": row[2].id, "reason": f"username or email {row[0]} already exists"})
+
+    for user, emp, token in inserted:
+        created.append({
+            "employee_id": emp.id,
+            "user_id": user.id,
+            "username": user.username,
+            "activation_token": token,
+        })
+    return created, skipped
+
+
+def provision_accounts(employees, role="EMPLOYEE", batch_size=DEFAULT_BATCH_SIZE, passwords=None, workers=None):
+    """
+    Creates a User + UserProfile for each employee (a queryset or list)
+    that has no account yet, in batches of `batch_size`.
+
+    Without `passwords` every new account gets an activation token,
+    returned once in the result and never stored in clear. `passwords`
+    ({employee id: password}) sets initial passwords instead, hashed on
+    `workers` processes (default: one per CPU).
+
+    Returns {"created": [...], "skipped": [...]}.
+    """
+    expires_at = timezone.now() + timedelta(hours=settings.ACCOUNT_ACTIVATION_TTL_HOURS)
+    created, skipped = [], []
+    if hasattr(employees, "order_by"):
+        employees = employees.order_by("id").iterator(chunk_size=batch_size)
+
+    batch = []
+    for emp in employees:
+        if passwords is not None and emp.id not in passwords:
+            skipped.append({"employee_id": emp.id, "reason": "no initial password given"})
+            continue
+        batch.append(emp)
+        if len(batch) == batch_size:
+            done, missed = _provision_batch(batch, role, passwords, workers, expires_at)
+            created += done
+            skipped += missed
+            batch = []
+    if batch:
+        done, missed = _provision_batch(batch, role, passwords, workers, expires_at)
+        created += done
+        skipped += missed
+
+    return {"created": created, "skipped": skipped}
+
+
+def activate(token, password):
+    """
+    Sets the first password of a provisioned account. Returns the user,
+    or None if the token is unknown, expired or already used.
+    """
+    activation = (
+        AccountActivation.objects
+        .select_related("user")
+        .filter(token_hash=hash_token(token), used_at__isnull=True, expires_at__gt=timezone.now())
+        .first()
+    )
+    if activation is None:
+        return None
+    # Claim the token first, so two concurrent requests cannot both use it.
+    claimed = AccountActivation.objects.filter(id=activation.id, used_at__isnull=True).update(used_at=timezone.now())
+    if not claimed:
+        return None
+    user = activation.user
+    user.set_password(password)
+    user.save(update_fields=["password"])
+    return user
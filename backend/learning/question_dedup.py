@@ -0,0 +1,276 @@
+import hashlib
+import re
+import zlib
+from array import array
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .models import AssessmentQuestion, AssessmentSession, QuestionLSHBucket
+
+# Near-duplicate detection for generated assessment questions.
+#
+# Gemini often answers the same prompt with almost the same questions, so
+# every question gets a MinHash signature over shingles of its text and
+# options. Two signatures agree in a position with probability
+# equal to the Jaccard similarity of the shingle sets, so the fraction of
+# equal positions estimates it.
+#
+# The signature is cut into BANDS bands of ROWS values and each band is
+# hashed into a QuestionLSHBucket row. Questions sharing at least one
+# bucket with a new question (same skill) are its candidates, found with
+# one indexed lookup instead of a scan over the skill's questions. With
+# 16 bands of 4 a pair at similarity 0.8 shares a bucket 99.98% of the
+# time, a pair at 0.3 about 12% of the time (then rejected on the full
+# signature). A match must also have the same correct answer, so "which
+# is X" and "which is not X" over the same options stay apart.
+#
+# A new question that matches an existing one is merged (the existing
+# row is attached to the session) or, if the learner has already seen
+# it, dropped. When the bank already holds enough unseen questions for a
+# skill they are reused and the LLM call is skipped.
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_CHARS = 5
+
+_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+
+def _coefficient(name, i):
+    digest = hashlib.blake2b(f"{name}{i}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % (_PRIME - 1) + 1
+
+
+# Fixed permutations, so signatures stay comparable across processes.
+_PERMUTATIONS = [(_coefficient("a", i), _coefficient("b", i)) for i in range(NUM_PERM)]
+
+
+def _words(text):
+    return _WORD.findall((text or "").lower())
+
+
+def shingles(question_text, options):
+    """
+    Character 5-grams of the normalised question (robust to small wording
+    changes), plus one shingle per option text. Option letters are
+    ignored, so shuffled options still match.
+    """
+    text = " ".join(_words(question_text))
+    result = {text[i:i + SHINGLE_CHARS] for i in range(max(1, len(text) - SHINGLE_CHARS + 1))}
+
+    options = options if isinstance(options, dict) else {}
+    for value in options.values():
+        result.add("option:" + " ".join(_words(str(value))))
+    return result
+
+
+def answer_text(options, correct_option):
+    options = options if isinstance(options, dict) else {}
+    return " ".join(_words(str(options.get(correct_option, ""))))
+
+
+def signature(question_text, options):
+    hashes = [zlib.crc32(s.encode()) for s in shingles(question_text, options)]
+    return array("I", (
+        min((a * h + b) % _PRIME for h in hashes) & 0xFFFFFFFF
+        for a, b in _PERMUTATIONS
+    )).tobytes()
+
+
+def similarity(a, b):
+    a, b = array("I", bytes(a)), array("I", bytes(b))
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def band_keys(sig):
+    values = array("I", bytes(sig))
+    keys = []
+    for band in range(BANDS):
+        chunk = values[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(bytes([band]) + chunk.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def index_question(question, sig=None):
+    """
+    Stores the question's signature and LSH buckets. The question must be saved.
+    """
+    if sig is None:
+        sig = signature(question.question_text, question.options)
+    if question.minhash is None:
+        question.minhash = sig
+        AssessmentQuestion.objects.filter(id=question.id).update(minhash=sig)
+    QuestionLSHBucket.objects.bulk_create([
+        QuestionLSHBucket(skill_id=question.skill_id, key=key, question_id=question.id)
+        for key in band_keys(sig)
+    ])
+
+
+def find_duplicate(skill_id, sig, answer, threshold=None):
+    """
+    Most similar existing question for the skill with the same answer
+    text, at or above `threshold` (QUESTION_DEDUP_THRESHOLD by default),
+    or None. One query.
+    """
+    if threshold is None:
+        threshold = settings.QUESTION_DEDUP_THRESHOLD
+    candidates = (
+        AssessmentQuestion.objects
+        .filter(lsh_buckets__skill_id=skill_id, lsh_buckets__key__in=band_keys(sig))
+        .distinct()
+        .values_list("id", "minhash", "options", "correct_option")
+    )
+    best, best_score = None, threshold
+    for question_id, other, options, correct_option in candidates:
+        score = similarity(sig, other)
+        if score >= best_score and answer_text(options, correct_option) == answer:
+            best, best_score = question_id, score
+    return best
+
+
+def seen_question_ids(employee_id):
+    """
+    Ids of every question the employee has been given, in any session.
+    Adaptive sessions only give the questions they served.
+    """
+    return set(
+        AssessmentQuestion.objects
+        .filter(
+            Q(session__employee_id=employee_id, session__mode=AssessmentSession.FIXED)
+            | Q(reused_in__employee_id=employee_id)
+            | Q(responses__session__employee_id=employee_id)
+        )
+        .values_list("id", flat=True)
+    )
+
+
+class SessionQuestions:
+    """
+    Collects one session's questions skill by skill, merging or dropping
+    near-duplicates and reusing unseen questions from earlier sessions.
+
+    With `attach=False` (adaptive sessions) questions only go into the
+    bank; the session serves them one at a time itself.
+    """
+
+    def __init__(self, session, attach=True):
+        self.session = session
+        self.attach = attach
+        self.seen = seen_question_ids(session.employee_id)
+        self.repeats = {}
+        self.stats = Counter()
+
+    def reuse(self, skill, count, partial=False):
+        """
+        Attaches `count` questions for `skill` that the learner has not
+        seen, least reused first, and returns them. If the bank does not
+        have that many distinct ones, attaches nothing and returns []
+        unless `partial` is set.
+        """
+        if not settings.QUESTION_REUSE or count <= 0:
+            return []
+        bank = (
+            AssessmentQuestion.objects
+            .filter(skill=skill, minhash__isnull=False)
+            .exclude(id__in=self.seen)
+            .annotate(uses=Count("reused_in"))
+            .order_by("uses", "id")[:count * 3]
+        )
+        picked = []
+        for q in bank:
+            # Older rows may duplicate each other; serve only one of them.
+            if all(similarity(q.minhash, p.minhash) < settings.QUESTION_DEDUP_THRESHOLD for p in picked):
+                picked.append(q)
+            if len(picked) == count:
+                break
+        if not picked or (len(picked) < count and not partial):
+            return []
+
+        self.session.reused_questions.add(*picked)
+        self.seen.update(q.id for q in picked)
+        self.stats["reused"] += len(picked)
+        return picked
+
+    def add(self, skill, q_data, difficulty=AssessmentQuestion.MEDIUM):
+        """
+        Stores one generated question (a validated dict from the LLM) and
+        returns the question to serve, or None if it is a repeat.
+        `difficulty` is the label used when the LLM did not give one.
+        """
+        label = str(q_data.get("difficulty") or "").capitalize()
+        if label not in AssessmentQuestion.DIFFICULTY_LOGITS:
+            label = difficulty
+
+        sig = signature(q_data["question"], q_data["options"])
+        answer = answer_text(q_data["options"], q_data["correct_option"])
+        duplicate_id = find_duplicate(skill.id, sig, answer)
+
+        if duplicate_id is not None:
+            if duplicate_id in self.seen:
+                self.repeats.setdefault(skill.id, []).append(duplicate_id)
+                self.stats["dropped"] += 1
+                return None
+            if self.attach:
+                self.session.reused_questions.add(duplicate_id)
+                self.seen.add(duplicate_id)
+            self.stats["merged"] += 1
+            return AssessmentQuestion.objects.get(id=duplicate_id)
+
+        q = AssessmentQuestion.objects.create(
+            session=self.session,
+            skill=skill,
+            question_text=q_data["question"],
+            options=q_data["options"],
+            correct_option=q_data["correct_option"],
+            difficulty=label,
+            rasch_difficulty=AssessmentQuestion.DIFFICULTY_LOGITS[label],
+            minhash=sig,
+        )
+        index_question(q, sig)
+        if self.attach:
+            self.seen.add(q.id)
+        self.stats["created"] += 1
+        return q
+
+    def top_up(self, skill, have, count):
+        """
+        Fills a skill left short by dropped repeats with unseen questions
+        from the bank, as far as it can, and then with the repeats
+        themselves: a seen question beats an empty assessment.
+        """
+        picked = self.reuse(skill, count - have, partial=True)
+        missing = count - have - len(picked)
+        repeats = list(dict.fromkeys(self.repeats.pop(skill.id, [])))[:max(0, missing)]
+        if repeats:
+            self.session.reused_questions.add(*repeats)
+            self.stats["repeated"] += len(repeats)
+            picked += AssessmentQuestion.objects.filter(id__in=repeats).order_by("id")
+        return picked
+
+
+def backfill(batch_size=500):
+    """
+    Signs and indexes questions created before deduplication existed.
+    Returns how many were indexed.
+    """
+    indexed = 0
+    while True:
+        batch = list(
+            AssessmentQuestion.objects.filter(minhash__isnull=True).order_by("id")[:batch_size]
+        )
+        if not batch:
+            return indexed
+        for q in batch:
+            q.minhash = signature(q.question_text, q.options)
+        AssessmentQuestion.objects.bulk_update(batch, ["minhash"])
+        QuestionLSHBucket.objects.bulk_create([
+            QuestionLSHBucket(skill_id=q.skill_id, key=key, question_id=q.id)
+            for q in batch
+            for key in band_keys(q.minhash)
+        ])
+        indexed += len(batch)
@@ -0,0 +1,122 @@
+import json
+from functools import lru_cache
+
+from django.db import IntegrityError
+
+from .models import QuestionSheet
+
+# Precompiled question sheets for fixed-mode assessments.
+#
+# When generation for a session completes, its questions are serialized
+# once into a QuestionSheet row: the learner-facing JSON array, exactly
+# as sent, and the answer key next to it. Serving questions is then a
+# single-row read with no per-question queries or re-encoding, and the
+# payload only ever holds the caller's own session.
+#
+# Until generation has finished, reads build the payload from the live
+# questions without storing it, so a read while questions are still
+# streaming in cannot freeze a partial sheet.
+#
+# A compiled sheet does not change, so grading reads the answer key
+# from a per-process LRU cache instead of loading every answered question.
+# Sessions without a sheet (from before sheets existed, or whose
+# generation failed part way) are compiled when they are graded.
+
+ANSWER_KEY_CACHE_SIZE = 4096
+
+
+def _build(session):
+    """
+    (learner-facing questions, answer key) for the session's current
+    questions, grouped in the employee's skill order.
+    """
+    order = {name: i for i, name in enumerate(session.employee.get_current_skills())}
+    questions = sorted(
+        session.questions().select_related("skill"),
+        key=lambda q: (order.get(q.skill.name, len(order)), q.id),
+    )
+    payload = [
+        {
+            "id": q.id,
+            "skill": q.skill.name,
+            "question": q.question_text,
+            "options": q.options
+        }
+        for q in questions
+    ]
+    key = {str(q.id): [q.skill_id, q.skill.name, q.correct_option] for q in questions}
+    return payload, key
+
+
+def compile_sheet(session):
+    """
+    Builds and stores the session's sheet from its questions, replacing
+    any earlier one. Call once generation has finished. Returns the
+    QuestionSheet.
+    """
+    payload, key = _build(session)
+    fields = {"questions": json.dumps(payload), "answer_key": json.dumps(key)}
+    try:
+        sheet, created = QuestionSheet.objects.update_or_create(session=session, defaults=fields)
+    except IntegrityError:
+        # Compiled concurrently by another request.
+        return QuestionSheet.objects.get(session=session)
+    if not created:
+        _answer_key.cache_clear()
+    return sheet
+
+
+def sheet_json(session):
+    """
+    The session's questions as a JSON array string: the compiled sheet, or
+    while there is none (generation still running) the live questions,
+    which are not stored. None if the session has no questions yet.
+    """
+    questions = QuestionSheet.objects.filter(session=session).values_list("questions", flat=True).first()
+    if questions is None:
+        payload, _ = _build(session)
+        if not payload:
+            return None
+        questions = json.dumps(payload)
+    return questions
+
+
+def active_sheet_json(employee_id):
+    """
+    The sheet of the employee's active session, in one single-row query;
+    None if there is no compiled sheet for it.
+    """
+    return (
+        QuestionSheet.objects
+        .filter(session__employee_id=employee_id, session__status="STARTED")
+        .values_list("questions", flat=True)
+        .first()
+    )
+
+
+def questions_response_body(questions, **extra):
+    """
+    {"questions": [...], **extra} with the stored array spliced in as is.
+    """
+    head = json.dumps(extra)[1:-1]
+    return '{"questions": ' + questions + (", " + head if head else "") + "}"
+
+
+@lru_cache(maxsize=ANSWER_KEY_CACHE_SIZE)
+def _answer_key(session_id):
+    stored = QuestionSheet.objects.filter(session_id=session_id).values_list("answer_key", flat=True).first()
+    if stored is None:
+        raise QuestionSheet.DoesNotExist
+    return {qid: tuple(entry) for qid, entry in json.loads(stored).items()}
+
+
+def answer_key(session):
+    """
+    {question id (str): (skill id, skill name, correct option)} for the
+    session, from memory after the first call.
+    """
+    try:
+        return _answer_key(session.id)
+    except QuestionSheet.DoesNotExist:
+        compile_sheet(session)
+        return _answer_key(session.id)
@@ -0,0 +1,33 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import fastjson
+
+# DRF's JSON renderer and parser on top of fastjson (see fastjson.py);
+# set as the REST_FRAMEWORK defaults in settings.py.
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    DRF JSONRenderer through dumps(); indented output (browsable API,
+    ?indent) still goes through the stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) or fastjson.backend() == "stdlib":
+            return super().render(data, accepted_media_type, renderer_context)
+        return fastjson.dumps(data, JSONEncoder)
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        if fastjson.backend() == "stdlib":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return fastjson.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
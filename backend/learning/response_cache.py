@@ -0,0 +1,128 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+# Per-employee response cache for the learner read endpoints.
+#
+# Every employee has a version number in the cache. Cached responses are
+# keyed by that version, so a write only has to bump the version
+# (`invalidate_employee`) and every old entry becomes unreachable; there
+# is no need to know which views cached what. Works with any Django cache
+# backend (locmem, file, Redis).
+
+VERSION_KEY = "emp:{}:v"
+RESPONSE_KEY = "resp:{}:{}:v{}"
+STATS_KEY = "resp_stats:{}:{}"
+
+CACHED_VIEWS = ["dashboard", "employee", "learning_path", "progress_bar"]
+
+
+def employee_version(employee_id):
+    key = VERSION_KEY.format(employee_id)
+    version = cache.get(key)
+    if version is None:
+        # Time-based start so a version lost on eviction is never reused.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_employee(employee_id):
+    """
+    Drops every cached response for the employee. Call after any write
+    that changes what the learner endpoints return.
+    """
+    key = VERSION_KEY.format(employee_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def _count(name, outcome):
+    key = STATS_KEY.format(name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def _cacheable(response):
+    return response.status_code == 200 and "no-store" not in response.get("Cache-Control", "")
+
+
+def _hit(content):
+    response = HttpResponse(content, content_type="application/json")
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def cached_employee_response(name, employee_id, build):
+    """
+    Returns the cached response for (`name`, employee) or calls `build()`
+    and caches its result.
+
+    Only 200 responses without `Cache-Control: no-store` are stored; the
+    body is kept as serialized bytes so a hit does no DB work and no JSON
+    encoding. Responses carry `X-Cache: HIT` or `MISS`.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return build()
+
+    key = RESPONSE_KEY.format(name, employee_id, employee_version(employee_id))
+    content = cache.get(key)
+    if content is not None:
+        _count(name, "hits")
+        return _hit(content)
+
+    _count(name, "misses")
+    response = build()
+    if _cacheable(response):
+        cache.set(key, response.content, settings.RESPONSE_CACHE_TIMEOUT)
+    response["X-Cache"] = "MISS"
+    return response
+
+
+async def acached_employee_response(name, employee_id, abuild):
+    """
+    `cached_employee_response` for async views; `abuild` is a coroutine
+    function.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return await abuild()
+
+    version = await sync_to_async(employee_version)(employee_id)
+    key = RESPONSE_KEY.format(name, employee_id, version)
+    content = await cache.aget(key)
+    if content is not None:
+        await sync_to_async(_count)(name, "hits")
+        return _hit(content)
+
+    await sync_to_async(_count)(name, "misses")
+    response = await abuild()
+    if _cacheable(response):
+        await cache.aset(key, response.content, settings.RESPONSE_CACHE_TIMEOUT)
+    response["X-Cache"] = "MISS"
+    return response
+
+
+def stats():
+    """
+    Hit/miss counts and hit rate per cached view (shared by all workers
+    when the cache backend is).
+    """
+    result = {}
+    for name in CACHED_VIEWS:
+        hits = cache.get(STATS_KEY.format(name, "hits"), 0)
+        misses = cache.get(STATS_KEY.format(name, "misses"), 0)
+        total = hits + misses
+        result[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+    return result
@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import LearningContent, Skill, UserProfile
+from . import content_index, heartbeats, sqlite_tuning
+from .authentication import invalidate_user
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -10,3 +13,35 @@ def create_user_profile(sender, instance, created, **kwargs):
             user=instance,
             role="EMPLOYEE"
         )
+
+
+@receiver(post_save, sender=LearningContent)
+@receiver(post_delete, sender=LearningContent)
+@receiver(post_save, sender=Skill)
+def content_catalog_changed(sender, **kwargs):
+    content_index.mark_stale()
+
+
+@receiver(post_save, sender=LearningContent)
+@receiver(post_delete, sender=LearningContent)
+def content_changed(sender, instance, **kwargs):
+    # Its duration may have changed, or it is gone.
+    heartbeats.forget_content(instance.id)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def user_profile_changed(sender, instance, **kwargs):
+    # Role or employee link may have changed: stop trusting old token claims.
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # e.g. deactivated
+    invalidate_user(instance.id)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    sqlite_tuning.apply_pragmas(connection)
@@ -0,0 +1,46 @@
+from django.conf import settings
+
+# Per-connection pragmas for SQLITE_PRODUCTION (hooked to connection_created
+# in signals.py).
+#
+# - journal_mode=WAL: readers no longer block the writer or each other;
+#   only writers queue. Stored in the file, so it sticks once set.
+# - synchronous=NORMAL: in WAL mode a commit no longer fsyncs; a power
+#   loss can drop the last transactions but never corrupts the file.
+# - mmap_size / cache_size: reads from the page cache instead of read()
+#   calls, and a larger per-connection page cache.
+# - busy_timeout: a writer waits up to this long for the lock instead of
+#   failing with "database is locked".
+# - temp_store=MEMORY: sorts and temp indexes stay off disk.
+
+
+def pragmas():
+    return [
+        ("journal_mode", "WAL"),
+        ("synchronous", settings.SQLITE_SYNCHRONOUS),
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+        # Negative: size in KiB rather than pages.
+        ("cache_size", -settings.SQLITE_CACHE_SIZE_KB),
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT_MS),
+        ("temp_store", "MEMORY"),
+    ]
+
+
+def apply_pragmas(connection):
+    if connection.vendor != "sqlite" or not settings.SQLITE_PRODUCTION:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def current_pragmas(connection):
+    """
+    {pragma: value} as SQLite reports them, for checking the setup.
+    """
+    with connection.cursor() as cursor:
+        values = {}
+        for name, _ in pragmas():
+            cursor.execute(f"PRAGMA {name}")
+            values[name] = cursor.fetchone()[0]
+        return values
@@ -0,0 +1,119 @@
+import json
+
+from django.test import TestCase, override_settings
+
+from .. import adaptive
+from ..models import AssessmentQuestion, AssessmentResponse, AssessmentSession, Employee, Skill
+from .utils import admin_client
+
+
+@override_settings(CAT_MIN_ITEMS=2, CAT_MAX_ITEMS=10, CAT_TARGET_SCORE_SE=18)
+class AdaptiveStoppingTests(TestCase):
+    def answers_until_done(self, correct):
+        answers = []
+        while True:
+            _, _, _, score_sd = adaptive.estimate(answers)
+            if adaptive.is_done(len(answers), score_sd):
+                return answers, score_sd
+            answers.append((0.0, correct(len(answers))))
+
+    def test_no_answers_is_not_done(self):
+        _, _, score, score_sd = adaptive.estimate([])
+        self.assertAlmostEqual(score, 50, delta=1)
+        self.assertFalse(adaptive.is_done(0, score_sd))
+
+    def test_stops_once_target_precision_is_reached(self):
+        answers, score_sd = self.answers_until_done(lambda i: i % 2 == 0)
+        self.assertLessEqual(score_sd, 18)
+        self.assertGreaterEqual(len(answers), 2)
+        self.assertLess(len(answers), 10)
+
+    def test_stops_at_max_items(self):
+        with override_settings(CAT_TARGET_SCORE_SE=0.1):
+            answers, _ = self.answers_until_done(lambda i: True)
+        self.assertEqual(len(answers), 10)
+
+    def test_estimate_follows_answers(self):
+        right = adaptive.estimate([(0.0, True)] * 4)[2]
+        wrong = adaptive.estimate([(0.0, False)] * 4)[2]
+        self.assertGreater(right, 70)
+        self.assertLess(wrong, 30)
+
+
+@override_settings(CAT_MIN_ITEMS=2, CAT_MAX_ITEMS=4, CAT_TARGET_SCORE_SE=1, LLM_TELEMETRY_ENABLED=False)
+class AdaptiveSessionTests(TestCase):
+    def setUp(self):
+        self.client = admin_client()
+        self.employee = Employee.objects.create(name="Per", tsr_role="dev", current_skills='["Python", "Go"]')
+        author = Employee.objects.create(name="Bank", tsr_role="dev")
+        bank = AssessmentSession.objects.create(employee=author, status=AssessmentSession.COMPLETED)
+        for name in ("Python", "Go"):
+            skill, _ = Skill.objects.get_or_create(name=name)
+            for i in range(6):
+                AssessmentQuestion.objects.create(
+                    session=bank, skill=skill, question_text=f"{name} question {i}?",
+                    options={"A": "yes", "B": "no"}, correct_option="A", difficulty="Medium",
+                    rasch_difficulty=0.1 * (i % 3),
+                )
+        self.base = f"/api/learner/{self.employee.id}/assessment/"
+
+    def start(self):
+        response = self.client.post(self.base + "start/", {"mode": "adaptive"}, format="json")
+        return AssessmentSession.objects.get(id=json.loads(response.content)["session_id"])
+
+    def next(self):
+        return json.loads(self.client.post(self.base + "adaptive/next/").content)
+
+    def answer(self, question_id, option):
+        return self.client.post(
+            self.base + "adaptive/answer/", {"question_id": question_id, "answer": option}, format="json"
+        )
+
+    def test_full_session_stops_at_max_items(self):
+        self.start()
+        answered = 0
+        data = {"done": False}
+        while not data["done"]:
+            question = self.next()["question"]
+            # Alternating answers keep the estimate near the bank's level.
+            response = self.answer(question["id"], "AB"[answered // 2 % 2])
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.content)
+            answered += 1
+        self.assertEqual(answered, 8)
+        self.assertEqual(set(data["results"]), {"Python", "Go"})
+        self.assertEqual(AssessmentSession.objects.get(employee=self.employee).status, AssessmentSession.COMPLETED)
+
+    def test_next_repeats_the_pending_question(self):
+        self.start()
+        self.assertEqual(self.next()["question"]["id"], self.next()["question"]["id"])
+
+    def test_concurrent_next_cannot_serve_two_questions(self):
+        session = self.start()
+        skill = Skill.objects.get(name="Python")
+        first = adaptive.next_question(session, skill, 0.0, generate=None)
+        # A second request that read "nothing pending" before the first wrote.
+        second = adaptive.next_question(session, skill, 0.5, generate=None)
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(AssessmentResponse.objects.filter(session=session, answered_at__isnull=True).count(), 1)
+
+    def test_estimates_do_not_drift_when_questions_are_recalibrated(self):
+        session = self.start()
+        for option in ("A", "B", "A"):
+            self.answer(self.next()["question"]["id"], option)
+        skills = adaptive.session_skills(session)
+        before = adaptive.progress(session, skills)
+
+        AssessmentQuestion.objects.update(rasch_difficulty=3.0)
+        self.assertEqual(adaptive.progress(session, skills), before)
+
+    def test_skills_are_created_at_start_and_read_in_one_query(self):
+        Employee.objects.filter(id=self.employee.id).update(current_skills='["Python", "Rust", "Python"]')
+        self.employee.refresh_from_db()
+        session = self.start()
+        self.assertTrue(Skill.objects.filter(name="Rust").exists())
+
+        session = AssessmentSession.objects.select_related("employee").get(id=session.id)
+        with self.assertNumQueries(1):
+            skills = adaptive.session_skills(session)
+        self.assertEqual([s.name for s in skills], ["Python", "Rust"])
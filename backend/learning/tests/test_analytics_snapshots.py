@@ -0,0 +1,115 @@
+import io
+import json
+from datetime import date, datetime, time, timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import analytics_snapshots
+from ..models import AnalyticsSnapshot, AssessmentResult, AssessmentSession, Employee, Skill
+from .utils import admin_client
+
+DAY = date(2024, 3, 6)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        self.eng = [Employee.objects.create(name=f"Eng {i}", tsr_role="dev", department="Eng") for i in range(2)]
+        Employee.objects.create(name="Ops", tsr_role="ops", department="Ops")
+        skills = [Skill.objects.create(name=name) for name in ("SQL", "Go")]
+
+        session = AssessmentSession.objects.create(employee=self.eng[0], status=AssessmentSession.COMPLETED)
+        AssessmentSession.objects.filter(id=session.id).update(
+            completed_at=timezone.make_aware(datetime.combine(DAY, time(10)))
+        )
+        AssessmentResult.objects.create(session=session, skill=skills[0], score=50)
+        AssessmentResult.objects.create(session=session, skill=skills[1], score=90)
+
+    def test_metrics_per_department_and_org(self):
+        metrics = analytics_snapshots.compute_metrics(DAY)
+        self.assertEqual(metrics["Eng"]["employees"], 2)
+        self.assertEqual(metrics["Eng"]["assessments_completed_day"], 1)
+        self.assertEqual(metrics["Eng"]["open_skill_gaps"], 1)
+        self.assertEqual(metrics["Eng"]["avg_score"], 70)
+        self.assertIsNone(metrics["Ops"]["avg_score"])
+        self.assertEqual(metrics[AnalyticsSnapshot.ORG]["employees"], 3)
+        self.assertEqual(metrics[AnalyticsSnapshot.ORG]["avg_score"], 70)
+
+    def test_session_counts_only_up_to_the_day(self):
+        before = analytics_snapshots.compute_metrics(DAY - timedelta(days=1))
+        self.assertEqual(before["Eng"]["assessments_completed"], 0)
+        after = analytics_snapshots.compute_metrics(DAY + timedelta(days=1))
+        self.assertEqual((after["Eng"]["assessments_completed"], after["Eng"]["assessments_completed_day"]), (1, 0))
+
+    def test_snapshot_replaces_the_day(self):
+        call_command("snapshot_analytics", date=DAY.isoformat(), backfill_days=2, stdout=io.StringIO())
+        self.assertEqual(AnalyticsSnapshot.objects.count(), 9)
+        analytics_snapshots.take_snapshot(DAY)
+        self.assertEqual(AnalyticsSnapshot.objects.filter(date=DAY).count(), 3)
+
+
+class TrendTests(TestCase):
+    def setUp(self):
+        # Two full ISO weeks (2024-01-01 is a Monday) and two February days.
+        days = [date(2024, 1, 1) + timedelta(days=i) for i in range(14)] + [date(2024, 2, 1), date(2024, 2, 2)]
+        AnalyticsSnapshot.objects.bulk_create([
+            AnalyticsSnapshot(
+                date=day, department=AnalyticsSnapshot.ORG, employees=10 if i % 2 else 20,
+                assessments_completed=i, assessments_completed_day=1, avg_score=60.25,
+            )
+            for i, day in enumerate(days)
+        ] + [AnalyticsSnapshot(date=days[0], department="Eng", employees=4)])
+
+    def points(self, bucket, department=AnalyticsSnapshot.ORG):
+        return analytics_snapshots.trend(date(2024, 1, 1), date(2024, 2, 29), bucket, department)
+
+    def test_daily_points(self):
+        points = self.points("day")
+        self.assertEqual(len(points), 16)
+        self.assertEqual((points[0]["period"], points[0]["employees"], points[0]["days"]), ("2024-01-01", 20, 1))
+
+    def test_weekly_buckets_aggregate_by_metric_kind(self):
+        week1, week2 = self.points("week")[:2]
+        self.assertEqual((week1["period"], week2["period"]), ("2024-01-01", "2024-01-08"))
+        # Cumulative: last value; level: average; activity: total.
+        self.assertEqual((week1["assessments_completed"], week2["assessments_completed"]), (6, 13))
+        self.assertAlmostEqual(week1["employees"], (4 * 20 + 3 * 10) / 7, places=1)
+        self.assertEqual(week1["assessments_completed_day"], 7)
+        self.assertEqual(week1["avg_score"], 60.2)
+
+    def test_monthly_buckets(self):
+        points = self.points("month")
+        self.assertEqual([(p["period"], p["days"]) for p in points], [("2024-01-01", 14), ("2024-02-01", 2)])
+
+    def test_department_series(self):
+        self.assertEqual([p["employees"] for p in self.points("day", "Eng")], [4])
+
+
+class TrendEndpointTests(TestCase):
+    def setUp(self):
+        self.client = admin_client()
+        AnalyticsSnapshot.objects.create(date=date(2024, 1, 3), department=AnalyticsSnapshot.ORG, employees=5)
+
+    def get(self, query):
+        return self.client.get(f"/api/admin/analytics/trends/?{query}")
+
+    def test_range_and_bucket(self):
+        body = json.loads(self.get("from=2024-01-01&to=2024-01-31&bucket=week").content)
+        self.assertEqual((body["from"], body["to"], body["bucket"]), ("2024-01-01", "2024-01-31", "week"))
+        self.assertEqual([p["employees"] for p in body["points"]], [5])
+
+    def test_default_range_is_ninety_days(self):
+        body = json.loads(self.get("to=2024-04-30").content)
+        self.assertEqual(body["from"], "2024-02-01")
+        self.assertEqual(body["points"], [])
+
+    def test_default_range_stops_at_the_first_date(self):
+        response = self.get("to=0001-01-01")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["from"], "0001-01-01")
+
+    def test_invalid_parameters(self):
+        for query in ("bucket=year", "from=2024-13-01", "from=2024-02-01&to=2024-01-01"):
+            with self.subTest(query=query):
+                self.assertEqual(self.get(query).status_code, 400)
@@ -0,0 +1,67 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..models import Employee, UserProfile
+from .utils import PASSWORD, make_user
+
+
+@override_settings(AUTH_TRUST_JWT_CLAIMS=True)
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user("boss")
+        self.client = APIClient()
+        self.token = self.login("boss")
+
+    def login(self, username):
+        login = self.client.post("/api/auth/login/", {"username": username, "password": PASSWORD}, format="json")
+        return json.loads(login.content)["access"]
+
+    def get(self, path, token=None):
+        return self.client.get(path, HTTP_AUTHORIZATION=f"Bearer {token or self.token}")
+
+    def test_claims_are_trusted_until_role_changes(self):
+        self.assertEqual(self.get("/api/admin/llm-usage/").status_code, 200)
+        self.assertEqual(json.loads(self.get("/api/auth/me/").content)["id"], self.user.id)
+
+        profile = UserProfile.objects.get(user=self.user)
+        profile.role = "EMPLOYEE"
+        profile.save()
+        self.assertEqual(self.get("/api/admin/llm-usage/").status_code, 403)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.get("/api/admin/llm-usage/").status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get("/api/admin/llm-usage/").status_code, 401)
+
+    def test_employee_scope_follows_the_profile(self):
+        mine = Employee.objects.create(name="Mine", tsr_role="dev")
+        other = Employee.objects.create(name="Other", tsr_role="dev")
+        user = make_user("emp", role="EMPLOYEE", employee=mine)
+        token = self.login("emp")
+
+        self.assertEqual(self.get(f"/api/learner/employees/{mine.id}/", token).status_code, 200)
+        self.assertEqual(self.get(f"/api/learner/employees/{other.id}/", token).status_code, 403)
+
+        profile = UserProfile.objects.get(user=user)
+        profile.employee = other
+        profile.save()
+        self.assertEqual(self.get(f"/api/learner/employees/{mine.id}/", token).status_code, 403)
+        self.assertEqual(self.get(f"/api/learner/employees/{other.id}/", token).status_code, 200)
+
+
+@override_settings(AUTH_TRUST_JWT_CLAIMS=False)
+class DatabaseAuthenticationTests(TestCase):
+    def test_role_is_read_from_the_database(self):
+        user = make_user("boss")
+        client = APIClient()
+        login = client.post("/api/auth/login/", {"username": "boss", "password": PASSWORD}, format="json")
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {json.loads(login.content)['access']}")
+        self.assertEqual(client.get("/api/admin/llm-usage/").status_code, 200)
+
+        UserProfile.objects.filter(user=user).update(role="EMPLOYEE")
+        self.assertEqual(client.get("/api/admin/llm-usage/").status_code, 403)
@@ -0,0 +1,99 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+
+from ..models import Employee, ProfileSummary
+from .utils import admin_client
+
+PAST = datetime(2024, 1, 2, 3, 4, 5, 678000, tzinfo=dt_timezone.utc)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = admin_client()
+        self.employee = Employee.objects.create(name="Una", tsr_role="dev")
+        Employee.objects.filter(id=self.employee.id).update(updated_at=PAST)
+        self.url = f"/api/learner/employees/{self.employee.id}/"
+
+    def get(self, **headers):
+        return self.client.get(self.url, **headers)
+
+    def test_matching_etag_is_answered_before_building(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Cache-Control"], "private, no-cache")
+
+        with mock.patch("learning.views.build_employee_detail") as build:
+            again = self.get(HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+        build.assert_not_called()
+
+    def test_etag_is_the_same_for_every_worker(self):
+        etag = self.get()["ETag"]
+        # Another process starts with an empty local cache.
+        cache.clear()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_write_changes_the_etag_even_within_the_same_second(self):
+        etag = self.get()["ETag"]
+        Employee.objects.filter(id=self.employee.id).update(updated_at=PAST.replace(microsecond=900000))
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_if_modified_since_alone(self):
+        last_modified = self.get()["Last-Modified"]
+        self.assertEqual(last_modified, http_date(PAST.timestamp()))
+
+        not_modified = self.get(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertTrue(not_modified["ETag"].startswith('"employee-'))
+
+    def test_profile_summary_update_is_a_modification(self):
+        first = self.get()
+        ProfileSummary.objects.create(employee=self.employee, profile="{}", input_hash="x")
+        ProfileSummary.objects.filter(employee=self.employee).update(updated_at=PAST.replace(year=2025))
+
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code, 200)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 200)
+
+    def test_no_last_modified_while_the_write_second_is_current(self):
+        Employee.objects.get(id=self.employee.id).save()
+        response = self.get()
+        self.assertTrue(response.has_header("ETag"))
+        self.assertFalse(response.has_header("Last-Modified"))
+
+    def test_unknown_employee_gets_no_validators(self):
+        response = self.client.get("/api/learner/employees/999999/")
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ConditionalGetWithResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = admin_client()
+        self.employee = Employee.objects.create(name="Una", tsr_role="dev")
+        Employee.objects.filter(id=self.employee.id).update(updated_at=PAST)
+        self.url = f"/api/learner/employees/{self.employee.id}/"
+
+    def test_etag_follows_the_cache_version(self):
+        etag = self.client.get(self.url)["ETag"]
+        with mock.patch("learning.views.build_employee_detail") as build:
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        build.assert_not_called()
+
+        self.client.patch(f"{self.url}update/", {"name": "Una B"}, format="json")
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since_304_carries_the_etag(self):
+        first = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], first["ETag"])
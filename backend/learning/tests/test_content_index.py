@@ -0,0 +1,88 @@
+import io
+import json
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from .. import content_index
+from ..models import LearningContent, Skill
+from .utils import admin_client
+
+TITLES = {
+    "Python": ["Python basics for beginners", "Python decorators explained", "Advanced Python generators"],
+    "Docker": ["Docker containers from scratch", "Docker compose for local development"],
+    "Kubernetes": ["Kubernetes pods and deployments"],
+}
+
+
+class ContentIndexTests(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path, True)
+        settings = override_settings(CONTENT_INDEX_DIR=self.path, CONTENT_INDEX_DIMS=2 ** 12)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.content = {}
+        for skill_name, titles in TITLES.items():
+            skill = Skill.objects.create(name=skill_name)
+            for title in titles:
+                self.content[title] = LearningContent.objects.create(
+                    title=title, skill=skill, content_url="https://example.com/x", source="YouTube",
+                )
+
+    def test_similar_content_ranks_same_topic_first(self):
+        content_index.build_index()
+        index = content_index.get_index()
+        hits = index.similar(self.content["Python decorators explained"].id, k=3, diversity=0)
+        titles = [LearningContent.objects.get(id=cid).title for cid, _ in hits]
+        self.assertCountEqual(titles[:2], ["Python basics for beginners", "Advanced Python generators"])
+        self.assertEqual(index.similar(123456), [])
+
+    def test_incremental_build_only_revectorises_changes(self):
+        self.assertEqual(content_index.build_index()["vectorised"], 6)
+        item = self.content["Docker containers from scratch"]
+        item.title = "Docker images and containers"
+        item.save()
+        self.content["Kubernetes pods and deployments"].delete()
+
+        summary = content_index.build_index()
+        self.assertEqual((summary["vectorised"], summary["removed"], summary["rows"]), (1, 1, 5))
+
+    def test_stale_flag_is_shared_and_survives_the_cache(self):
+        self.assertTrue(content_index.is_stale())
+        content_index.build_index()
+        self.assertFalse(content_index.is_stale())
+
+        self.content["Python basics for beginners"].save()
+        # Another process has its own (empty) local cache.
+        cache.clear()
+        self.assertTrue(content_index.is_stale())
+
+        content_index.build_index()
+        self.content["Python basics for beginners"].delete()
+        self.assertTrue(content_index.is_stale())
+
+    def test_build_if_stale_command(self):
+        call_command("build_content_index", "--if-stale", stdout=io.StringIO())
+        self.assertFalse(content_index.is_stale())
+        built = content_index.get_index().meta["version"]
+
+        call_command("build_content_index", "--if-stale", stdout=io.StringIO())
+        self.assertEqual(content_index.get_index().meta["version"], built)
+
+    def test_related_endpoint(self):
+        content_index.build_index()
+        item = self.content["Docker containers from scratch"]
+        response = admin_client().get(f"/api/learner/content/{item.id}/related/?k=1&diversity=0")
+        body = json.loads(response.content)
+        self.assertFalse(body["degraded"])
+        self.assertEqual([r["title"] for r in body["related"]], ["Docker compose for local development"])
+
+    def test_fill_sparse_skills_adds_related_items(self):
+        content_index.build_index()
+        extra = content_index.fill_sparse_skills({"Kubernetes": 1}, exclude_ids=[], minimum=2)
+        self.assertEqual(len(extra.get("Kubernetes", [])), 1)
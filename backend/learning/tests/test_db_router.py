@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase
+
+from .. import db_router
+from ..models import Employee
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = db_router.PrimaryReplicaRouter()
+        patch = mock.patch.object(db_router, "replica_configured", return_value=True)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def read(self):
+        return self.router.db_for_read(Employee)
+
+    def test_reads_go_to_the_replica_only_when_asked(self):
+        self.assertIsNone(self.read())
+        with db_router.use_replica():
+            self.assertEqual(self.read(), "replica")
+        self.assertIsNone(self.read())
+
+    def test_block_reads_from_the_primary_after_a_write(self):
+        with db_router.use_replica():
+            self.assertEqual(self.router.db_for_write(Employee), "default")
+            self.assertIsNone(self.read())
+
+    def test_nested_block_restores_the_outer_routing(self):
+        state = {"replica": False, "wrote": False}
+        token = db_router._state.set(state)
+        try:
+            with db_router.use_replica():
+                self.assertEqual(self.read(), "replica")
+            self.assertIsNone(self.read())
+        finally:
+            db_router._state.reset(token)
+
+    def test_no_replica_configured_reads_from_the_primary(self):
+        with mock.patch.object(db_router, "replica_configured", return_value=False):
+            with db_router.use_replica():
+                self.assertIsNone(self.read())
+
+    def test_replica_is_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica", "learning"))
+        self.assertTrue(self.router.allow_migrate("default", "learning"))
+
+
+class PrimaryPinTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = db_router.PrimaryReplicaRouter()
+        self.user = SimpleNamespace(id=7, is_authenticated=True)
+        patch = mock.patch.object(db_router, "replica_configured", return_value=True)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def request(self, view):
+        request = RequestFactory().post("/")
+        request.user = self.user
+        return db_router.PrimaryPinMiddleware(view)(request)
+
+    def read_view(self):
+        seen = []
+
+        @db_router.replica_reads
+        def view(request):
+            seen.append(self.router.db_for_read(Employee))
+            return "ok"
+
+        request = RequestFactory().get("/")
+        request.user = self.user
+        view(request)
+        return seen[0]
+
+    def test_write_pins_the_user_to_the_primary(self):
+        self.assertEqual(self.read_view(), "replica")
+
+        self.request(lambda request: self.router.db_for_write(Employee))
+        self.assertTrue(db_router.is_pinned(self.user))
+        self.assertIsNone(self.read_view())
+
+    def test_read_only_request_does_not_pin(self):
+        self.request(lambda request: self.router.db_for_read(Employee))
+        self.assertFalse(db_router.is_pinned(self.user))
+
+    def test_anonymous_users_are_never_pinned(self):
+        self.assertFalse(db_router.is_pinned(SimpleNamespace(is_authenticated=False)))
+        self.assertFalse(db_router.is_pinned(None))
@@ -0,0 +1,106 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipUnless
+
+import numpy
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+from .. import fastjson
+from ..renderers import FastJSONParser, FastJSONRenderer
+
+SAMPLE = {
+    "ints": [0, -1, 2 ** 63 - 1, 2 ** 70],
+    "floats": [0.1, 1e-7, 1.5e300, numpy.float64(0.25)],
+    "text": "naïve café ✓ \"quoted\" \\ \n",
+    "nested": {"a": [None, True, False, {}], "b": []},
+    1: "non-string key",
+    "when": datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=dt_timezone.utc),
+    "naive": datetime(2024, 5, 6, 7, 8, 9),
+    "day": date(2024, 5, 6),
+    "price": Decimal("12.50"),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "label": gettext_lazy("Lazy"),
+}
+
+
+@skipUnless(fastjson.orjson, "orjson is not installed")
+class FastJSONParityTests(SimpleTestCase):
+    def both(self, fn, *args):
+        with self.settings(JSON_BACKEND="stdlib"):
+            stdlib = fn(*args)
+        with self.settings(JSON_BACKEND="auto"):
+            self.assertEqual(fastjson.backend(), "orjson")
+            fast = fn(*args)
+        return stdlib, fast
+
+    def test_dumps_parses_to_the_same_value(self):
+        stdlib, fast = self.both(fastjson.dumps, SAMPLE)
+        self.assertEqual(json.loads(fast), json.loads(stdlib))
+        self.assertEqual(json.loads(fast)["when"], "2024-05-06T07:08:09.123Z")
+
+    def test_drf_encoder_parity(self):
+        stdlib, fast = self.both(fastjson.dumps, SAMPLE, JSONEncoder)
+        self.assertEqual(json.loads(fast), json.loads(stdlib))
+
+    def test_unserializable_raises_type_error_either_way(self):
+        for backend in ("stdlib", "auto"):
+            with self.subTest(backend=backend), self.settings(JSON_BACKEND=backend):
+                with self.assertRaises(TypeError):
+                    fastjson.dumps({"x": object()})
+
+    def test_loads_parity(self):
+        text = '{"a": [1, 2.5, "é", null, true], "b": {"c": "\\u00e9\\ud83d\\ude00"}}'
+        stdlib, fast = self.both(fastjson.loads, text)
+        self.assertEqual(fast, stdlib)
+        self.assertEqual(self.both(fastjson.loads, text.encode())[1], stdlib)
+
+    def test_bad_input_is_a_value_error(self):
+        for backend in ("stdlib", "auto"):
+            with self.subTest(backend=backend), self.settings(JSON_BACKEND=backend):
+                for bad in ("{", "", "[1,]", b"\xff"):
+                    with self.assertRaises(ValueError):
+                        fastjson.loads(bad)
+
+    def test_documented_differences(self):
+        with self.settings(JSON_BACKEND="auto"):
+            self.assertEqual(json.loads(fastjson.dumps({"x": float("nan")})), {"x": None})
+            self.assertIsInstance(fastjson.loads("123456789012345678901234567890"), float)
+            with self.assertRaises(ValueError):
+                fastjson.loads("NaN")
+
+    def test_json_response(self):
+        stdlib, fast = self.both(lambda: fastjson.JsonResponse({"a": SAMPLE["when"], "b": "é"}).content)
+        self.assertEqual(json.loads(fast), json.loads(stdlib))
+        self.assertFalse(fastjson.JsonResponse([1], safe=False).content.startswith(b" "))
+        with self.assertRaises(TypeError):
+            fastjson.JsonResponse([1])
+
+    def test_renderer_and_parser(self):
+        data = {"items": [{"id": 1, "when": SAMPLE["when"], "price": Decimal("1.10")}]}
+        stdlib, fast = self.both(FastJSONRenderer().render, data)
+        self.assertEqual(json.loads(fast), json.loads(stdlib))
+
+        parsed = self.both(lambda: FastJSONParser().parse(io.BytesIO(fast)))
+        self.assertEqual(parsed[0], parsed[1])
+        for backend in ("stdlib", "auto"):
+            with self.subTest(backend=backend), self.settings(JSON_BACKEND=backend):
+                with self.assertRaises(ParseError):
+                    FastJSONParser().parse(io.BytesIO(b"{bad"))
+
+    def test_indented_render_uses_the_stdlib(self):
+        with self.settings(JSON_BACKEND="auto"):
+            rendered = FastJSONRenderer().render({"a": 1}, "application/json; indent=2")
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+
+class StdlibFallbackTests(SimpleTestCase):
+    @override_settings(JSON_BACKEND="stdlib")
+    def test_stdlib_backend_is_plain_json(self):
+        self.assertEqual(fastjson.backend(), "stdlib")
+        self.assertEqual(fastjson.dumps({"a": [1, "é"]}), json.dumps({"a": [1, "é"]}).encode())
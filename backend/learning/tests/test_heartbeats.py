@@ -0,0 +1,139 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase
+
+from .. import heartbeats
+from ..models import Employee, LearningContent, LearningProgress, Skill
+from .utils import admin_client
+
+
+class HeartbeatTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # A fresh buffer and duration cache per test (ids get reused).
+        buffer = heartbeats.HeartbeatBuffer(flush_seconds=3600, min_delta=10, complete_percent=90)
+        patches = [
+            mock.patch.object(heartbeats, "_buffer", buffer),
+            mock.patch.dict(heartbeats._durations, clear=True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.buffer = buffer
+
+        self.client = admin_client()
+        self.employee = Employee.objects.create(name="Lena", tsr_role="dev")
+        self.skill = Skill.objects.create(name="Go")
+        self.content = self.add_content("Go basics", 10)
+        self.url = f"/api/learner/{self.employee.id}/learning/heartbeat/"
+
+    def add_content(self, title, minutes):
+        return LearningContent.objects.create(
+            title=title, skill=self.skill, content_url=f"https://example.com/{title}",
+            duration_minutes=minutes, difficulty="Beginner", content_type="video",
+        )
+
+    def beat(self, **fields):
+        response = self.client.post(self.url, {"content_id": self.content.id, **fields}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        return json.loads(response.content)
+
+    def progress(self):
+        return LearningProgress.objects.get(employee=self.employee, content=self.content)
+
+    def test_ticks_are_coalesced(self):
+        written = sum(self.beat(seconds=second)["written"] for second in range(0, 300))
+        # First heartbeat, then every 10 points of a 600 second video.
+        self.assertEqual(written, 5)
+        self.assertEqual(self.progress().watched_percent, 40)
+        self.assertEqual(self.progress().status, LearningProgress.IN_PROGRESS)
+
+        self.buffer.flush()
+        self.assertEqual(self.progress().watched_seconds, 299)
+
+    def test_completion_threshold_marks_done(self):
+        self.beat(percent=10)
+        body = self.beat(percent=91)
+        self.assertEqual(body["items"][0]["status"], LearningProgress.DONE)
+        self.assertEqual(self.progress().status, LearningProgress.DONE)
+
+    def test_progress_never_goes_backwards(self):
+        self.beat(percent=95)
+        self.beat(percent=20)
+        self.buffer.flush()
+        progress = self.progress()
+        self.assertEqual(progress.watched_percent, 95)
+        self.assertEqual(progress.status, LearningProgress.DONE)
+
+    def test_many_contents_per_request_and_unknown_content(self):
+        other = self.add_content("Go advanced", 20)
+        response = self.client.post(self.url, {"heartbeats": [
+            {"content_id": self.content.id, "percent": 30},
+            {"content_id": other.id, "seconds": 600},
+        ]}, format="json")
+        items = {i["content_id"]: i for i in json.loads(response.content)["items"]}
+        self.assertEqual(items[other.id]["percent"], 50)
+        self.assertEqual(LearningProgress.objects.filter(employee=self.employee).count(), 2)
+
+        missing = self.client.post(self.url, {"content_id": other.id + 100, "percent": 5}, format="json")
+        self.assertEqual(missing.status_code, 404)
+        invalid = self.client.post(self.url, {"content_id": other.id}, format="json")
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_content_deleted_after_its_duration_was_cached(self):
+        other = self.add_content("Go advanced", 20)
+        heartbeats.content_durations([other.id])
+        other_id = other.id
+        other.delete()
+        self.assertNotIn(other_id, heartbeats._durations)
+
+        # Another process still has the duration cached.
+        heartbeats._durations[other_id] = 20
+        response = self.client.post(self.url, {"heartbeats": [
+            {"content_id": self.content.id, "percent": 30},
+            {"content_id": other_id, "percent": 30},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        items = {i["content_id"]: i for i in json.loads(response.content)["items"]}
+        self.assertEqual((items[self.content.id]["persisted"], items[other_id]["persisted"]), (True, False))
+        self.assertEqual(self.progress().watched_percent, 30)
+        self.assertEqual(self.buffer.take_due(everything=True), [])
+
+    def test_row_that_fails_is_dropped_not_retried(self):
+        other = self.add_content("Go advanced", 20)
+        persist = heartbeats.persist
+
+        def reject_other(rows):
+            if any(content_id == other.id for _, content_id, _, _ in rows):
+                raise IntegrityError("FOREIGN KEY constraint failed")
+            return persist(rows)
+
+        with mock.patch.object(heartbeats, "persist", side_effect=reject_other):
+            written = heartbeats.record(self.employee.id, [(self.content.id, 30, 180), (other.id, 30, 360)])
+        self.assertEqual(written, {self.content.id: LearningProgress.IN_PROGRESS})
+        self.assertEqual(self.buffer.rows_written, 1)
+        self.assertEqual(self.buffer.take_due(everything=True), [])
+
+    def test_other_failures_are_retried(self):
+        with mock.patch.object(heartbeats, "persist", side_effect=RuntimeError("database is locked")):
+            with self.assertRaises(RuntimeError):
+                heartbeats.record(self.employee.id, [(self.content.id, 30, 180)])
+        self.buffer.flush()
+        self.assertEqual(self.progress().watched_percent, 30)
+
+    def test_changed_duration_is_reloaded(self):
+        self.assertEqual(heartbeats.content_durations([self.content.id]), {self.content.id: 10})
+        self.content.duration_minutes = 30
+        self.content.save()
+        self.assertEqual(heartbeats.content_durations([self.content.id]), {self.content.id: 30})
+
+    def test_duration_cache_is_bounded(self):
+        extra = [self.add_content(f"Go {i}", i) for i in range(3)]
+        with mock.patch.object(heartbeats, "DURATION_CACHE_SIZE", 2):
+            for content in extra:
+                heartbeats.content_durations([content.id])
+                self.assertLessEqual(len(heartbeats._durations), 2)
+            self.assertEqual(heartbeats.content_durations([extra[0].id]), {extra[0].id: 0})
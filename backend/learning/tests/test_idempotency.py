@@ -0,0 +1,46 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import AssessmentQuestion, AssessmentResult, AssessmentSession, Employee, IdempotencyRecord, Skill
+from .utils import admin_client
+
+
+class SubmitAssessmentReplayTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = admin_client()
+        self.employee = Employee.objects.create(name="Asha", tsr_role="dev", current_skills='["Python"]')
+        skill = Skill.objects.create(name="Python")
+        self.session = AssessmentSession.objects.create(employee=self.employee)
+        self.questions = [
+            AssessmentQuestion.objects.create(
+                session=self.session, skill=skill, question_text=f"Question {i}?",
+                options={"A": "yes", "B": "no"}, correct_option="A",
+            )
+            for i in range(2)
+        ]
+        self.url = f"/api/learner/{self.employee.id}/assessment/submit/"
+
+    def submit(self, answers, **headers):
+        return self.client.post(self.url, {"answers": answers}, format="json", **headers)
+
+    def test_retry_replays_stored_result(self):
+        answers = {str(self.questions[0].id): "A", str(self.questions[1].id): "B"}
+        first = self.submit(answers)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(json.loads(first.content)["results"], {"Python": 50})
+
+        retry = self.submit(answers)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(AssessmentResult.objects.filter(session=self.session).count(), 1)
+        self.assertEqual(IdempotencyRecord.objects.count(), 1)
+
+    def test_different_body_after_completion_is_not_replayed(self):
+        self.submit({str(self.questions[0].id): "A"}, HTTP_IDEMPOTENCY_KEY="k1")
+        other = self.submit({str(self.questions[0].id): "B"}, HTTP_IDEMPOTENCY_KEY="k2")
+        self.assertEqual(other.status_code, 400)
+        self.assertFalse(other.has_header("Idempotent-Replayed"))
@@ -0,0 +1,78 @@
+from django.test import SimpleTestCase, override_settings
+
+from ..llm import LLMClient, LLMQuotaError, LLMResponseError, LLMTimeoutError, LLMUnavailableError
+from ..llm.backends import FakeBackend, LLMResponse
+
+
+class ScriptedBackend:
+    """
+    Raises or returns the scripted outcomes in order and records the
+    timeout each attempt was given.
+    """
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.timeouts = []
+
+    def generate(self, prompt, model, timeout):
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return LLMResponse(text=outcome, model=model)
+
+
+@override_settings(LLM_TELEMETRY_ENABLED=False)
+class LLMClientTests(SimpleTestCase):
+    def client_for(self, backend, **kwargs):
+        self.sleeps = []
+        options = {"timeout": 5.0, "deadline": 60.0, "max_retries": 3, "base_delay": 1.0, "max_delay": 20.0}
+        return LLMClient(backend, model="test", sleep=self.sleeps.append, **{**options, **kwargs})
+
+    def test_transient_failures_are_retried_with_backoff(self):
+        backend = ScriptedBackend(LLMUnavailableError("503"), LLMTimeoutError("slow"), '{"ok": true}')
+        self.assertEqual(self.client_for(backend).generate_json("hi"), {"ok": True})
+        self.assertEqual(len(backend.timeouts), 3)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertTrue(all(0 <= s <= 2 for s in self.sleeps))
+
+    def test_gives_up_after_max_retries(self):
+        backend = ScriptedBackend(*[LLMUnavailableError("503")] * 3)
+        with self.assertRaises(LLMUnavailableError):
+            self.client_for(backend, max_retries=2).generate("hi")
+        self.assertEqual(len(backend.timeouts), 3)
+
+    def test_bad_response_is_not_retried(self):
+        backend = ScriptedBackend(LLMResponseError("empty"), "never")
+        with self.assertRaises(LLMResponseError):
+            self.client_for(backend).generate("hi")
+        self.assertEqual(self.sleeps, [])
+
+    def test_long_retry_after_is_surfaced_instead_of_sleeping(self):
+        backend = ScriptedBackend(LLMQuotaError("429", retry_after=120), "never")
+        with self.assertRaises(LLMQuotaError):
+            self.client_for(backend).generate("hi")
+        self.assertEqual(self.sleeps, [])
+
+    def test_retry_after_is_honoured_within_max_delay(self):
+        backend = ScriptedBackend(LLMQuotaError("429", retry_after=7), "done")
+        self.assertEqual(self.client_for(backend).generate_text("hi"), "done")
+        self.assertGreaterEqual(self.sleeps[0], 7)
+
+    def test_retry_that_would_pass_the_deadline_is_not_attempted(self):
+        backend = ScriptedBackend(LLMQuotaError("429", retry_after=8), "never")
+        with self.assertRaises(LLMQuotaError):
+            self.client_for(backend, deadline=5.0).generate("hi")
+        self.assertEqual(self.sleeps, [])
+
+    def test_attempt_timeout_is_capped_by_the_deadline(self):
+        backend = ScriptedBackend("done")
+        self.client_for(backend, timeout=30.0, deadline=2.0).generate("hi")
+        self.assertLessEqual(backend.timeouts[0], 2.0)
+
+    def test_fake_backend_streams_the_generated_reply(self):
+        client = self.client_for(FakeBackend())
+        prompt = "Generate 5 multiple choice questions. Each question must be Easy."
+        streamed = list(client.stream_json_objects(prompt))
+        self.assertEqual(streamed, client.generate_json(prompt))
+        self.assertEqual(len(streamed), 5)
@@ -0,0 +1,122 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..agents import ProfileAgent
+from ..llm import LLMCircuitOpenError, LLMResponseError, LLMThrottledError, LLMUnavailableError, use_backend
+from ..llm.backends import FakeBackend
+from ..llm.guard import LLMGuard
+from ..models import Employee, LLMGuardState
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class LLMGuardTests(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+
+    def guard(self, **kwargs):
+        # A new instance per "worker"; they share only the DB row.
+        options = {"rate_per_minute": 600, "burst": 100, "max_wait": 0,
+                   "failure_threshold": 3, "cooldown": 60, "clock": self.clock}
+        return LLMGuard("test", **{**options, **kwargs})
+
+    def trip(self, guard):
+        for _ in range(3):
+            guard.before_call()
+            guard.record_failure(LLMUnavailableError("503"))
+
+    def test_breaker_opens_for_every_worker(self):
+        self.trip(self.guard())
+        for guard in (self.guard(), self.guard()):
+            with self.assertRaises(LLMCircuitOpenError) as raised:
+                guard.before_call()
+            self.assertAlmostEqual(raised.exception.retry_after, 60)
+
+    def test_our_own_errors_do_not_trip_the_breaker(self):
+        guard = self.guard()
+        for _ in range(5):
+            guard.record_failure(LLMResponseError("bad json"))
+            guard.record_failure(LLMThrottledError("local limit"))
+        guard.before_call()
+        self.assertFalse(LLMGuardState.objects.filter(name="test", failures__gt=0).exists())
+
+    def test_half_open_lets_one_probe_through(self):
+        self.trip(self.guard())
+        self.clock.now += 61
+
+        probe = self.guard()
+        probe.before_call()
+        with self.assertRaises(LLMCircuitOpenError):
+            self.guard().before_call()
+
+        probe.record_success()
+        self.guard().before_call()
+        self.assertEqual(LLMGuardState.objects.get(name="test").failures, 0)
+
+    def test_failed_probe_reopens_the_breaker(self):
+        self.trip(self.guard())
+        self.clock.now += 61
+
+        probe = self.guard()
+        probe.before_call()
+        probe.record_failure(LLMUnavailableError("still down"))
+        self.assertTrue(probe.is_open())
+        self.clock.now += 30
+        with self.assertRaises(LLMCircuitOpenError):
+            self.guard().before_call()
+
+    def test_rate_limit_is_shared_and_refills(self):
+        first, second = self.guard(rate_per_minute=60, burst=2), self.guard(rate_per_minute=60, burst=2)
+        first.before_call()
+        second.before_call()
+        with self.assertRaises(LLMThrottledError) as raised:
+            first.before_call()
+        self.assertAlmostEqual(raised.exception.retry_after, 1)
+
+        self.clock.now += 1
+        second.before_call()
+
+    def test_waits_for_a_token_within_max_wait(self):
+        slept = []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            self.clock.now += seconds
+
+        guard = self.guard(rate_per_minute=60, burst=1, max_wait=2, sleep=sleep)
+        guard.before_call()
+        guard.before_call()
+        self.assertEqual(slept, [1])
+
+
+@override_settings(LLM_TELEMETRY_ENABLED=False)
+class DegradedProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = Employee.objects.create(name="Ada", tsr_role="dev", current_skills='["Python"]')
+
+    def test_open_breaker_serves_fallback_without_calling_the_model(self):
+        guard = LLMGuard("fake", failure_threshold=1, cooldown=60)
+        guard.record_failure(LLMUnavailableError("down"))
+
+        with use_backend(FakeBackend(), guard=guard) as backend:
+            profile = ProfileAgent.build(self.employee)
+        self.assertTrue(profile["degraded"])
+        self.assertEqual(backend.calls, 0)
+
+    def test_fallback_prefers_the_last_good_profile(self):
+        with use_backend(FakeBackend()):
+            good = ProfileAgent.build(self.employee)
+        self.assertNotIn("degraded", good)
+
+        guard = LLMGuard("fake", failure_threshold=1, cooldown=60)
+        guard.record_failure(LLMUnavailableError("down"))
+        with use_backend(FakeBackend(), guard=guard):
+            profile = ProfileAgent.build(self.employee)
+        self.assertEqual(profile, {**good, "degraded": True})
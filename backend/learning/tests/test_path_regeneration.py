@@ -0,0 +1,121 @@
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from .. import path_regeneration, paths
+from ..models import (
+    AssessmentResult,
+    AssessmentSession,
+    Employee,
+    LearningContent,
+    LearningPath,
+    PathRegenerationRun,
+    Skill,
+)
+from .utils import admin_client
+
+
+class PathRegenerationTests(TestCase):
+    def setUp(self):
+        # No content index: paths come from the catalog alone.
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, True)
+        settings = override_settings(CONTENT_INDEX_DIR=index_dir, LLM_TELEMETRY_ENABLED=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        path_regeneration._catalog = None
+        self.addCleanup(setattr, path_regeneration, "_catalog", None)
+
+        sql = Skill.objects.create(name="SQL")
+        for i in range(4):
+            LearningContent.objects.create(
+                title=f"SQL part {i}", skill=sql, content_url=f"https://example.com/sql/{i}",
+                duration_minutes=90, difficulty="Beginner", content_type="video",
+            )
+        self.employees = []
+        for i in range(5):
+            employee = Employee.objects.create(name=f"E{i}", tsr_role="dev")
+            session = AssessmentSession.objects.create(employee=employee, status=AssessmentSession.COMPLETED)
+            AssessmentResult.objects.create(session=session, skill=sql, score=40)
+            self.employees.append(employee)
+        # No completed assessment: left alone.
+        self.unassessed = Employee.objects.create(name="New", tsr_role="dev")
+
+    def regenerate(self, **kwargs):
+        return path_regeneration.regenerate_all(workers=1, log=lambda line: None, **kwargs)
+
+    def weeks(self, employee):
+        return [item["week"] for item in paths.path_items(LearningPath.objects.get(employee=employee))]
+
+    def test_writes_every_assessed_employees_path(self):
+        report = self.regenerate(chunk_size=2)
+        self.assertEqual((report["status"], report["chunks"], report["employees"]), ("DONE", 3, 6))
+        self.assertEqual(report["paths_written"], 5)
+        self.assertFalse(LearningPath.objects.filter(employee=self.unassessed).exists())
+
+        again = self.regenerate(chunk_size=2)
+        self.assertEqual((again["run"] > report["run"], again["paths_written"]), (True, 0))
+
+    def test_same_path_as_the_endpoint(self):
+        self.regenerate()
+        employee = self.employees[0]
+        version = LearningPath.objects.get(employee=employee).version
+
+        response = admin_client().post(f"/api/learner/{employee.id}/generate_learning_path/", {}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(LearningPath.objects.get(employee=employee).version, version)
+
+    def test_interrupted_run_resumes_with_the_open_chunks(self):
+        save_plans = paths.save_plans
+        calls = []
+
+        def fail_second_chunk(plans):
+            calls.append(len(plans))
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return save_plans(plans)
+
+        with mock.patch.object(paths, "save_plans", side_effect=fail_second_chunk):
+            with self.assertRaises(KeyboardInterrupt):
+                self.regenerate(chunk_size=2)
+        run = path_regeneration.latest_run()
+        self.assertEqual(run.chunks.filter(done_at__isnull=False).count(), 1)
+        self.assertEqual(LearningPath.objects.count(), 2)
+
+        report = self.regenerate(chunk_size=2)
+        self.assertEqual((report["run"], report["chunks"], report["chunks_resumed_past"]), (run.id, 2, 1))
+        self.assertEqual(LearningPath.objects.count(), 5)
+        self.assertIsNone(path_regeneration.latest_run())
+
+    def test_restart_abandons_the_open_run(self):
+        run = path_regeneration.start_run(chunk_size=2)
+        report = self.regenerate(restart=True)
+        self.assertNotEqual(report["run"], run.id)
+        self.assertEqual(PathRegenerationRun.objects.get(id=run.id).status, PathRegenerationRun.RUNNING)
+
+    def test_done_chunk_is_not_redone(self):
+        run = path_regeneration.start_run(chunk_size=10)
+        chunk = run.chunks.get()
+        self.assertEqual(path_regeneration.regenerate_chunk(chunk.id), (6, 5))
+        self.assertEqual(path_regeneration.regenerate_chunk(chunk.id), (0, 0))
+
+    @override_settings(LEARNING_WEEKLY_HOURS=3)
+    def test_each_path_keeps_its_weekly_hours(self):
+        slow, fast = self.employees[:2]
+        self.regenerate()
+        self.assertEqual(self.weeks(slow), [1, 1, 2, 2])
+
+        LearningPath.objects.filter(employee=fast).update(weekly_hours=6)
+        self.regenerate()
+        self.assertEqual(self.weeks(fast), [1, 1, 1, 1])
+        self.assertEqual(self.weeks(slow), [1, 1, 2, 2])
+
+    def test_run_weekly_hours_override_everyone(self):
+        self.regenerate(weekly_hours=1.5)
+        path = LearningPath.objects.get(employee=self.employees[0])
+        self.assertEqual(path.weekly_hours, 1.5)
+        self.assertEqual(self.weeks(self.employees[0]), [1, 2, 3, 4])
+        self.assertEqual(json.loads(path.missing_skills), ["SQL"])
@@ -0,0 +1,131 @@
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ..models import (
+    AssessmentResult,
+    AssessmentSession,
+    Employee,
+    LearningContent,
+    LearningPath,
+    LearningProgress,
+    Skill,
+)
+from .utils import admin_client
+
+
+class LearningPathVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = admin_client()
+        self.employee = Employee.objects.create(name="Ravi", tsr_role="dev", current_skills='["Django"]')
+        skill = Skill.objects.create(name="Django")
+        self.contents = [
+            LearningContent.objects.create(
+                title=f"Django {i}", skill=skill, content_url=f"https://example.com/{i}",
+                duration_minutes=30, difficulty="Beginner", content_type="video",
+            )
+            for i in range(3)
+        ]
+        session = AssessmentSession.objects.create(employee=self.employee, status=AssessmentSession.COMPLETED)
+        AssessmentResult.objects.create(session=session, skill=skill, score=40)
+
+    def generate(self):
+        response = self.client.post(f"/api/learner/{self.employee.id}/generate_learning_path/", {}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def changes(self, since):
+        response = self.client.get(f"/api/learner/{self.employee.id}/learning-path/changes/?since={since}")
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_unchanged_regeneration_writes_nothing(self):
+        first = self.generate()
+        self.assertEqual(first["version"], 1)
+        second = self.generate()
+        self.assertEqual(second["version"], 1)
+        self.assertEqual(second["message"], "Learning path unchanged")
+        self.assertEqual(LearningPath.objects.filter(employee=self.employee).count(), 1)
+        self.assertEqual(self.changes(1)["changes"], [])
+
+    def test_change_bumps_version_and_is_listed_since(self):
+        self.generate()
+        done = self.contents[0]
+        LearningProgress.objects.filter(employee=self.employee, content=done).update(status="DONE")
+
+        second = self.generate()
+        self.assertEqual(second["version"], 2)
+        changes = self.changes(1)["changes"]
+        self.assertEqual([c["version"] for c in changes], [2])
+        updated = {u["content_id"]: u for u in changes[0]["updated"]}
+        self.assertEqual(updated[done.id]["status"], "DONE")
+
+    def test_since_older_than_history_returns_full_path(self):
+        self.generate()
+        with override_settings(LEARNING_PATH_HISTORY_VERSIONS=1):
+            LearningProgress.objects.filter(employee=self.employee, content=self.contents[0]).update(status="DONE")
+            self.generate()
+            LearningProgress.objects.filter(employee=self.employee, content=self.contents[1]).update(status="DONE")
+            self.generate()
+        body = self.changes(0)
+        self.assertTrue(body["full"])
+        self.assertEqual(len(body["learning_items"]), 3)
+
+
+class PathItemsMigrationTests(TransactionTestCase):
+    """
+    0020 turns each employee's latest JSON path into LearningPathItem rows
+    and back.
+    """
+    before = [("learning", "0019_profile_summary")]
+    after = [("learning", "0020_learning_path_versions")]
+
+    ITEMS = [
+        {"content_id": 7, "title": "Joins", "skill": "SQL", "content_url": "https://example.com/7",
+         "thumbnail": "", "duration": 90, "difficulty": "Beginner", "content_type": "video",
+         "status": "IN_PROGRESS", "priority": 2.5, "week": 1},
+        {"content_id": 9, "title": "Indexes", "skill": "SQL", "content_url": "https://example.com/9",
+         "thumbnail": "", "duration": 30, "difficulty": "Advanced", "content_type": "article",
+         "status": "NOT_STARTED", "priority": 1.0, "week": 2},
+    ]
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.addCleanup(self.migrate, self.executor.loader.graph.leaf_nodes())
+        self.migrate(self.before)
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def test_forward_and_backward(self):
+        apps = self.executor.loader.project_state(self.before).apps
+        Employee = apps.get_model("learning", "Employee")
+        LearningPath = apps.get_model("learning", "LearningPath")
+        employee = Employee.objects.create(name="Old", tsr_role="dev")
+        LearningPath.objects.create(employee=employee, status="NOT_STARTED", items=json.dumps(self.ITEMS[:1]))
+        latest = LearningPath.objects.create(employee=employee, status="IN_PROGRESS", items=json.dumps(self.ITEMS))
+        broken = LearningPath.objects.create(
+            employee=Employee.objects.create(name="Broken", tsr_role="dev"), status="NOT_STARTED", items="not json"
+        )
+
+        apps = self.migrate(self.after)
+        LearningPath = apps.get_model("learning", "LearningPath")
+        LearningPathItem = apps.get_model("learning", "LearningPathItem")
+        self.assertEqual(LearningPath.objects.filter(employee_id=employee.id).get().id, latest.id)
+        path = LearningPath.objects.get(id=latest.id)
+        self.assertEqual(path.version, 1)
+        rows = list(LearningPathItem.objects.filter(learning_path=path).order_by("position"))
+        self.assertEqual([(r.content_id, r.position, r.week, r.priority) for r in rows], [("7", 0, 1, 2.5), ("9", 1, 2, 1.0)])
+        self.assertEqual((rows[0].url, rows[0].estimated_hours, rows[0].status), ("https://example.com/7", 2, "IN_PROGRESS"))
+        self.assertFalse(LearningPathItem.objects.filter(learning_path_id=broken.id).exists())
+
+        apps = self.migrate(self.before)
+        LearningPath = apps.get_model("learning", "LearningPath")
+        self.assertEqual(json.loads(LearningPath.objects.get(id=latest.id).items), self.ITEMS)
+        self.assertEqual(json.loads(LearningPath.objects.get(id=broken.id).items), [])
@@ -0,0 +1,90 @@
+import random
+
+from django.test import SimpleTestCase
+
+from ..agents.planner_agent import PlannerAgent
+
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+
+
+def make_items(n, seed=1):
+    rng = random.Random(seed)
+    return [
+        {
+            "content_id": i,
+            "skill": f"skill-{rng.randrange(8)}",
+            "duration": rng.choice([0, 10, 25, 45, 60, 90, 200, 400]),
+            "difficulty": rng.choice(DIFFICULTIES),
+            "content_type": rng.choice(["VIDEO", "ARTICLE"]),
+            "status": rng.choice(["NOT_STARTED", "NOT_STARTED", "IN_PROGRESS", "DONE"]),
+        }
+        for i in range(n)
+    ]
+
+
+def gaps_for(items, seed=1):
+    rng = random.Random(seed)
+    return {item["skill"]: rng.randrange(0, 70) for item in items}
+
+
+def first_fit_scan(planned, budget):
+    """
+    Week of each item by scanning every open week, as the planner did
+    before WeekRoom.
+    """
+    order = sorted(
+        (i for i in planned if i["week"] is not None),
+        key=lambda i: (-i["priority"] / max(i.get("duration") or 0, 1), -i["priority"], i["content_id"]),
+    )
+    room, weeks = [], {}
+    for item in order:
+        minutes = item.get("duration") or 0
+        week = next((w for w, left in enumerate(room) if left >= minutes), None)
+        if week is None:
+            room.append(budget)
+            week = len(room) - 1
+        room[week] -= minutes
+        weeks[item["content_id"]] = week + 1
+    return weeks
+
+
+class PlannerTests(SimpleTestCase):
+    def test_no_week_exceeds_the_budget(self):
+        items = make_items(500)
+        planned = PlannerAgent.plan(items, gaps_for(items), weekly_hours=3)
+
+        minutes = {}
+        for item in planned:
+            if item["week"] is not None:
+                minutes.setdefault(item["week"], []).append(item["duration"])
+        for week, durations in minutes.items():
+            with self.subTest(week=week):
+                # Only an item longer than a whole week may go over, alone.
+                self.assertTrue(sum(durations) <= 180 or len(durations) == 1, durations)
+        self.assertEqual(sorted(minutes), list(range(1, len(minutes) + 1)))
+
+    def test_weeks_match_a_plain_first_fit(self):
+        for seed in range(5):
+            items = make_items(200, seed)
+            planned = PlannerAgent.plan(items, gaps_for(items, seed), weekly_hours=2)
+            weeks = {i["content_id"]: i["week"] for i in planned if i["week"] is not None}
+            self.assertEqual(weeks, first_fit_scan(planned, 120))
+
+    def test_done_items_come_last_without_a_week(self):
+        items = make_items(50)
+        planned = PlannerAgent.plan(items, gaps_for(items), weekly_hours=5)
+        self.assertEqual(len(planned), 50)
+        done = [i for i in planned if i["status"] == "DONE"]
+        self.assertEqual(planned[len(planned) - len(done):], done)
+        self.assertTrue(all(i["week"] is None and i["priority"] == 0 for i in done))
+
+    def test_higher_gap_is_planned_earlier(self):
+        items = [
+            {"content_id": 1, "skill": "small", "duration": 60, "difficulty": "Advanced", "status": "NOT_STARTED"},
+            {"content_id": 2, "skill": "big", "duration": 60, "difficulty": "Beginner", "status": "NOT_STARTED"},
+        ]
+        planned = PlannerAgent.plan(items, {"small": 5, "big": 60}, weekly_hours=1)
+        self.assertEqual([(i["content_id"], i["week"]) for i in planned], [(2, 1), (1, 2)])
+
+    def test_empty_path(self):
+        self.assertEqual(PlannerAgent.plan([], {}, weekly_hours=5), [])
@@ -0,0 +1,120 @@
+import json
+import re
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from .. import profile_summaries
+from ..llm import LLMQuotaError, LLMUnavailableError
+from ..llm.backends import LLMResponse
+from ..models import Employee, ProfileSummary, TSRSkillProfile
+
+
+class BatchClient:
+    """
+    Answers each batch prompt with a profile for every employee in it,
+    except those in `skip`; `errors` are raised by the first calls.
+    """
+
+    def __init__(self, *errors, skip=()):
+        self.errors = list(errors)
+        self.skip = {str(i) for i in skip}
+        self.prompts = []
+
+    def generate(self, prompt, caller=None):
+        self.prompts.append(prompt)
+        if self.errors:
+            raise self.errors.pop(0)
+        ids = [i for i in re.findall(r"Employee (\d+):", prompt) if i not in self.skip]
+        profiles = {i: {"strengths": ["x"], "weaknesses": [], "summary": f"about {i}"} for i in ids}
+        return LLMResponse(text=json.dumps(profiles), model="m", usage={"prompt_tokens": 100, "response_tokens": 50})
+
+    def batches(self):
+        return [re.findall(r"Employee (\d+):", prompt) for prompt in self.prompts]
+
+
+@override_settings(LLM_TELEMETRY_ENABLED=False)
+class ProfileSummaryTests(TestCase):
+    def setUp(self):
+        TSRSkillProfile.objects.create(tsr_role="dev", expected_skills='["Go"]')
+        self.employees = [
+            Employee.objects.create(name=f"E{i}", tsr_role="dev", current_skills='["Go"]', experience_years=i)
+            for i in range(5)
+        ]
+
+    def summarize(self, client, **kwargs):
+        return profile_summaries.summarize_changed(client=client, **{"batch_size": 2, "max_tokens": 0, **kwargs})
+
+    def test_changed_employees_are_sent_in_batches(self):
+        client = BatchClient()
+        report = self.summarize(client)
+        self.assertEqual((report["calls"], report["summarized"], report["remaining"]), (3, 5, 0))
+        self.assertEqual([len(batch) for batch in client.batches()], [2, 2, 1])
+        self.assertEqual(ProfileSummary.objects.get(employee=self.employees[3]).get_profile()["summary"], f"about {self.employees[3].id}")
+
+        again = BatchClient()
+        self.assertEqual(self.summarize(again)["changed"], 0)
+        self.assertEqual(again.prompts, [])
+
+    def test_only_changed_inputs_are_resent(self):
+        self.summarize(BatchClient())
+        Employee.objects.filter(id=self.employees[1].id).update(current_skills='["Go", "Rust"]')
+        TSRSkillProfile.objects.create(tsr_role="ops", expected_skills="[]")
+        Employee.objects.filter(id=self.employees[4].id).update(tsr_role="ops")
+
+        client = BatchClient()
+        self.summarize(client)
+        self.assertEqual(client.batches(), [[str(self.employees[1].id), str(self.employees[4].id)]])
+
+    def test_missing_entries_are_retried_by_the_next_run(self):
+        report = self.summarize(BatchClient(skip=[self.employees[0].id]))
+        self.assertEqual((report["summarized"], report["missing"], report["remaining"]), (4, 1, 1))
+
+        client = BatchClient()
+        self.summarize(client)
+        self.assertEqual(client.batches(), [[str(self.employees[0].id)]])
+
+    def test_call_budget_stops_the_run(self):
+        report = self.summarize(BatchClient(), max_calls=2)
+        self.assertEqual((report["calls"], report["stopped"], report["remaining"]), (2, "call budget", 1))
+
+    def test_token_budget_stops_the_run(self):
+        report = self.summarize(BatchClient(), batch_size=1, max_tokens=400)
+        self.assertEqual(report["stopped"], "token budget")
+        self.assertLessEqual(report["tokens"], 400)
+        self.assertGreater(report["remaining"], 0)
+
+    def test_quota_stops_and_failed_batch_continues(self):
+        report = self.summarize(BatchClient(LLMUnavailableError("503")))
+        self.assertEqual((report["calls"], report["summarized"], report["missing"]), (3, 3, 2))
+
+        report = self.summarize(BatchClient(LLMQuotaError("429")))
+        self.assertEqual((report["calls"], report["summarized"], report["stopped"]), (1, 0, "quota"))
+
+    def test_employees_without_a_summary_go_first(self):
+        self.summarize(BatchClient())
+        Employee.objects.filter(id=self.employees[0].id).update(experience_years=30)
+        newcomer = Employee.objects.create(name="New", tsr_role="dev")
+
+        client = BatchClient()
+        self.summarize(client, batch_size=1)
+        self.assertEqual(client.batches(), [[str(newcomer.id)], [str(self.employees[0].id)]])
+
+    def test_dashboard_reads_the_stored_summary(self):
+        self.summarize(BatchClient())
+        with mock.patch("learning.agents.ProfileAgent.build") as build:
+            profile = profile_summaries.dashboard_profile(self.employees[2])
+        build.assert_not_called()
+        self.assertEqual(profile["summary"], f"about {self.employees[2].id}")
+
+    def test_first_dashboard_view_builds_and_stores_one(self):
+        built = {"strengths": [], "weaknesses": [], "summary": "built"}
+        with mock.patch.object(profile_summaries.ProfileAgent, "build", return_value=built):
+            self.assertEqual(profile_summaries.dashboard_profile(self.employees[0]), built)
+        self.assertEqual(self.summarize(BatchClient())["changed"], 4)
+
+    def test_degraded_profile_is_not_stored(self):
+        degraded = {"strengths": [], "weaknesses": [], "summary": "", "degraded": True}
+        with mock.patch.object(profile_summaries.ProfileAgent, "build", return_value=degraded):
+            profile_summaries.dashboard_profile(self.employees[0])
+        self.assertFalse(ProfileSummary.objects.exists())
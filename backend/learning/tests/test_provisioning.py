@@ -0,0 +1,104 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import provisioning
+from ..models import AccountActivation, Employee, UserProfile
+from .utils import admin_client
+
+
+class ProvisioningTests(TestCase):
+    def employees(self, *emails):
+        return [Employee.objects.create(name=f"E{i}", tsr_role="dev", email=email) for i, email in enumerate(emails)]
+
+    def test_accounts_are_created_with_lowercase_names(self):
+        emps = self.employees(" Ann@Example.com ", "")
+        result = provisioning.provision_accounts(Employee.objects.filter(id__in=[e.id for e in emps]))
+
+        self.assertEqual([c["username"] for c in result["created"]], ["ann@example.com", f"employee{emps[1].id}"])
+        ann = User.objects.get(username="ann@example.com")
+        self.assertEqual(ann.email, "ann@example.com")
+        self.assertFalse(ann.has_usable_password())
+        self.assertEqual(UserProfile.objects.get(user=ann).employee, emps[0])
+
+    def test_existing_accounts_are_matched_case_insensitively(self):
+        User.objects.create_user("Bob@Example.com", "", "pw")
+        User.objects.create_user("carol", "CAROL@example.com", "pw")
+        emps = self.employees("bob@example.com", "Carol@Example.com", "dan@example.com", "DAN@example.com")
+
+        result = provisioning.provision_accounts(emps)
+        self.assertEqual([c["employee_id"] for c in result["created"]], [emps[2].id])
+        self.assertEqual(sorted(s["employee_id"] for s in result["skipped"]), [emps[0].id, emps[1].id, emps[3].id])
+
+    def test_account_taken_after_the_check_skips_only_that_row(self):
+        emps = self.employees("eve@example.com", "fay@example.com")
+        insert = provisioning._insert
+
+        def racing_insert(rows, *args):
+            # Another request registers eve between the check and the insert.
+            if not User.objects.filter(email__iexact="eve@example.com").exists():
+                User.objects.create_user("eve-registered", "EVE@example.com", "pw")
+            return insert(rows, *args)
+
+        with mock.patch.object(provisioning, "_insert", side_effect=racing_insert):
+            result = provisioning.provision_accounts(emps)
+
+        self.assertEqual([c["employee_id"] for c in result["created"]], [emps[1].id])
+        self.assertEqual([s["employee_id"] for s in result["skipped"]], [emps[0].id])
+        self.assertFalse(User.objects.filter(username="eve@example.com").exists())
+
+    def test_email_is_unique_regardless_of_case(self):
+        User.objects.create_user("gil", "gil@example.com", "pw")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user("gil2", "GIL@example.com", "pw")
+        # Accounts without an email are not affected.
+        User.objects.create_user("x1", "", "pw")
+        User.objects.create_user("x2", "", "pw")
+
+    def test_initial_passwords_are_hashed(self):
+        emp, = self.employees("hal@example.com")
+        result = provisioning.provision_accounts([emp], passwords={emp.id: "s3cret-pass"}, workers=1)
+        self.assertIsNone(result["created"][0]["activation_token"])
+        self.assertTrue(User.objects.get(username="hal@example.com").check_password("s3cret-pass"))
+        self.assertFalse(AccountActivation.objects.exists())
+
+
+class ActivationEndpointTests(TestCase):
+    def setUp(self):
+        self.employee = Employee.objects.create(name="Ivy", tsr_role="dev", email="Ivy@Example.com")
+        self.admin = admin_client()
+
+    def provision(self):
+        response = self.admin.post(
+            "/api/admin/accounts/provision/", {"employee_ids": [self.employee.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        return json.loads(response.content)["created"][0]["activation_token"]
+
+    def activate(self, token, password="n3w-password!"):
+        return APIClient().post("/api/auth/activate/", {"token": token, "password": password}, format="json")
+
+    def test_token_sets_the_password_once(self):
+        token = self.provision()
+        self.assertEqual(self.activate(token).status_code, 200)
+        self.assertTrue(User.objects.get(username="ivy@example.com").check_password("n3w-password!"))
+        self.assertEqual(self.activate(token, "other-password").status_code, 400)
+
+    def test_expired_or_unknown_token_is_rejected(self):
+        token = self.provision()
+        AccountActivation.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.activate(token).status_code, 400)
+        self.assertEqual(self.activate("not-a-token").status_code, 400)
+
+    def test_second_provisioning_skips_linked_employee(self):
+        self.provision()
+        response = self.admin.post(
+            "/api/admin/accounts/provision/", {"employee_ids": [self.employee.id]}, format="json"
+        )
+        self.assertEqual(json.loads(response.content)["skipped_count"], 1)
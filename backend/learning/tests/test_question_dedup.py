@@ -0,0 +1,75 @@
+from django.test import TestCase
+
+from ..models import AssessmentQuestion, AssessmentSession, Employee, Skill
+from ..question_dedup import SessionQuestions, find_duplicate, signature, similarity
+
+
+class QuestionDedupTests(TestCase):
+    OPTIONS = {"A": "A list", "B": "A tuple", "C": "A dict", "D": "A set"}
+
+    def setUp(self):
+        self.skill = Skill.objects.create(name="Python")
+        self.employee = Employee.objects.create(name="Mei", tsr_role="dev")
+
+    def question(self, text, options=None, correct="A"):
+        return {"question": text, "options": options or self.OPTIONS, "correct_option": correct}
+
+    def test_similarity_tracks_wording(self):
+        a = signature("Which Python type is mutable and ordered?", self.OPTIONS)
+        b = signature("Which Python type is ordered and mutable?", self.OPTIONS)
+        c = signature("What does the GIL protect in CPython?", {"A": "Memory", "B": "Files"})
+        self.assertGreater(similarity(a, b), 0.5)
+        self.assertLess(similarity(a, c), 0.2)
+
+    def test_near_duplicate_is_merged_into_new_session(self):
+        first = SessionQuestions(AssessmentSession.objects.create(employee=self.employee))
+        original = first.add(self.skill, self.question("Which Python type is mutable and ordered?"))
+
+        other = Employee.objects.create(name="Noor", tsr_role="dev")
+        session = AssessmentSession.objects.create(employee=other)
+        picker = SessionQuestions(session)
+        merged = picker.add(self.skill, self.question("Which Python type is mutable and ordered ?"))
+        self.assertEqual(merged.id, original.id)
+        self.assertEqual(picker.stats["merged"], 1)
+        self.assertIn(original.id, session.questions().values_list("id", flat=True))
+        self.assertEqual(AssessmentQuestion.objects.count(), 1)
+
+    def test_seen_duplicate_is_dropped(self):
+        SessionQuestions(AssessmentSession.objects.create(employee=self.employee)).add(
+            self.skill, self.question("Which Python type is mutable and ordered?")
+        )
+        picker = SessionQuestions(AssessmentSession.objects.create(employee=self.employee))
+        self.assertIsNone(picker.add(self.skill, self.question("Which Python type is mutable and ordered?")))
+        self.assertEqual(picker.stats["dropped"], 1)
+
+    def test_same_text_with_other_answer_is_kept(self):
+        picker = SessionQuestions(AssessmentSession.objects.create(employee=self.employee))
+        a = picker.add(self.skill, self.question("Which Python type is mutable and ordered?"))
+        b = picker.add(self.skill, self.question("Which Python type is mutable and ordered?", correct="B"))
+        self.assertNotEqual(a.id, b.id)
+
+    def test_shuffled_options_still_match(self):
+        picker = SessionQuestions(AssessmentSession.objects.create(employee=self.employee))
+        picker.add(self.skill, self.question("Which Python type is mutable and ordered?"))
+        shuffled = {"A": "A set", "B": "A dict", "C": "A tuple", "D": "A list"}
+        sig = signature("Which Python type is mutable and ordered?", shuffled)
+        self.assertIsNotNone(find_duplicate(self.skill.id, sig, "a list"))
+
+    def test_other_skill_is_not_a_duplicate(self):
+        picker = SessionQuestions(AssessmentSession.objects.create(employee=self.employee))
+        picker.add(self.skill, self.question("Which Python type is mutable and ordered?"))
+        other = Skill.objects.create(name="Java")
+        sig = signature("Which Python type is mutable and ordered?", self.OPTIONS)
+        self.assertIsNone(find_duplicate(other.id, sig, "a list"))
+
+    def test_reuse_serves_unseen_questions_instead_of_generating(self):
+        author = SessionQuestions(AssessmentSession.objects.create(employee=self.employee))
+        for text in ("What is a closure?", "How does the GIL affect threads?"):
+            author.add(self.skill, self.question(text))
+
+        learner = Employee.objects.create(name="Kit", tsr_role="dev")
+        session = AssessmentSession.objects.create(employee=learner)
+        picked = SessionQuestions(session).reuse(self.skill, 2)
+        self.assertEqual(len(picked), 2)
+        self.assertEqual(set(session.questions()), set(picked))
+        self.assertEqual(SessionQuestions(session).reuse(self.skill, 1), [])
@@ -0,0 +1,79 @@
+import json
+
+from django.test import TestCase, override_settings
+
+from .. import question_sheet
+from ..models import AssessmentQuestion, AssessmentSession, Employee, QuestionSheet, Skill
+from .utils import admin_client
+
+
+@override_settings(LLM_TELEMETRY_ENABLED=False)
+class QuestionSheetTests(TestCase):
+    def setUp(self):
+        question_sheet._answer_key.cache_clear()
+        self.employee = Employee.objects.create(name="Ada", tsr_role="dev", current_skills='["Go", "Python"]')
+        self.session = AssessmentSession.objects.create(employee=self.employee)
+        self.skills = {name: Skill.objects.create(name=name) for name in ("Python", "Go")}
+
+    def add_question(self, skill, text, correct="A"):
+        return AssessmentQuestion.objects.create(
+            session=self.session, skill=self.skills[skill], question_text=text,
+            options={"A": "yes", "B": "no"}, correct_option=correct,
+        )
+
+    def test_sheet_follows_skill_order_and_key_has_answers(self):
+        python = self.add_question("Python", "Is Python typed?", correct="B")
+        go = self.add_question("Go", "Does Go have goroutines?")
+
+        sheet = question_sheet.compile_sheet(self.session)
+        questions = json.loads(sheet.questions)
+        self.assertEqual([q["id"] for q in questions], [go.id, python.id])
+        self.assertNotIn("correct_option", questions[0])
+
+        key = question_sheet.answer_key(self.session)
+        self.assertEqual(key[str(python.id)], (self.skills["Python"].id, "Python", "B"))
+
+    def test_partial_sheet_is_not_stored_while_generating(self):
+        self.add_question("Go", "Does Go have goroutines?")
+        self.assertEqual(len(json.loads(question_sheet.sheet_json(self.session))), 1)
+        self.assertFalse(QuestionSheet.objects.exists())
+
+        self.add_question("Python", "Is Python typed?")
+        self.assertEqual(len(json.loads(question_sheet.sheet_json(self.session))), 2)
+
+    def test_no_questions_yet(self):
+        self.assertIsNone(question_sheet.sheet_json(self.session))
+        self.assertIsNone(question_sheet.active_sheet_json(self.employee.id))
+
+    def test_recompiling_replaces_the_cached_key(self):
+        first = self.add_question("Go", "Does Go have goroutines?")
+        question_sheet.compile_sheet(self.session)
+        self.assertEqual(set(question_sheet.answer_key(self.session)), {str(first.id)})
+
+        second = self.add_question("Python", "Is Python typed?")
+        question_sheet.compile_sheet(self.session)
+        self.assertEqual(set(question_sheet.answer_key(self.session)), {str(first.id), str(second.id)})
+
+    def test_grading_compiles_a_session_without_a_sheet(self):
+        go = self.add_question("Go", "Does Go have goroutines?")
+        python = self.add_question("Python", "Is Python typed?", correct="B")
+
+        response = admin_client().post(
+            f"/api/learner/{self.employee.id}/assessment/submit/",
+            {"answers": {str(go.id): "A", str(python.id): "A"}}, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["results"], {"Go": 100, "Python": 0})
+        self.assertTrue(QuestionSheet.objects.filter(session=self.session).exists())
+
+    def test_questions_endpoint_serves_the_compiled_sheet(self):
+        self.add_question("Go", "Does Go have goroutines?")
+        sheet = question_sheet.compile_sheet(self.session)
+
+        response = admin_client().get(f"/api/learner/{self.employee.id}/assessment/questions/")
+        self.assertEqual(json.loads(response.content)["questions"], json.loads(sheet.questions))
+
+    def test_response_body_splices_extra_fields(self):
+        body = question_sheet.questions_response_body('[{"id": 1}]', message="ok")
+        self.assertEqual(json.loads(body), {"questions": [{"id": 1}], "message": "ok"})
+        self.assertEqual(json.loads(question_sheet.questions_response_body("[]")), {"questions": []})
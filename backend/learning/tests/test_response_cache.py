@@ -0,0 +1,74 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..models import Employee, LearningContent, Skill
+from .utils import admin_client
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = admin_client()
+        self.employee = Employee.objects.create(name="Ivo", tsr_role="dev", current_skills='["SQL"]')
+        self.other = Employee.objects.create(name="Zoe", tsr_role="dev")
+
+    def get(self, employee, view="learner/employees/{}/"):
+        response = self.client.get("/api/" + view.format(employee.id))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_second_read_is_a_hit(self):
+        self.assertEqual(self.get(self.employee)["X-Cache"], "MISS")
+        hit = self.get(self.employee)
+        self.assertEqual(hit["X-Cache"], "HIT")
+        self.assertEqual(json.loads(hit.content)["name"], "Ivo")
+
+    def test_write_invalidates_only_that_employee(self):
+        self.get(self.employee)
+        self.get(self.other)
+        self.client.patch(f"/api/learner/employees/{self.employee.id}/update/", {"name": "Ivo K"}, format="json")
+
+        fresh = self.get(self.employee)
+        self.assertEqual(fresh["X-Cache"], "MISS")
+        self.assertEqual(json.loads(fresh.content)["name"], "Ivo K")
+        self.assertEqual(self.get(self.other)["X-Cache"], "HIT")
+
+    def test_progress_write_invalidates_progress_bar(self):
+        skill = Skill.objects.create(name="SQL")
+        content = LearningContent.objects.create(
+            title="Joins", skill=skill, content_url="https://example.com/joins",
+            duration_minutes=20, difficulty="Beginner", content_type="video",
+        )
+        progress_bar = "learner/{}/progress-bar/"
+        self.get(self.employee, progress_bar)
+        self.assertEqual(self.get(self.employee, progress_bar)["X-Cache"], "HIT")
+
+        self.client.post(f"/api/learner/{self.employee.id}/learning/{content.id}/start/")
+        self.assertEqual(self.get(self.employee, progress_bar)["X-Cache"], "MISS")
+
+    def test_degraded_dashboard_is_not_cached(self):
+        degraded = {"summary": "later", "degraded": True}
+        with mock.patch("learning.profile_summaries.dashboard_profile", return_value=degraded):
+            self.get(self.employee, "learner/{}/dashboard/")
+            self.assertEqual(self.get(self.employee, "learner/{}/dashboard/")["X-Cache"], "MISS")
+
+    def test_stats_count_hits_and_misses(self):
+        for _ in range(3):
+            self.get(self.employee)
+        stats = json.loads(self.client.get("/api/admin/cache-stats/").content)["views"]["employee"]
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ResponseCacheDisabledTests(TestCase):
+    def test_responses_are_built_every_time(self):
+        cache.clear()
+        client = admin_client()
+        employee = Employee.objects.create(name="Ivo", tsr_role="dev")
+        for _ in range(2):
+            response = client.get(f"/api/learner/employees/{employee.id}/")
+            self.assertFalse(response.has_header("X-Cache"))
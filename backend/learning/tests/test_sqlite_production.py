@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+
+from django.db import connection, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import sqlite_tuning, write_coalescer
+from ..models import Skill
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    def open(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, True)
+        wrapper = DatabaseWrapper({**connection.settings_dict, "NAME": os.path.join(path, "db.sqlite3")}, alias="pragmas")
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    @override_settings(SQLITE_PRODUCTION=True, SQLITE_BUSY_TIMEOUT_MS=1234, SQLITE_CACHE_SIZE_KB=2048)
+    def test_new_connections_are_tuned(self):
+        pragmas = sqlite_tuning.current_pragmas(self.open())
+        self.assertEqual(pragmas["journal_mode"], "wal")
+        # 1 is NORMAL.
+        self.assertEqual(pragmas["synchronous"], 1)
+        self.assertEqual(pragmas["busy_timeout"], 1234)
+        self.assertEqual(pragmas["cache_size"], -2048)
+
+    @override_settings(SQLITE_PRODUCTION=False)
+    def test_connections_are_left_alone_by_default(self):
+        self.assertEqual(sqlite_tuning.current_pragmas(self.open())["journal_mode"], "delete")
+
+
+class WriteCoalescerTests(TestCase):
+    def batch(self, *fns):
+        return [(Future(), fn, (), {}) for fn in fns]
+
+    def test_one_failed_write_does_not_undo_the_others(self):
+        def fail():
+            Skill.objects.create(name="Lost")
+            raise ValueError("bad write")
+
+        coalescer = write_coalescer.WriteCoalescer()
+        batch = self.batch(
+            lambda: Skill.objects.create(name="Go").name,
+            fail,
+            lambda: Skill.objects.create(name="Rust").name,
+        )
+        coalescer._apply(batch)
+
+        self.assertEqual([f.result() for f in (batch[0][0], batch[2][0])], ["Go", "Rust"])
+        self.assertIsInstance(batch[1][0].exception(), ValueError)
+        self.assertEqual(sorted(Skill.objects.values_list("name", flat=True)), ["Go", "Rust"])
+        self.assertEqual((coalescer.batches, coalescer.writes), (1, 3))
+
+    @override_settings(WRITE_COALESCING=True)
+    def test_writes_inside_a_transaction_run_inline(self):
+        with transaction.atomic():
+            skill = write_coalescer.run(Skill.objects.create, name="SQL")
+            self.assertTrue(Skill.objects.filter(id=skill.id).exists())
+        self.assertIsNone(write_coalescer._coalescer)
+
+    @override_settings(WRITE_COALESCING=False)
+    def test_disabled_runs_inline(self):
+        write_coalescer.defer(Skill.objects.create, name="Elm")
+        self.assertEqual(write_coalescer.run(Skill.objects.count), 1)
@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase
+
+from ..llm import JSONObjectStream, iter_json_objects
+
+
+class JSONObjectStreamTests(SimpleTestCase):
+    REPLY = (
+        '```json\n[{"question": "What is {x}?", "options": {"A": "a \\"quoted\\" b"}},\n'
+        ' {"question": "Second", "options": {"A": "[1]"}}]\n```'
+    )
+
+    def feed_in(self, size):
+        stream = JSONObjectStream()
+        items = []
+        for i in range(0, len(self.REPLY), size):
+            items += stream.feed(self.REPLY[i:i + size])
+        stream.close()
+        return items, stream.errors
+
+    def test_objects_are_the_same_for_any_chunking(self):
+        expected = [
+            {"question": "What is {x}?", "options": {"A": 'a "quoted" b'}},
+            {"question": "Second", "options": {"A": "[1]"}},
+        ]
+        for size in (1, 2, 3, 7, 50, len(self.REPLY)):
+            with self.subTest(chunk=size):
+                self.assertEqual(self.feed_in(size), (expected, 0))
+
+    def test_object_is_returned_as_soon_as_it_closes(self):
+        stream = JSONObjectStream()
+        self.assertEqual(stream.feed('[{"a": 1'), [])
+        self.assertEqual(stream.feed('}, {"b"'), [{"a": 1}])
+
+    def test_truncated_object_counts_as_error(self):
+        stream = JSONObjectStream()
+        self.assertEqual(stream.feed('[{"a": 1}, {"b": '), [{"a": 1}])
+        stream.close()
+        self.assertEqual(stream.errors, 1)
+
+    def test_iter_json_objects_over_a_chunk_generator(self):
+        stream = JSONObjectStream()
+        chunks = iter(['[{"a": "x\\', 'ny"}, {"b": [1, {"c"', ': 2}]}]'])
+        self.assertEqual(list(iter_json_objects(chunks, stream)), [{"a": "x\ny"}, {"b": [1, {"c": 2}]}])
+        self.assertEqual(stream.errors, 0)
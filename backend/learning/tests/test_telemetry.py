@@ -0,0 +1,73 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..llm import LLMClient, LLMQuotaError, LLMUnavailableError, telemetry
+from ..llm.backends import LLMResponse
+from ..models import LLMCall
+from .utils import admin_client
+
+
+class FlakyBackend:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def generate(self, prompt, model, timeout):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return LLMResponse(text="{}", model=model, usage={"prompt_tokens": 1000, "response_tokens": 200})
+
+
+@override_settings(LLM_PRICING={"m": (1.0, 10.0)})
+class TelemetryTests(TestCase):
+    def setUp(self):
+        # Flushed by the tests, never by the background thread.
+        self.recorder = telemetry.TelemetryRecorder(batch_size=2, flush_interval=3600, max_queue=5)
+        patch = mock.patch.object(telemetry, "_recorder", self.recorder)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def llm(self, *outcomes):
+        return LLMClient(FlakyBackend(*outcomes), model="m", base_delay=0, sleep=lambda s: None)
+
+    def test_calls_are_recorded_with_usage_retries_and_outcome(self):
+        self.llm(LLMUnavailableError("503"), "ok").generate_json("hi", caller="Profile")
+        with self.assertRaises(LLMQuotaError):
+            self.llm(LLMQuotaError("429", retry_after=600)).generate("hi", caller="Questions")
+        self.assertEqual(LLMCall.objects.count(), 0)
+
+        self.recorder.flush()
+        ok = LLMCall.objects.get(caller="Profile")
+        self.assertEqual((ok.outcome, ok.retries, ok.prompt_tokens, ok.response_tokens), ("ok", 1, 1000, 200))
+        self.assertEqual(LLMCall.objects.get(caller="Questions").outcome, "quota")
+
+    def test_full_queue_drops_instead_of_growing(self):
+        for _ in range(7):
+            telemetry.record("x", model="m")
+        self.assertEqual(self.recorder.dropped, 2)
+        self.recorder.flush()
+        self.assertEqual(LLMCall.objects.count(), 5)
+
+    def test_usage_report_totals_and_cost(self):
+        self.llm("ok").generate("hi", caller="Profile")
+        self.llm("ok").generate("hi", caller="Profile")
+        telemetry.record_cache_hit("Profile", model="m")
+        self.recorder.flush()
+
+        report = telemetry.usage_report(timezone.now() - timedelta(days=1))
+        caller = report["by_caller"][0]
+        self.assertEqual((caller["calls"], caller["cache_hits"], caller["prompt_tokens"]), (3, 1, 2000))
+        self.assertAlmostEqual(caller["cost_usd"], (2000 * 1.0 + 400 * 10.0) / 1_000_000)
+        self.assertEqual(report["by_day"][0]["calls"], 3)
+
+
+class LLMUsageEndpointTests(TestCase):
+    def test_days_must_be_in_range(self):
+        client = admin_client()
+        for days in ("0", "-5", "1000000000", "x"):
+            with self.subTest(days=days):
+                self.assertEqual(client.get(f"/api/admin/llm-usage/?days={days}").status_code, 400)
+        self.assertEqual(client.get("/api/admin/llm-usage/?days=7").status_code, 200)
@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from ..models import UserProfile
+
+PASSWORD = "pw-12345!"
+
+
+def make_user(username="admin", role="ADMIN", employee=None):
+    """
+    A User with the given role. The signal creates the profile; the user is
+    fetched again so it does not carry the stale cached profile.
+    """
+    user = User.objects.create_user(username, f"{username}@example.com", PASSWORD)
+    UserProfile.objects.filter(user=user).update(role=role, employee=employee)
+    return User.objects.get(id=user.id)
+
+
+def admin_client():
+    client = APIClient()
+    client.force_authenticate(make_user())
+    return client
@@ -1,8 +1,13 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views_auth import CustomTokenObtainPairView, current_user, register_user
-from .views import learner_dashboard, generate_learning_path, learner_workflow_status, start_assessment, submit_assessment, generate_assessment_questions, learner_progress_bar, start_learning_content, complete_learning_content,list_employees, create_employee, get_employee, get_learning_path,update_employee,list_employees_public,admin_analytics
+from .views_auth import CustomTokenObtainPairView, current_user, register_user, provision_accounts, activate_account
+from .views import learner_dashboard, generate_learning_path, learner_workflow_status, start_assessment, submit_assessment, generate_assessment_questions, learner_progress_bar, start_learning_content, complete_learning_content, learning_heartbeat,list_employees, create_employee, get_employee, get_learning_path,learning_path_changes,update_employee,list_employees_public,admin_analytics,admin_analytics_trends,admin_llm_usage,admin_cache_stats,related_content,adaptive_next_question,adaptive_answer,get_assessment_questions
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.conf import settings
+
+if settings.ASYNC_LLM_VIEWS:
+    # Native async versions of the LLM-bound endpoints (serve with an ASGI server).
+    from .views_async import learner_dashboard, generate_assessment_questions
 
 urlpatterns = [
         path("learner/<int:employee_id>/dashboard/", learner_dashboard),
@@ -10,17 +15,26 @@ urlpatterns = [
         path("learner/<int:employee_id>/workflow/", learner_workflow_status), 
         path("learner/<int:employee_id>/assessment/generate/", generate_assessment_questions), 
         path("learner/<int:employee_id>/assessment/start/", start_assessment),  
+        path("learner/<int:employee_id>/assessment/questions/", get_assessment_questions),
         path("learner/<int:employee_id>/assessment/submit/", submit_assessment), 
+        path("learner/<int:employee_id>/assessment/adaptive/next/", adaptive_next_question),
+        path("learner/<int:employee_id>/assessment/adaptive/answer/", adaptive_answer),
         path("learner/<int:employee_id>/learning-path/", get_learning_path),
+        path("learner/<int:employee_id>/learning-path/changes/", learning_path_changes),
         path("learner/<int:employee_id>/learning/<int:content_id>/start/", start_learning_content),  
         path("learner/<int:employee_id>/learning/<int:content_id>/complete/", complete_learning_content),  
+        path("learner/<int:employee_id>/learning/heartbeat/", learning_heartbeat),
         path("learner/<int:employee_id>/progress-bar/", learner_progress_bar),  
+        path("learner/content/<int:content_id>/related/", related_content),
         path("learner/employees/", list_employees),  
         path("learner/employees/public/", list_employees_public),  
         path("learner/employees/create/", create_employee),  
         path("learner/employees/<int:employee_id>/", get_employee),
         path("learner/employees/<int:employee_id>/update/", update_employee),
         path("admin/analytics/", admin_analytics),
+        path("admin/analytics/trends/", admin_analytics_trends),
+        path("admin/llm-usage/", admin_llm_usage),
+        path("admin/cache-stats/", admin_cache_stats),
 ] 
 
 urlpatterns += [
@@ -28,4 +42,6 @@ urlpatterns += [
     path("auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("auth/me/", current_user, name="current_user"),
     path("auth/register/", register_user, name="register"),
+    path("auth/activate/", activate_account, name="activate"),
+    path("admin/accounts/provision/", provision_accounts, name="provision_accounts"),
 ]
\ No newline at end of file
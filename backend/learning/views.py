@@ -1,25 +1,29 @@
 from django.shortcuts import render
 import json
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.response import Response
+from django.db import IntegrityError, transaction
 from django.db.models import Count
-from .models import LearningPath, Employee, AssessmentSession, LearningProgress, AssessmentResult, Skill, AssessmentQuestion, LearningContent
-from .agents.profile_agent import ProfileAgent
-from .agents.recommender_agent import RecommenderAgent
+from .models import LearningPath, Employee, AssessmentSession, LearningProgress, AssessmentResult, Skill, AssessmentQuestion, AssessmentResponse, LearningContent, AnalyticsSnapshot
+from .agents import RecommenderAgent
 from django.utils import timezone
+from datetime import date, timedelta
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
-
-import os
-from google import genai
+from .llm import JSONObjectStream, LLMCircuitOpenError, LLMError, LLMQuotaError, get_client, telemetry
+from django.conf import settings
 
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from .permissions import IsAdmin, IsEmployee, IsAdminOrEmployee
+from . import adaptive, analytics_snapshots, content_index, fastjson, heartbeats, idempotency, paths, profile_summaries, question_sheet, response_cache, write_coalescer
+from .fastjson import JsonResponse
+from .question_dedup import SessionQuestions
+from .conditional import conditional_employee_response
+from .db_router import replica_reads
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 # Create your views here.
 
 
@@ -37,12 +41,21 @@ def learner_dashboard(request,employee_id):
     if not ensure_employee_access(request, employee_id):
         return JsonResponse({"error": "Forbidden"}, status=403)
     
+    return conditional_employee_response(
+        request, "dashboard", employee_id, lambda: build_learner_dashboard(employee_id)
+    )
+
+
+def build_learner_dashboard(employee_id):
     # print(employee_id)
     emp = get_object_or_404(Employee, id=employee_id)
-    lp =  LearningPath.objects.filter(employee=emp).order_by('-created_at').first()
+    lp =  LearningPath.objects.filter(employee=emp).first()
 
-    profile = ProfileAgent.build(emp)
-    return JsonResponse({
+    return dashboard_response(emp, paths.path_items(lp) if lp else None, profile_summaries.dashboard_profile(emp))
+
+
+def dashboard_response(emp, learning_path, profile):
+    response = JsonResponse({
         "employee": {
         "name": emp.name,
         "tsr_role": emp.tsr_role,
@@ -50,9 +63,13 @@ def learner_dashboard(request,employee_id):
         "skills": emp.get_current_skills(),
         },
         "profile_summary": profile,
-        "learning_path": lp.get_items() if lp else None,
-        "workflow_status": "RECOMMENDATIONS_GENERATED" if lp else "PROFILE_LOADED"
+        "learning_path": learning_path,
+        "workflow_status": "RECOMMENDATIONS_GENERATED" if learning_path is not None else "PROFILE_LOADED"
     })
+    if profile.get("degraded"):
+        # Don't pin a fallback profile in the cache once the LLM recovers.
+        response["Cache-Control"] = "no-store"
+    return response
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -62,6 +79,18 @@ def generate_learning_path(request, employee_id):
 
     employee = get_object_or_404(Employee, id=employee_id)
 
+    weekly_hours = request.data.get("weekly_hours")
+    if weekly_hours is None:
+        # Keep the learner's own schedule when regenerating.
+        current = LearningPath.objects.filter(employee=employee).values_list("weekly_hours", flat=True).first()
+        weekly_hours = current or settings.LEARNING_WEEKLY_HOURS
+    try:
+        weekly_hours = float(weekly_hours)
+    except (TypeError, ValueError):
+        weekly_hours = 0
+    if not 0 < weekly_hours <= 168:
+        return JsonResponse({"error": "weekly_hours must be a number between 0 and 168"}, status=400)
+
     # --------------------------------------------------
     # 1️⃣ Get latest completed assessment
     # --------------------------------------------------
@@ -76,62 +105,45 @@ def generate_learning_path(request, employee_id):
             status=400
         )
 
-    results = AssessmentResult.objects.filter(session=session)
-
-    missing_skills = []
-    matched_skills = []
-
-    for r in results:
-        if r.score < 70:
-            missing_skills.append(r.skill)
-        else:
-            matched_skills.append(r.skill)
+    results = AssessmentResult.objects.filter(session=session).select_related("skill")
+    progress_by_content = {
+        p.content_id: p
+        for p in LearningProgress.objects.filter(employee=employee)
+    }
 
     # --------------------------------------------------
-    # 2️⃣ Build / refresh learning progress
+    # 2️⃣ Plan the path, then refresh learning progress and the
+    #    LearningPath snapshot (idempotent), see learning/paths.py
     # --------------------------------------------------
-    learning_items = []
-
-    for skill in missing_skills:
-        contents = LearningContent.objects.filter(
-            skill__name__iexact=skill.name
+    plan = paths.plan_path(employee, results, progress_by_content, weekly_hours)
+    try:
+        with transaction.atomic():
+            paths.save_plans([plan])
+    except IntegrityError:
+        # A concurrent request created this employee's path (and progress
+        # records) first; diff against it instead.
+        created = set(
+            LearningProgress.objects.filter(employee=employee).values_list("content_id", flat=True)
         )
+        plan.new_progress = [p for p in plan.new_progress if p.content_id not in created]
+        for progress in plan.new_progress:
+            progress.pk = None
+        with transaction.atomic():
+            paths.save_plans([plan])
+    if plan.changed:
+        response_cache.invalidate_employee(employee_id)
 
-        for content in contents:
-            progress, _ = LearningProgress.objects.get_or_create(
-                employee=employee,
-                content=content,
-                defaults={"status": "NOT_STARTED"}
-            )
-
-            learning_items.append({
-                "content_id": content.id,
-                "title": content.title,
-                "skill": skill.name,
-                "content_url": content.content_url,
-                "thumbnail": content.thumbnail_url,
-                "duration": content.duration_minutes,
-                "status": progress.status
-            })
-
-    # --------------------------------------------------
-    # 3️⃣ Refresh LearningPath snapshot (idempotent)
-    # --------------------------------------------------
-    LearningPath.objects.filter(employee=employee).delete()
-
-    lp = LearningPath.objects.create(
-        employee=employee,
-        status="NOT_STARTED",
-        items=json.dumps(learning_items),
-        matched_skills=json.dumps([s.name for s in matched_skills]),
-        missing_skills=json.dumps([s.name for s in missing_skills])
-    )
+    lp = plan.path
+    matched_skills, missing_skills, learning_items = plan.matched_skills, plan.missing_skills, plan.items
 
     return JsonResponse({
-        "message": "Learning path generated",
+        "message": "Learning path generated" if plan.changed else "Learning path unchanged",
         "learning_path_id": lp.id,
+        "version": lp.version,
         "matched_skills": [s.name for s in matched_skills],
         "missing_skills": [s.name for s in missing_skills],
+        "weekly_hours": weekly_hours,
+        "weeks": max((i["week"] or 0 for i in learning_items), default=0),
         "learning_items": learning_items
     })
 
@@ -142,23 +154,71 @@ def get_learning_path(request, employee_id):
     if not ensure_employee_access(request, employee_id):
         return JsonResponse({"error": "Forbidden"}, status=403)
     
-    employee = get_object_or_404(Employee, id=employee_id)
+    return conditional_employee_response(
+        request, "learning_path", employee_id, lambda: build_learning_path_items(employee_id)
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def learning_path_changes(request, employee_id):
+    """
+    What changed in the learner's path since the version the client has
+    (?since=<version>). When that version is too old for the kept
+    history, the whole path comes back instead, with "full": true.
+    """
+    if not ensure_employee_access(request, employee_id):
+        return JsonResponse({"error": "Forbidden"}, status=403)
 
-    progresses = LearningProgress.objects.filter(employee=employee).select_related("content")
+    try:
+        since = int(request.GET.get("since", 0))
+    except ValueError:
+        return JsonResponse({"error": "since must be a version number"}, status=400)
 
-    items = []
+    lp = LearningPath.objects.filter(employee_id=employee_id).first()
+    if not lp:
+        return JsonResponse({"error": "No learning path generated yet"}, status=404)
 
-    for p in progresses:
-        content = p.content
-        items.append({
-            "id": content.id,
-            "title": content.title,
-            "skill": content.skill.name,
-            "thumbnail": content.thumbnail_url,
-            "url": content.content_url,
-            "estimated_hours": content.duration_minutes,
-            "status": p.status,
+    changes = paths.changes_since(lp, since)
+    if changes is None:
+        return JsonResponse({
+            "version": lp.version,
+            "since": since,
+            "full": True,
+            "learning_items": paths.path_items(lp),
+            "matched_skills": fastjson.loads(lp.matched_skills or "[]"),
+            "missing_skills": fastjson.loads(lp.missing_skills or "[]"),
         })
+    return JsonResponse({
+        "version": lp.version,
+        "since": since,
+        "full": False,
+        "changes": changes,
+    })
+
+
+def build_learning_path_items(employee_id):
+    get_object_or_404(Employee, id=employee_id)
+
+    # .values() rows straight into the payload, no model instances.
+    progresses = LearningProgress.objects.filter(employee_id=employee_id).values(
+        "content_id", "content__title", "content__skill__name", "content__thumbnail_url",
+        "content__content_url", "content__duration_minutes", "status", "watched_percent",
+    )
+
+    items = [
+        {
+            "id": p["content_id"],
+            "title": p["content__title"],
+            "skill": p["content__skill__name"],
+            "thumbnail": p["content__thumbnail_url"],
+            "url": p["content__content_url"],
+            "estimated_hours": p["content__duration_minutes"],
+            "status": p["status"],
+            "watched_percent": p["watched_percent"],
+        }
+        for p in progresses
+    ]
 
     return JsonResponse({
         "items": items
@@ -203,6 +263,10 @@ def start_assessment(request, employee_id):
     
     employee = get_object_or_404(Employee, id=employee_id)
 
+    mode = str(request.data.get("mode") or AssessmentSession.FIXED).upper()
+    if mode not in (AssessmentSession.FIXED, AssessmentSession.ADAPTIVE):
+        return JsonResponse({"error": "mode must be FIXED or ADAPTIVE"}, status=400)
+
     # Prevent duplicate assessment sessions
     active_session = AssessmentSession.objects.filter(
         employee=employee,
@@ -212,20 +276,51 @@ def start_assessment(request, employee_id):
     if active_session:
         return JsonResponse({
             "message": "Assessment already in progress",
-            "session_id": active_session.id
+            "session_id": active_session.id,
+            "mode": active_session.mode
         })
     
     session = AssessmentSession.objects.create(
         employee=employee,
-        status="STARTED"
+        status="STARTED",
+        mode=mode
     )
+    if mode == AssessmentSession.ADAPTIVE:
+        adaptive.create_session_skills(employee)
 
     return JsonResponse({
         "message": "Assessment started",
-        "session_id": session.id
+        "session_id": session.id,
+        "mode": session.mode
     })
 
 
+def is_valid_question(q_data):
+    return (
+        isinstance(q_data, dict)
+        and isinstance(q_data.get("question"), str)
+        and isinstance(q_data.get("options"), dict)
+        and q_data.get("correct_option") in q_data["options"]
+    )
+
+
+def adaptive_session_conflict():
+    return JsonResponse({
+        "error": "Adaptive assessment in progress",
+        "message": "Use assessment/adaptive/next/ and assessment/adaptive/answer/ for this session.",
+    }, status=400)
+
+
+def question_generation_unavailable(retry_after=None):
+    response = JsonResponse({
+        "error": "Question generation temporarily unavailable",
+        "message": "The AI service is having problems. Please try again in a few minutes.",
+    }, status=503)
+    if retry_after:
+        response["Retry-After"] = str(int(retry_after) + 1)
+    return response
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def generate_assessment_questions(request, employee_id):
@@ -239,35 +334,103 @@ def generate_assessment_questions(request, employee_id):
         status="STARTED"
     ).first()
 
-    # If already generated, return cached questions
-    existing = AssessmentQuestion.objects.filter(session=session)
+    if session and session.mode == AssessmentSession.ADAPTIVE:
+        return adaptive_session_conflict()
 
-    if existing.exists():
-        return JsonResponse({
-            "questions": [
-                {
-                    "id": q.id,
-                    "skill": q.skill.name,
-                    "question": q.question_text,
-                    "options": q.options
-                }
-                for q in existing
-            ]
-        })
+    # If already generated, return the compiled sheet
+    sheet = question_sheet.sheet_json(session) if session else None
+
+    if sheet is not None:
+        telemetry.record_cache_hit("question_generation")
+        return sheet_response(sheet)
 
 
     if not session:
         return JsonResponse({"error": "No active assessment"}, status=400)
 
+    if not get_client().is_available():
+        return question_generation_unavailable()
+
     questions = []
+    picker = SessionQuestions(session)
 
     try:
         for skill_name in employee.get_current_skills():
             skill, _ = Skill.objects.get_or_create(name=skill_name)
 
-            prompt = f"""
-        Generate exactly 5 multiple choice questions for skill {skill_name}.
-        Return ONLY a valid JSON array with no additional text.
+            # Enough unseen questions in the bank: no LLM call needed.
+            reused = picker.reuse(skill, QUESTIONS_PER_SKILL)
+            if reused:
+                telemetry.record_cache_hit("question_generation")
+                questions.extend(question_payload(q, skill) for q in reused)
+                continue
+
+            prompt = question_prompt(skill_name)
+
+            if settings.LLM_STREAM_QUESTIONS:
+                # Persist each question as soon as its object is complete.
+                parser = JSONObjectStream()
+                questions_list = get_client().stream_json_objects(
+                    prompt, stream=parser, caller="question_generation"
+                )
+            else:
+                parser = None
+                data = get_client().generate_json(prompt, caller="question_generation")
+                questions_list = data if isinstance(data, list) else [data]
+
+            served = []
+            for q_data in questions_list:
+                if not is_valid_question(q_data):
+                    print(f"Skipping invalid question: {q_data}")
+                    continue
+
+                # Near-duplicates of existing questions are merged or dropped.
+                q = picker.add(skill, q_data)
+                if q is not None:
+                    served.append(q)
+
+            served += picker.top_up(skill, len(served), QUESTIONS_PER_SKILL)
+            questions.extend(question_payload(q, skill) for q in served)
+
+            if parser and parser.errors:
+                print(f"Skipped {parser.errors} malformed question(s) for {skill_name}")
+
+    except LLMCircuitOpenError as e:
+        return question_generation_unavailable(e.retry_after)
+    except LLMError as e:
+        return question_generation_failed(e)
+
+    if not questions:
+        return JsonResponse({"message": "MCQ questions generated", "questions": []})
+    return sheet_response(
+        question_sheet.compile_sheet(session).questions, message="MCQ questions generated"
+    )
+
+
+def sheet_response(sheet, **extra):
+    return HttpResponse(
+        question_sheet.questions_response_body(sheet, **extra),
+        content_type="application/json"
+    )
+
+
+QUESTIONS_PER_SKILL = 5
+
+
+def question_payload(q, skill):
+    return {
+        "id": q.id,
+        "skill": skill.name,
+        "question": q.question_text,
+        "options": q.options
+    }
+
+
+def question_prompt(skill_name, difficulty=None):
+    level = f"All questions must be {difficulty} difficulty.\n" if difficulty else ""
+    return f"""
+        Generate exactly {QUESTIONS_PER_SKILL} multiple choice questions for skill {skill_name}.
+        {level}Return ONLY a valid JSON array with no additional text.
         Each question must have this exact structure:
         {{
           "question": "question text here",
@@ -277,118 +440,59 @@ def generate_assessment_questions(request, employee_id):
             "C": "option C",
             "D": "option D"
           }},
-          "correct_option": "A"
+          "correct_option": "A",
+          "difficulty": "Easy, Medium or Hard"
         }}
-        Return as a JSON array of 5 questions.
+        Return as a JSON array of {QUESTIONS_PER_SKILL} questions.
         """
 
-            resp = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt,
-            )
-
-            # Handle Gemini response properly
-            if hasattr(resp, 'candidates') and resp.candidates:
-                response_text = resp.candidates[0].content.parts[0].text
-            elif hasattr(resp, 'text'):
-                response_text = resp.text
-            else:
-                response_text = str(resp)
-
-            # Clean up markdown code blocks if present
-            cleaned_text = response_text.strip()
-            if cleaned_text.startswith("```"):
-                cleaned_text = cleaned_text.split("```")[1]
-                if cleaned_text.startswith("json"):
-                    cleaned_text = cleaned_text[4:]
-            cleaned_text = cleaned_text.strip()
-
-            try:
-                data = json.loads(cleaned_text)
-            except json.JSONDecodeError as e:
-                print(f"JSONDecodeError: {e}")
-                print(f"Response text: {repr(response_text)}")
-                # Try to fix common JSON errors
-                try:
-                    import re
-                    # Fix common issues like "key}," instead of "key"},"
-                    fixed_text = re.sub(r'(\w+)\}(?=,|\s*})', r'"\1"}', cleaned_text)
-                    data = json.loads(fixed_text)
-                except:
-                    raise ValueError(f"Failed to parse Gemini response: {e}")
-
-            # Handle if response is a list
-            if isinstance(data, list):
-                print(f"Response is a list with {len(data)} items")
-                questions_list = data
-            else:
-                questions_list = [data]
-
-            print(f"Processing {len(questions_list)} questions")
-
-            for q_data in questions_list:
-                if not all(key in q_data for key in ["question", "options", "correct_option"]):
-                    print(f"Skipping invalid question: {q_data}")
-                    continue
-                    
-                q = AssessmentQuestion.objects.create(
-                    session=session,
-                    skill=skill,
-                    question_text=q_data["question"],
-                    options=q_data["options"],
-                    correct_option=q_data["correct_option"],
-                    difficulty="Medium" 
-                )
 
+def generate_adaptive_questions(skill, difficulty, picker):
+    """
+    Adds a batch of questions at `difficulty` for `skill` to the bank.
+    """
+    data = get_client().generate_json(
+        question_prompt(skill.name, difficulty), caller="question_generation"
+    )
+    for q_data in data if isinstance(data, list) else [data]:
+        if is_valid_question(q_data):
+            picker.add(skill, q_data, difficulty)
 
-                questions.append({
-                    "id": q.id,
-                    "skill": skill.name,
-                    "question": q.question_text,
-                    "options": q.options
-                })
 
-    except Exception as e:
-        # Check if it's a quota/rate limit error (429)
-        error_str = str(e).lower()
-        if "resource_exhausted" in error_str or "quota" in error_str or "rate" in error_str:
-            print(f"Gemini API quota exceeded: {e}")
-            return JsonResponse({
-                "error": "API quota exceeded",
-                "message": "You've reached the daily limit for this API. Please try again tomorrow or upgrade your plan.",
-                "details": str(e)
-            }, status=429)
-    except Exception as e:
-        print(f"Error generating questions: {e}")
+def question_generation_failed(e):
+    if isinstance(e, LLMQuotaError):
+        print(f"Gemini API quota exceeded: {e}")
         return JsonResponse({
-            "error": "Failed to generate questions",
-            "message": str(e)
-        }, status=500)
-
+            "error": "API quota exceeded",
+            "message": "You've reached the daily limit for this API. Please try again tomorrow or upgrade your plan.",
+            "details": str(e)
+        }, status=429)
+    print(f"Error generating questions: {e}")
     return JsonResponse({
-        "message": "MCQ questions generated",
-        "questions": questions
-    })
+        "error": "Failed to generate questions",
+        "message": str(e)
+    }, status=500)
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_assessment_questions(request, employee_id):
     if not ensure_employee_access(request, employee_id):
         return JsonResponse({"error": "Forbidden"}, status=403)
-    
-    questions = AssessmentQuestion.objects.all()
 
-    return JsonResponse({
-        "questions": [
-            {
-                "id": q.id,
-                "skill": q.skill.name,
-                "question": q.question_text,
-                "options": q.options
-            }
-            for q in questions
-        ]
-    })
+    # One row: the compiled sheet of the caller's active session.
+    sheet = question_sheet.active_sheet_json(employee_id)
+    if sheet is None:
+        session = AssessmentSession.objects.filter(
+            employee_id=employee_id,
+            status="STARTED"
+        ).first()
+        if not session:
+            return JsonResponse({"error": "No active assessment"}, status=400)
+        if session.mode == AssessmentSession.ADAPTIVE:
+            return adaptive_session_conflict()
+        sheet = question_sheet.sheet_json(session) or "[]"
+
+    return sheet_response(sheet)
 
 
 @api_view(["POST"])
@@ -401,8 +505,8 @@ def submit_assessment(request, employee_id):
 
     # Parse request body
     try:
-        body = json.loads(request.body.decode("utf-8") or "{}")
-    except json.JSONDecodeError:
+        body = fastjson.loads(request.body or b"{}")
+    except ValueError:
         return JsonResponse(    
             {"error": "Invalid JSON payload"},
             status=400
@@ -416,62 +520,196 @@ def submit_assessment(request, employee_id):
             status=400
         )
 
-    # Get active assessment session
-    session = AssessmentSession.objects.filter(
-        employee=employee,
-        status="STARTED"
-    ).first()
+    # A retry of a submission that already went through gets its stored
+    # result back without regrading.
+    idempotency_key = idempotency.request_key(request)
+    replayed = idempotency.replay(employee_id, "submit_assessment", idempotency_key)
+    if replayed is not None:
+        return replayed
+
+    with transaction.atomic():
+        # Get active assessment session. The row lock makes a concurrent
+        # submit wait here, then find the session completed and replay.
+        session = AssessmentSession.objects.select_for_update().filter(
+            employee=employee,
+            status="STARTED"
+        ).first()
+
+        if not session:
+            return idempotency.replay(employee_id, "submit_assessment", idempotency_key) or JsonResponse(
+                {"error": "No active assessment session"},
+                status=400
+            )
 
-    if not session:
-        return JsonResponse(
-            {"error": "No active assessment session"},
-            status=400
-        )
+        if session.mode == AssessmentSession.ADAPTIVE:
+            return adaptive_session_conflict()
 
-    # Aggregate scores per skill
-    skill_scores = {}
+        # Grade against the session's answer key (held in memory)
+        key = question_sheet.answer_key(session)
+        skill_scores = {}
 
-    for question_id, selected_option in answers.items():
-        question = get_object_or_404(
-            AssessmentQuestion,
-            id=question_id
-        )
+        for question_id, selected_option in answers.items():
+            entry = key.get(str(question_id))
+            if entry is None:
+                return JsonResponse(
+                    {"error": f"Question {question_id} is not part of this assessment"},
+                    status=400
+                )
 
-        skill = question.skill
+            skill_id, skill_name, correct_option = entry
 
-        if skill not in skill_scores:
-            skill_scores[skill] = {
-                "correct": 0,
-                "total": 0
+            if skill_name not in skill_scores:
+                skill_scores[skill_name] = {
+                    "skill_id": skill_id,
+                    "correct": 0,
+                    "total": 0
+                }
+
+            skill_scores[skill_name]["total"] += 1
+
+            if selected_option == correct_option:
+                skill_scores[skill_name]["correct"] += 1
+
+        # Mark assessment completed. Conditional as well, since SQLite
+        # ignores FOR UPDATE: only one submit can make this transition.
+        completed = AssessmentSession.objects.filter(id=session.id, status="STARTED").update(
+            status="COMPLETED",
+            completed_at=timezone.now()
+        )
+        if not completed:
+            return idempotency.replay(employee_id, "submit_assessment", idempotency_key) or JsonResponse(
+                {"error": "Assessment already submitted"},
+                status=409
+            )
+
+        # Save final score per skill
+        AssessmentResult.objects.bulk_create([
+            AssessmentResult(
+                session=session,
+                skill_id=stats["skill_id"],
+                score=int((stats["correct"] / stats["total"]) * 100)
+            )
+            for stats in skill_scores.values()
+        ])
+
+        response = JsonResponse({
+            "message": "Assessment completed successfully",
+            "assessment_id": session.id,
+            "results": {
+                skill_name: int((stats["correct"] / stats["total"]) * 100)
+                for skill_name, stats in skill_scores.items()
             }
+        })
+        idempotency.store(employee_id, "submit_assessment", idempotency_key, response, session)
 
-        skill_scores[skill]["total"] += 1
+    response_cache.invalidate_employee(employee_id)
+    return response
 
-        if selected_option == question.correct_option:
-            skill_scores[skill]["correct"] += 1
 
-    # Save final score per skill
-    for skill, stats in skill_scores.items():
-        score = int((stats["correct"] / stats["total"]) * 100)
+def active_adaptive_session(employee_id):
+    return AssessmentSession.objects.filter(
+        employee_id=employee_id,
+        status="STARTED",
+        mode=AssessmentSession.ADAPTIVE
+    ).select_related("employee").first()
 
-        AssessmentResult.objects.create(
-            session=session,
-            skill=skill,
-            score=score
-        )
 
-    # Mark assessment completed
-    session.status = "COMPLETED"
-    session.completed_at = timezone.now()
-    session.save()
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def adaptive_next_question(request, employee_id):
+    """
+    Serves the next question of an adaptive assessment: the one still
+    waiting for an answer, or the most informative unseen question for
+    the least-assessed unfinished skill. Completes the session once every
+    skill is done.
+    """
+    if not ensure_employee_access(request, employee_id):
+        return JsonResponse({"error": "Forbidden"}, status=403)
 
+    get_object_or_404(Employee, id=employee_id)
+    session = active_adaptive_session(employee_id)
+    if not session:
+        return JsonResponse({"error": "No active adaptive assessment"}, status=400)
+
+    skills = adaptive.session_skills(session)
+    state = adaptive.progress(session, skills)
+    pending = adaptive.pending_response(session)
+
+    if pending is None:
+        remaining = [skill for skill in skills if not state[skill.name]["done"]]
+        if not remaining:
+            return JsonResponse({
+                "done": True,
+                "assessment_id": session.id,
+                "results": adaptive.finish(session, state),
+                "progress": adaptive.public_progress(state)
+            })
+
+        # Least-answered skill first, so skills advance together.
+        skill = min(remaining, key=lambda s: state[s.name]["answered"])
+        try:
+            pending = adaptive.next_question(
+                session, skill, state[skill.name]["ability"], generate_adaptive_questions
+            )
+        except LLMCircuitOpenError as e:
+            return question_generation_unavailable(e.retry_after)
+        except LLMError as e:
+            return question_generation_failed(e)
+        if pending is None:
+            return question_generation_unavailable()
+
+    q = pending.question
     return JsonResponse({
-        "message": "Assessment completed successfully",
-        "assessment_id": session.id,
-        "results": {
-            skill.name: int((stats["correct"] / stats["total"]) * 100)
-            for skill, stats in skill_scores.items()
-        }
+        "done": False,
+        "question": {**question_payload(q, q.skill), "difficulty": q.difficulty},
+        "progress": adaptive.public_progress(state)
+    })
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def adaptive_answer(request, employee_id):
+    """
+    Grades one answer of an adaptive assessment and returns the updated
+    estimates (and the results, if that was the last question needed).
+    """
+    if not ensure_employee_access(request, employee_id):
+        return JsonResponse({"error": "Forbidden"}, status=403)
+
+    try:
+        body = fastjson.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON payload"}, status=400)
+
+    question_id = body.get("question_id")
+    answer = body.get("answer")
+    if not question_id or not isinstance(answer, str):
+        return JsonResponse({"error": "question_id and answer are required"}, status=400)
+
+    get_object_or_404(Employee, id=employee_id)
+    session = active_adaptive_session(employee_id)
+    if not session:
+        return JsonResponse({"error": "No active adaptive assessment"}, status=400)
+
+    response = AssessmentResponse.objects.filter(
+        session=session, question_id=question_id
+    ).select_related("question").first()
+    if response is None:
+        return JsonResponse({"error": "Question was not served in this assessment"}, status=400)
+    if response.answered_at or not adaptive.record_answer(response, answer):
+        return JsonResponse({"error": "Question already answered"}, status=409)
+
+    state = adaptive.progress(session, adaptive.session_skills(session))
+    if all(s["done"] for s in state.values()):
+        return JsonResponse({
+            "done": True,
+            "assessment_id": session.id,
+            "results": adaptive.finish(session, state),
+            "progress": adaptive.public_progress(state)
+        })
+    return JsonResponse({
+        "done": False,
+        "progress": adaptive.public_progress(state)
     })
 
 
@@ -484,23 +722,32 @@ def start_learning_content(request, employee_id, content_id):
     employee = get_object_or_404(Employee, id=employee_id)
     content = get_object_or_404(LearningContent, id=content_id)
 
-    progress, _ = LearningProgress.objects.get_or_create(
-        employee=employee,
-        content=content
-    )
-
-    # ❗ Do NOT allow reverting DONE → IN_PROGRESS
-    if progress.status != "DONE":
-        progress.status = "IN_PROGRESS"
-        progress.save()
+    status = write_coalescer.run(start_progress, employee.id, content.id)
+    if status != "DONE":
+        response_cache.invalidate_employee(employee_id)
 
     return JsonResponse({
         "message": "Learning started",
         "content_id": content.id,
-        "status": progress.status
+        "status": status
     })
 
 
+def start_progress(employee_id, content_id):
+    """Marks content IN_PROGRESS (creating the record); returns the status"""
+    progress, created = LearningProgress.objects.get_or_create(
+        employee_id=employee_id,
+        content_id=content_id,
+        defaults={"status": "IN_PROGRESS"}
+    )
+
+    # ❗ Do NOT allow reverting DONE → IN_PROGRESS
+    if not created and progress.status != "DONE":
+        progress.status = "IN_PROGRESS"
+        progress.save()
+    return progress.status
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def complete_learning_content(request, employee_id, content_id):
@@ -510,29 +757,126 @@ def complete_learning_content(request, employee_id, content_id):
     employee = get_object_or_404(Employee, id=employee_id)
     content = get_object_or_404(LearningContent, id=content_id)
 
-    progress = get_object_or_404(
-        LearningProgress,
-        employee=employee,
-        content=content
-    )
-
-    progress.status = "DONE"
-    progress.save()
+    if not write_coalescer.run(complete_progress, employee.id, content.id):
+        raise Http404("No LearningProgress matches the given query.")
+    response_cache.invalidate_employee(employee_id)
 
     return JsonResponse({
         "message": "Learning completed",
         "content_id": content.id,
-        "status": progress.status
+        "status": "DONE"
+    })
+
+
+def complete_progress(employee_id, content_id):
+    """Marks started content DONE; returns how many records changed (0 or 1)"""
+    return LearningProgress.objects.filter(
+        employee_id=employee_id,
+        content_id=content_id
+    ).update(status="DONE", updated_at=timezone.now())
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def learning_heartbeat(request, employee_id):
+    if not ensure_employee_access(request, employee_id):
+        return JsonResponse({"error": "Forbidden"}, status=403)
+
+    try:
+        beats = heartbeats.parse(fastjson.loads(request.body or b"{}"))
+    except ValueError as e:
+        return JsonResponse({"error": str(e) or "Invalid JSON payload"}, status=400)
+
+    # Buffered in memory; most heartbeats make no query at all.
+    durations = heartbeats.content_durations({content_id for content_id, _, _ in beats})
+    unknown = sorted({content_id for content_id, _, _ in beats} - set(durations))
+    if unknown:
+        return JsonResponse({"error": "Unknown content", "content_ids": unknown}, status=404)
+
+    # Several heartbeats for one content (a queued-up client) count as its furthest.
+    accepted = len(beats)
+    furthest = {}
+    for content_id, percent, seconds in beats:
+        percent, seconds = heartbeats.progress(percent, seconds, durations[content_id])
+        before = furthest.get(content_id, (0, 0))
+        furthest[content_id] = (max(before[0], percent), max(before[1], seconds))
+    beats = [(content_id, percent, seconds) for content_id, (percent, seconds) in furthest.items()]
+    written = heartbeats.record(employee_id, beats)
+
+    return JsonResponse({
+        "accepted": accepted,
+        "written": len(written),
+        "items": [
+            {
+                "content_id": content_id,
+                "percent": percent,
+                "persisted": content_id in written,
+                "status": written.get(content_id),
+            }
+            for content_id, percent, _ in beats
+        ],
     })
 
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def related_content(request, content_id):
+    content = get_object_or_404(LearningContent, id=content_id)
+    try:
+        k = min(max(int(request.GET.get("k", 10)), 1), 50)
+        diversity = min(max(float(request.GET.get("diversity", 0.3)), 0.0), 1.0)
+    except ValueError:
+        return JsonResponse({"error": "k and diversity must be numbers"}, status=400)
+
+    try:
+        hits = content_index.get_index().similar(content.id, k=k, diversity=diversity)
+        degraded = False
+    except (content_index.IndexNotBuilt, ImportError) as e:
+        # No index yet: same-skill content is better than nothing.
+        print(f"Content index unavailable: {e}")
+        hits = [
+            (cid, None)
+            for cid in LearningContent.objects
+            .filter(skill_id=content.skill_id)
+            .exclude(id=content.id)
+            .values_list("id", flat=True)[:k]
+        ]
+        degraded = True
+
+    by_id = LearningContent.objects.select_related("skill").in_bulk([cid for cid, _ in hits])
+    related = []
+    for cid, score in hits:
+        c = by_id.get(cid)
+        if c is None:
+            continue  # deleted since the index was built
+        related.append({
+            "id": c.id,
+            "title": c.title,
+            "skill": c.skill.name,
+            "url": c.content_url,
+            "thumbnail": c.thumbnail_url,
+            "duration": c.duration_minutes,
+            "difficulty": c.difficulty,
+            "content_type": c.content_type,
+            "score": score,
+        })
+
+    return JsonResponse({"content_id": content.id, "related": related, "degraded": degraded})
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def learner_progress_bar(request, employee_id):
     if not ensure_employee_access(request, employee_id):
         return JsonResponse({"error": "Forbidden"}, status=403)
     
+    return conditional_employee_response(
+        request, "progress_bar", employee_id, lambda: build_progress_bar(employee_id)
+    )
+
+
+def build_progress_bar(employee_id):
     employee = get_object_or_404(Employee, id=employee_id)
 
     # Step 1: Profile
@@ -594,6 +938,7 @@ def learner_progress_bar(request, employee_id):
 
 @api_view(["GET"])
 @permission_classes([IsAdmin])
+@replica_reads
 def list_employees(request):
     """Admin only: List all employees"""
     employees = Employee.objects.all().values(
@@ -604,6 +949,7 @@ def list_employees(request):
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@replica_reads
 def list_employees_public(request):
     employees = Employee.objects.all().values("id", "name", "tsr_role")
     return JsonResponse(list(employees), safe=False)
@@ -635,13 +981,19 @@ def create_employee(request):
 @permission_classes([IsAdminOrEmployee])
 def get_employee(request, employee_id):
     """Admin or Employee: Get employee details"""
-    emp = get_object_or_404(Employee, id=employee_id)
-    
     # Employees can only view their own profile
     if hasattr(request.user, 'userprofile'):
         if request.user.userprofile.role == 'EMPLOYEE' and request.user.userprofile.employee_id != employee_id:
             return JsonResponse({"error": "Permission denied"}, status=403)
-    
+
+    return conditional_employee_response(
+        request, "employee", employee_id, lambda: build_employee_detail(employee_id)
+    )
+
+
+def build_employee_detail(employee_id):
+    emp = get_object_or_404(Employee, id=employee_id)
+
     return JsonResponse({
         "id": emp.id,
         "name": emp.name,
@@ -681,6 +1033,7 @@ def update_employee(request, employee_id):
         employee.current_skills = json.dumps(data["current_skills"])
 
     employee.save()
+    response_cache.invalidate_employee(employee_id)
 
     return JsonResponse({
         "message": "Profile updated successfully"
@@ -689,6 +1042,7 @@ def update_employee(request, employee_id):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsAdmin])
+@replica_reads
 def admin_analytics(request):
     # 1️⃣ Total employees
     total_employees = Employee.objects.count()
@@ -735,4 +1089,69 @@ def admin_analytics(request):
         "assessments_completed": assessments_completed,
         "learning_status": learning_status,
         "top_skill_gaps": top_skill_gaps
-    })
\ No newline at end of file
+    })
+
+
+MAX_REPORT_DAYS = 3650
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdmin])
+@replica_reads
+def admin_llm_usage(request):
+    """Admin only: LLM calls, tokens, latency and cost by day and by caller"""
+    try:
+        days = int(request.GET.get("days", 30))
+    except ValueError:
+        return JsonResponse({"error": "days must be an integer"}, status=400)
+    if not 1 <= days <= MAX_REPORT_DAYS:
+        return JsonResponse({"error": f"days must be between 1 and {MAX_REPORT_DAYS}"}, status=400)
+
+    since = timezone.now() - timedelta(days=days)
+    return JsonResponse({
+        "days": days,
+        **telemetry.usage_report(since),
+    })
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdmin])
+@replica_reads
+def admin_analytics_trends(request):
+    """
+    Admin only: daily analytics snapshots between ?from= and ?to=
+    (YYYY-MM-DD, default the last 90 days), one point per ?bucket=
+    day|week|month, org-wide or for ?department=
+    """
+    bucket = request.GET.get("bucket", "day")
+    if bucket not in analytics_snapshots.BUCKETS:
+        return JsonResponse({"error": "bucket must be day, week or month"}, status=400)
+
+    try:
+        end = date.fromisoformat(request.GET["to"]) if request.GET.get("to") else timezone.localdate()
+        # The default range stops at date.min rather than overflowing.
+        default_start = end - min(timedelta(days=89), end - date.min)
+        start = date.fromisoformat(request.GET["from"]) if request.GET.get("from") else default_start
+    except ValueError:
+        return JsonResponse({"error": "from and to must be dates (YYYY-MM-DD)"}, status=400)
+    if start > end:
+        return JsonResponse({"error": "from must not be after to"}, status=400)
+
+    department = request.GET.get("department", AnalyticsSnapshot.ORG)
+    return JsonResponse({
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "bucket": bucket,
+        "department": department,
+        "points": analytics_snapshots.trend(start, end, bucket, department),
+    })
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdmin])
+def admin_cache_stats(request):
+    """Admin only: response cache hit rates per learner endpoint"""
+    return JsonResponse({
+        "backend": settings.CACHES["default"]["BACKEND"],
+        "views": response_cache.stats(),
+    })
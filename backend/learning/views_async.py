@@ -0,0 +1,186 @@
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import paths, profile_summaries, question_sheet
+from .authentication import ClaimsJWTAuthentication
+from .conditional import aconditional_employee_response
+from .fastjson import JsonResponse
+from .llm import JSONObjectStream, LLMCircuitOpenError, LLMError, get_client, telemetry
+from .models import AssessmentSession, Employee, LearningPath, Skill
+from .question_dedup import SessionQuestions
+from .views import (
+    QUESTIONS_PER_SKILL,
+    adaptive_session_conflict,
+    dashboard_response,
+    ensure_employee_access,
+    is_valid_question,
+    question_generation_failed,
+    question_generation_unavailable,
+    question_payload,
+    question_prompt,
+    sheet_response,
+)
+
+# Async versions of the LLM-bound learner endpoints, for running under an
+# ASGI server (uvicorn/daphne). While a request waits on the model the
+# worker keeps serving others, instead of one thread per in-flight call.
+# Enabled with ASYNC_LLM_VIEWS=True; see urls.py.
+#
+# DRF's @api_view has no async support, so `async_api_view` does the same
+# JWT auth + IsAuthenticated check by hand.
+
+
+def async_api_view(methods):
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse(
+                    {"detail": f'Method "{request.method}" not allowed.'}, status=405
+                )
+
+            denied = await sync_to_async(authorize)(request, kwargs["employee_id"])
+            if denied is not None:
+                return denied
+
+            try:
+                return await view(request, *args, **kwargs)
+            except Http404 as e:
+                return JsonResponse({"detail": str(e) or "Not found."}, status=404)
+        return wrapper
+    return decorator
+
+
+def authorize(request, employee_id):
+    """
+    JWT auth plus the employee access check, in one trip off the event
+    loop. Returns an error response, or None if the request may proceed.
+    """
+    try:
+        result = ClaimsJWTAuthentication().authenticate(request)
+    except AuthenticationFailed as e:
+        detail = e.detail if isinstance(e.detail, dict) else {"detail": e.detail}
+        return JsonResponse(detail, status=401)
+    if result is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    request.user, request.auth = result
+
+    if not ensure_employee_access(request, employee_id):
+        return JsonResponse({"error": "Forbidden"}, status=403)
+    return None
+
+
+@async_api_view(["GET"])
+async def learner_dashboard(request, employee_id):
+    return await aconditional_employee_response(
+        request, "dashboard", employee_id, lambda: build_learner_dashboard(employee_id)
+    )
+
+
+async def build_learner_dashboard(employee_id):
+    emp = await aget_object_or_404(Employee, id=employee_id)
+    lp = await LearningPath.objects.filter(employee=emp).afirst()
+    items = await sync_to_async(paths.path_items)(lp) if lp else None
+
+    return dashboard_response(emp, items, await profile_summaries.adashboard_profile(emp))
+
+
+@async_api_view(["POST"])
+async def generate_assessment_questions(request, employee_id):
+    employee = await aget_object_or_404(Employee, id=employee_id)
+
+    session = await AssessmentSession.objects.filter(
+        employee=employee,
+        status="STARTED"
+    ).afirst()
+
+    if session and session.mode == AssessmentSession.ADAPTIVE:
+        return adaptive_session_conflict()
+
+    # If already generated, return the compiled sheet
+    sheet = await sync_to_async(question_sheet.sheet_json)(session) if session else None
+    if sheet is not None:
+        telemetry.record_cache_hit("question_generation")
+        return sheet_response(sheet)
+
+    if not session:
+        return JsonResponse({"error": "No active assessment"}, status=400)
+
+    if not get_client().is_available():
+        return question_generation_unavailable()
+
+    picker = await sync_to_async(SessionQuestions)(session)
+
+    # One LLM call per skill, all in flight at once.
+    tasks = [
+        asyncio.ensure_future(generate_skill_questions(picker, skill_name))
+        for skill_name in employee.get_current_skills()
+    ]
+    try:
+        per_skill = await asyncio.gather(*tasks)
+    except LLMCircuitOpenError as e:
+        return question_generation_unavailable(e.retry_after)
+    except LLMError as e:
+        return question_generation_failed(e)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if not any(per_skill):
+        return JsonResponse({"message": "MCQ questions generated", "questions": []})
+    sheet = await sync_to_async(question_sheet.compile_sheet)(session)
+    return sheet_response(sheet.questions, message="MCQ questions generated")
+
+
+async def generate_skill_questions(picker, skill_name):
+    skill, _ = await Skill.objects.aget_or_create(name=skill_name)
+
+    # Enough unseen questions in the bank: no LLM call needed.
+    reused = await sync_to_async(picker.reuse)(skill, QUESTIONS_PER_SKILL)
+    if reused:
+        telemetry.record_cache_hit("question_generation")
+        return [question_payload(q, skill) for q in reused]
+
+    prompt = question_prompt(skill_name)
+    client = get_client()
+
+    if settings.LLM_STREAM_QUESTIONS:
+        # Persist each question as soon as its object is complete.
+        parser = JSONObjectStream()
+        questions_list = client.astream_json_objects(
+            prompt, stream=parser, caller="question_generation"
+        )
+    else:
+        parser = None
+        data = await client.agenerate_json(prompt, caller="question_generation")
+        questions_list = _aiter(data if isinstance(data, list) else [data])
+
+    served = []
+    async for q_data in questions_list:
+        if not is_valid_question(q_data):
+            print(f"Skipping invalid question: {q_data}")
+            continue
+
+        # Near-duplicates of existing questions are merged or dropped.
+        q = await sync_to_async(picker.add)(skill, q_data)
+        if q is not None:
+            served.append(q)
+
+    served += await sync_to_async(picker.top_up)(skill, len(served), QUESTIONS_PER_SKILL)
+
+    if parser and parser.errors:
+        print(f"Skipped {parser.errors} malformed question(s) for {skill_name}")
+    return [question_payload(q, skill) for q in served]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
@@ -8,6 +8,8 @@ from rest_framework.permissions import AllowAny
 from django.contrib.auth.models import User
 from .models import UserProfile, Employee
 from .permissions import IsAdmin, IsAdminOrEmployee
+from .authentication import token_claims
+from . import provisioning
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -18,14 +20,10 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def get_token(cls, user):
         token = super().get_token(user)
         
-        # Add custom claims
-        try:
-            profile = UserProfile.objects.get(user=user)
-            token['role'] = profile.role
-            token['employee_id'] = profile.employee.id if profile.employee else None
-        except UserProfile.DoesNotExist:
-            token['role'] = None
-            token['employee_id'] = None
+        # Add custom claims (role, employee_id and the user's auth version,
+        # see learning/authentication.py)
+        for claim, value in token_claims(user).items():
+            token[claim] = value
         
         return token
 
@@ -103,7 +101,7 @@ def register_user(request):
             existing_user.delete()
 
     # Check if email already exists
-    if User.objects.filter(email=email).exists():
+    if User.objects.filter(email__iexact=email).exists():
         return Response(
             {"error": "Email already exists"},
             status=status.HTTP_400_BAD_REQUEST
@@ -154,3 +152,67 @@ def register_user(request):
             {"error": f"Registration failed: {str(e)}"},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsAdmin])
+def provision_accounts(request):
+    """
+    Admin only: creates accounts for many employees at once.
+    Body: {"employee_ids": [...]} or {"all": true} (every employee without
+    an account), optional "role" (default EMPLOYEE).
+    Returns each new account's one-time activation token; they cannot be
+    retrieved again.
+    """
+    role = request.data.get("role", "EMPLOYEE")
+    if role not in ["ADMIN", "EMPLOYEE"]:
+        return Response(
+            {"error": "role must be ADMIN or EMPLOYEE"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    employees = Employee.objects.filter(userprofile__isnull=True)
+    if not request.data.get("all"):
+        employee_ids = request.data.get("employee_ids")
+        if not isinstance(employee_ids, list) or not employee_ids:
+            return Response(
+                {"error": "employee_ids (a non-empty list) or all=true is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        employees = Employee.objects.filter(id__in=employee_ids)
+
+    result = provisioning.provision_accounts(employees, role=role)
+    return Response({
+        "created_count": len(result["created"]),
+        "skipped_count": len(result["skipped"]),
+        **result
+    }, status=status.HTTP_201_CREATED if result["created"] else status.HTTP_200_OK)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def activate_account(request):
+    """
+    Sets the first password of a provisioned account.
+    Requires: token (from provisioning), password
+    """
+    token = request.data.get("token")
+    password = request.data.get("password")
+    if not token or not password:
+        return Response(
+            {"error": "token and password are required"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    user = provisioning.activate(str(token), password)
+    if user is None:
+        return Response(
+            {"error": "Invalid, expired or already used activation token"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response({
+        "message": "Account activated",
+        "user_id": user.id,
+        "username": user.username
+    })
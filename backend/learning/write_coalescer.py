@@ -0,0 +1,164 @@
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import connection, transaction
+
+# Group commit for small, frequent writes (WRITE_COALESCING).
+#
+# SQLite has one writer at a time, and with many request threads each
+# tiny transaction pays for taking the lock, a commit and, under
+# contention, busy-waiting. Here the writes are handed to one writer
+# thread, which runs everything queued so far in a single transaction
+# (each write in its own savepoint, so one failure does not undo the
+# others) and commits once.
+#
+# run() blocks until the batch holding the write has committed and
+# returns its result, so callers still read their own writes. defer()
+# does not wait; use it for events nobody reads back in the same request.
+# Batches form on their own while the previous one commits, so a write
+# that arrives to an idle writer is not delayed.
+#
+# Writes made inside a transaction run inline: the writer thread could
+# neither see the caller's uncommitted rows nor get the lock it holds.
+
+
+class WriteCoalescer:
+    def __init__(self, max_batch=200):
+        self.max_batch = max_batch
+        self.batches = 0
+        self.writes = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queues `fn(*args, **kwargs)` and returns a Future for its result,
+        set once its transaction has committed.
+        """
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        self._ensure_thread()
+        return future
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="write-coalescer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._apply(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _apply(self, batch):
+        outcomes = []
+        try:
+            with transaction.atomic():
+                for future, fn, args, kwargs in batch:
+                    sid = transaction.savepoint()
+                    try:
+                        outcomes.append((future, fn(*args, **kwargs), None))
+                        transaction.savepoint_commit(sid)
+                    except Exception as e:
+                        transaction.savepoint_rollback(sid)
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # The commit itself failed: nothing in the batch was written.
+            print(f"Coalesced write batch failed: {e}")
+            connection.close()
+            for future, *_ in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.writes += len(batch)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def drain(self):
+        """
+        Waits until every queued write has been applied.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def get_coalescer():
+    global _coalescer
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                _coalescer = WriteCoalescer(max_batch=settings.WRITE_COALESCE_MAX_BATCH)
+                atexit.register(_drain_at_exit)
+    return _coalescer
+
+
+def _inline():
+    return not settings.WRITE_COALESCING or connection.in_atomic_block
+
+
+def run(fn, *args, **kwargs):
+    """
+    Runs the write `fn(*args, **kwargs)` through the coalescer (or inline
+    when coalescing is off) and returns its result once committed.
+    """
+    if _inline():
+        return fn(*args, **kwargs)
+    return get_coalescer().submit(fn, *args, **kwargs).result()
+
+
+def _report_failure(future):
+    error = future.exception()
+    if error is not None:
+        print(f"Deferred write failed: {error}")
+
+
+def defer(fn, *args, **kwargs):
+    """
+    Like run() but does not wait for the write (inline when coalescing
+    is off).
+    """
+    if _inline():
+        fn(*args, **kwargs)
+        return
+    get_coalescer().submit(fn, *args, **kwargs).add_done_callback(_report_failure)
+
+
+def drain():
+    """
+    Applies every queued write now (e.g. before a batch job exits).
+    """
+    if _coalescer is not None:
+        _coalescer.drain()
+
+
+def _drain_at_exit():
+    try:
+        _coalescer.drain()
+    except Exception as e:
+        print(f"Coalesced writes at exit failed: {e}")
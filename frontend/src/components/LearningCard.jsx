@@ -1,11 +1,21 @@
-import { useState } from "react";
+import { useRef, useState } from "react";
 import "../styles/learning.css";
 import VideoPlayer from "./VideoPlayer";
 import ProgressRing from "./ProgressRing";
 
-export default function LearningCard({ item, onStart, onComplete }) {
+export default function LearningCard({ item, onStart, onComplete, onProgress }) {
   const [isPlaying, setIsPlaying] = useState(false);
-  const [progress, setProgress] = useState(0);
+  const [progress, setProgress] = useState(item.watched_percent || 0);
+  const lastSent = useRef(null);
+
+  // The player ticks every second; report only when the percent moves.
+  const handleProgress = (percent) => {
+    setProgress(percent);
+    if (onProgress && percent !== lastSent.current) {
+      lastSent.current = percent;
+      onProgress(percent);
+    }
+  };
 
     const handleStart = () => {
       if (item.status === "NOT_STARTED") {
@@ -38,7 +48,7 @@ export default function LearningCard({ item, onStart, onComplete }) {
             <VideoPlayer
               videoUrl={item.content_url}
               onComplete={onComplete}
-              onProgress={setProgress}
+              onProgress={handleProgress}
               onPlay={onStart}
             />
           </>
@@ -97,6 +97,33 @@ export default function LearningPath() {
     });
   };
 
+  const sendHeartbeat = (id, percent) => {
+    fetch(
+      `${API}/api/learner/${employeeId}/learning/heartbeat/`,
+      {
+        method: "POST",
+        headers: {
+          Authorization: `Bearer ${token}`,
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ content_id: id, percent }),
+      }
+    )
+      .then((res) => res.json())
+      .then((data) => {
+        // Crossing the completion threshold marks the content DONE server-side.
+        const done = (data.items || []).some((i) => i.status === "DONE");
+        if (done) {
+          setItems((prev) =>
+            prev.map((item) =>
+              item.id === id ? { ...item, status: "DONE" } : item
+            )
+          );
+        }
+      })
+      .catch(() => {});
+  };
+
   const completeLearning = async (id) => {
     await fetch(
       `${API}/api/learner/${employeeId}/learning/${id}/complete/`,
@@ -125,6 +152,7 @@ export default function LearningPath() {
               item={item}
               onStart={() => startLearning(item.id)}
               onComplete={() => completeLearning(item.id)}
+              onProgress={(percent) => sendHeartbeat(item.id, percent)}
             />
           ))}
         </div>